@@ -52,7 +52,8 @@ async function joinRoom(roomId) {
     if (!playerName.trim()) return;
     
     try {
-        const wsUrl = `${config.WS_PROTOCOL}//${config.WS_HOST}/ws`;
+        // ?room= lets a sharded deployment route us to the worker that owns the room
+        const wsUrl = `${config.WS_PROTOCOL}//${config.WS_HOST}/ws?room=${encodeURIComponent(roomId)}`;
         const wsClient = new WebSocketClient(wsUrl);
         
         await wsClient.connect();
@@ -73,7 +73,8 @@ window.joinRoom = async function(roomId, playerName = 'Player2') {
         statusEl.textContent = 'Connecting...';
         statusEl.classList.add('visible');
         
-        const wsUrl = `${config.WS_PROTOCOL}//${config.WS_HOST}/ws`;
+        // ?room= lets a sharded deployment route us to the worker that owns the room
+        const wsUrl = `${config.WS_PROTOCOL}//${config.WS_HOST}/ws?room=${encodeURIComponent(roomId)}`;
         wsClient = new WebSocketClient(wsUrl);
         
         wsClient.onInit = (data) => {
@@ -276,6 +277,16 @@ document.getElementById('backFromReplays').addEventListener('click', () => {
     document.getElementById('replayList').classList.add('hidden');
 });
 
+/**
+ * Seconds a game has been running. /games responses are cached until a game
+ * changes, so prefer start_time over the server's snapshot of duration.
+ * @param {Object} game - Entry from /games
+ * @returns {number}
+ */
+function gameDuration(game) {
+    return game.start_time ? Math.max(0, Date.now() / 1000 - game.start_time) : game.duration;
+}
+
 /**
  * Load list of active games for spectating
  * @returns {Promise<void>}
@@ -335,7 +346,7 @@ async function loadActiveGames() {
                     <div>Session: ${game.session_id.substring(0, 8)}...</div>
                     <div>Player: ${game.user_id}</div>
                     <div>Difficulty: ${game.difficulty}</div>
-                    <div>Duration: ${game.duration.toFixed(0)}s | Spectators: ${game.spectators}</div>
+                    <div>Duration: ${gameDuration(game).toFixed(0)}s | Spectators: ${game.spectators}</div>
                 `;
                 
                 gameItem.addEventListener('click', () => spectateGame(game.session_id));
@@ -358,7 +369,7 @@ async function loadActiveGames() {
                     <div>Session: ${game.session_id.substring(0, 8)}...</div>
                     <div>Players: ${game.player_count}</div>
                     <div>Difficulty: ${game.difficulty}</div>
-                    <div>Duration: ${game.duration.toFixed(0)}s | Spectators: ${game.spectators}</div>
+                    <div>Duration: ${gameDuration(game).toFixed(0)}s | Spectators: ${game.spectators}</div>
                 `;
                 
                 gameItem.addEventListener('click', () => spectateGame(game.session_id));
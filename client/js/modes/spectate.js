@@ -1,9 +1,9 @@
-import { WebSocketClient } from '../websocket.js';
+import { WebSocketClient, PROTOCOL_VERSION } from '../websocket.js';
 import { stateManager } from '../state.js';
 import config from '../config.js';
 
 export function startSpectate(sessionId, onStart, onGameOver) {
-    const wsUrl = `${config.WS_PROTOCOL}//${config.WS_HOST}/spectate/${sessionId}`;
+    const wsUrl = `${config.WS_PROTOCOL}//${config.WS_HOST}/spectate/${sessionId}?protocol_version=${PROTOCOL_VERSION}`;
     const wsClient = new WebSocketClient(wsUrl);
     
     wsClient.onInit = (data) => {
@@ -1,5 +1,8 @@
 import { logger } from './logger.js';
 
+// Telemetry protocol: 2 = terrain only in init/static messages
+export const PROTOCOL_VERSION = 2;
+
 /**
  * WebSocket client for game communication
  */
@@ -23,6 +26,7 @@ export class WebSocketClient {
         this.lastPingTime = null;
         this.pingInterval = null;
         this.isMultiplayer = false;
+        this.staticData = null;
     }
     
     /**
@@ -96,6 +100,19 @@ export class WebSocketClient {
         });
     }
     
+    /**
+     * Keep the latest static data (terrain, landing zones) sent by the server
+     * @param {Object} data - init or static message
+     */
+    rememberStatic(data) {
+        if (data.terrain) {
+            this.staticData = {
+                terrain: data.terrain,
+                all_landing_zones: data.all_landing_zones || data.terrain.landing_zones
+            };
+        }
+    }
+    
     /**
      * Handle incoming WebSocket message
      * @param {Object} data - Message data
@@ -106,9 +123,17 @@ export class WebSocketClient {
         
         switch (data.type) {
             case 'init':
+                this.rememberStatic(data);
                 if (this.onInit) this.onInit(data);
                 break;
+            case 'static':
+                this.rememberStatic(data);
+                break;
             case 'telemetry':
+                // Protocol v2 telemetry omits terrain - fill it in from the last init/static message
+                if (!data.terrain && this.staticData) {
+                    Object.assign(data, this.staticData);
+                }
                 if (this.onTelemetry) this.onTelemetry(data);
                 break;
             case 'game_over':
@@ -144,6 +169,17 @@ export class WebSocketClient {
                 console.log('🏠 ROOM JOINED');
                 if (this.onRoomJoined) this.onRoomJoined(data);
                 break;
+            case 'migrate':
+                // Server is restarting - continue the same game on the worker taking over
+                console.log('🔀 MIGRATE:', data.room_id);
+                this.resume(data).catch(error => logger.error('Resume failed:', error));
+                break;
+            case 'resumed':
+                console.log('🔀 RESUMED:', data.room_id);
+                break;
+            case 'queued':
+                console.log('⏳ QUEUED: position', data.position);
+                break;
             case 'error':
                 logger.error('Server error:', data.message);
                 if (this.onError) this.onError(data);
@@ -183,6 +219,7 @@ export class WebSocketClient {
         
         this.send({
             type: 'create_room',
+            protocol_version: PROTOCOL_VERSION,
             difficulty: 'simple',
             player_name: playerName,
             room_name: roomName
@@ -204,6 +241,7 @@ export class WebSocketClient {
         
         this.send({
             type: 'join_room',
+            protocol_version: PROTOCOL_VERSION,
             room_id: roomId,
             player_name: playerName
         });
@@ -225,6 +263,38 @@ export class WebSocketClient {
         });
     }
     
+    /**
+     * Reconnect and take over a game the server handed off with a migrate message
+     * @param {Object} data - migrate message (room_id, player_id, resume_token)
+     * @returns {Promise<void>}
+     */
+    async resume(data) {
+        // Drop the old connection quietly - this is not a lost connection
+        const oldWs = this.ws;
+        oldWs.onmessage = null;
+        oldWs.onerror = null;
+        oldWs.onclose = null;
+        oldWs.close();
+        if (this.pingInterval) {
+            clearInterval(this.pingInterval);
+            this.pingInterval = null;
+        }
+        this.connected = false;
+        
+        // ?room= routes the reconnect to the worker owning the game in sharded mode
+        const url = new URL(this.url, window.location.href);
+        url.searchParams.set('room', data.room_id);
+        this.url = url.toString();
+        await this.connect(6);
+        
+        this.send({
+            type: 'resume',
+            room_id: data.room_id,
+            player_id: data.player_id,
+            resume_token: data.resume_token
+        });
+    }
+    
     /**
      * Start a new game
      * @param {string} [difficulty='simple'] - Difficulty level
@@ -237,6 +307,7 @@ export class WebSocketClient {
         
         const message = {
             type: 'start',
+            protocol_version: PROTOCOL_VERSION,
             difficulty: difficulty,
             telemetry_mode: telemetryMode,
             update_rate: updateRate
@@ -289,5 +360,6 @@ export class WebSocketClient {
         this.onRoomJoined = null;
         this.onPlayerList = null;
         this.onError = null;
+        this.staticData = null;
     }
 }
@@ -0,0 +1,180 @@
+"""
+Overload-aware admission control and load shedding
+
+New games are admitted on measured health rather than on a session count
+alone. Pressure is the highest of these ratios (1.0 = at budget):
+
+- p99 time spent in a scheduler tick / TICK_BUDGET of the tick interval
+- p99 event-loop lag (how late the scheduler's sleeps wake up) / LOOP_LAG_BUDGET
+- messages waiting in player outbound queues / OUTBOUND_BUDGET
+
+While the worker is over budget (or at max_sessions) new games wait in a
+short FIFO queue and get {"type": "queued", "position": n} whenever their
+place changes. A full queue or a wait over MAX_QUEUE_WAIT is refused.
+
+Running games are degraded before they stutter. Once a second the shed level
+goes up a step while pressure is at or over 1.0, and back down a step after
+it has stayed under RECOVER_PRESSURE for RECOVER_AFTER seconds. Each level
+caps how often sessions publish telemetry (SHED_LEVELS), bots first. Physics
+still runs every tick.
+"""
+import asyncio
+import time
+from collections import deque
+from game.scheduler import scheduler as shared_scheduler
+from game.eventlog import event_log
+
+TICK_BUDGET = 0.75  # Fraction of the tick interval the p99 tick may take
+LOOP_LAG_BUDGET = 0.02  # Seconds of p99 event-loop lag
+OUTBOUND_BUDGET = 1000  # Messages queued across all player connections
+RECOVER_PRESSURE = 0.5  # Pressure under which shedding is undone
+RECOVER_AFTER = 10.0  # Seconds pressure must stay low before stepping down a level
+SHED_INTERVAL = 1.0  # Seconds between shed level checks
+MAX_QUEUE = 20  # Games that may wait for admission
+MAX_QUEUE_WAIT = 30.0  # Seconds a game may wait before it is refused
+QUEUE_POLL = 0.5  # Seconds between admission checks for a waiting game
+
+# Telemetry cap in Hz per session priority for each shed level
+SHED_LEVELS = (
+    {},
+    {'bot': 20},
+    {'bot': 10, 'player': 30},
+)
+
+
+def priority(session):
+    """Bots are shed before games played by people"""
+    return 'bot' if session.bot_name else 'player'
+
+
+class AdmissionController:
+    """Admits new games by measured load and sheds telemetry rate under overload"""
+
+    def __init__(self, sessions, max_sessions, scheduler=None, clock=None):
+        self.sessions = sessions  # session_id -> GameSession
+        self.max_sessions = max_sessions  # Hard cap, whatever the load
+        self.scheduler = scheduler if scheduler is not None else shared_scheduler
+        self.clock = clock if clock is not None else time.monotonic
+        self.queue = deque()  # Tickets of games waiting for admission, oldest first
+        self.shed_level = 0
+        self.calm_since = None  # When pressure last dropped under RECOVER_PRESSURE
+        self.shed_task = None
+        self.closed = False  # Set while the worker drains; every new game is refused
+
+        # Stats
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def outbound_depth(self):
+        return sum(len(queue.pending) for session in self.sessions.values() for queue in session.outbound.values())
+
+    def health(self):
+        """Current load measurements and the pressure they add up to"""
+        load = self.scheduler.load()
+        depth = self.outbound_depth()
+        pressure = max(
+            load['tick_p99'] * self.scheduler.tick_rate / TICK_BUDGET,
+            load['loop_lag_p99'] / LOOP_LAG_BUDGET,
+            depth / OUTBOUND_BUDGET
+        )
+        return {
+            'p99_tick_ms': round(load['tick_p99'] * 1000, 2),
+            'p99_loop_lag_ms': round(load['loop_lag_p99'] * 1000, 2),
+            'outbound_depth': depth,
+            'pressure': round(pressure, 2)
+        }
+
+    def has_capacity(self):
+        return len(self.sessions) < self.max_sessions and self.health()['pressure'] < 1.0
+
+    async def admit(self, notify=None):
+        """Wait until a new game may start; returns False if it is refused.
+
+        notify(position) is awaited whenever the game's place in the wait
+        queue changes (1 = next).
+        """
+        if self.closed:
+            self.rejected += 1
+            return False
+        self._start_shedding()
+        if not self.queue and self.has_capacity():
+            self.admitted += 1
+            return True
+        if len(self.queue) >= MAX_QUEUE:
+            self.rejected += 1
+            return False
+
+        ticket = object()
+        self.queue.append(ticket)
+        self.queued += 1
+        deadline = self.clock() + MAX_QUEUE_WAIT
+        position = None
+        try:
+            while True:
+                if self.queue[0] is ticket and self.has_capacity():
+                    self.admitted += 1
+                    return True
+                if self.closed or self.clock() >= deadline:
+                    self.rejected += 1
+                    return False
+                if self.queue.index(ticket) + 1 != position:
+                    position = self.queue.index(ticket) + 1
+                    if notify:
+                        await notify(position)
+                await asyncio.sleep(QUEUE_POLL)
+        finally:
+            self.queue.remove(ticket)
+
+    def close(self):
+        """Refuse every new game from now on (the worker is draining)"""
+        self.closed = True
+
+    def _start_shedding(self):
+        # Start shed loop if not running
+        if self.shed_task is None or self.shed_task.done():
+            self.shed_task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self.sessions:
+            await asyncio.sleep(SHED_INTERVAL)
+            self.evaluate()
+        self.shed_level = 0
+        self.calm_since = None
+
+    def evaluate(self):
+        """Move the shed level one step towards the current load and apply it to every running game"""
+        pressure = self.health()['pressure']
+        now = self.clock()
+        if pressure < RECOVER_PRESSURE:
+            if self.calm_since is None:
+                self.calm_since = now
+        else:
+            self.calm_since = None
+
+        if pressure >= 1.0 and self.shed_level < len(SHED_LEVELS) - 1:
+            self.shed_level += 1
+            event_log.warning("overloaded", pressure=round(pressure, 2), shed_level=self.shed_level)
+        elif self.shed_level and self.calm_since is not None and now - self.calm_since >= RECOVER_AFTER:
+            self.shed_level -= 1
+            self.calm_since = now
+            event_log.info("load_recovered", pressure=round(pressure, 2), shed_level=self.shed_level)
+
+        caps = SHED_LEVELS[self.shed_level]
+        for session in list(self.scheduler.sessions):
+            self.scheduler.throttle(session, caps.get(priority(session)))
+        return self.shed_level
+
+    def get_stats(self):
+        """Get load, shedding and admission queue stats (for monitoring)"""
+        return {
+            **self.health(),
+            'closed': self.closed,
+            'shed_level': self.shed_level,
+            'throttled': sum(1 for divisor, _, own in self.scheduler.sessions.values() if divisor != own),
+            'waiting': len(self.queue),
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'rejected': self.rejected,
+            'max_sessions': self.max_sessions
+        }
@@ -0,0 +1,56 @@
+"""
+Compact binary input messages
+
+Accepted on every player connection alongside JSON {"type": "input"} messages,
+as a websocket binary message of 1 or 5 bytes:
+
+    controls    <B      bitmask: 1 = thrust, 2 = rotate left, 4 = rotate right
+    client tick <I      optional, echoed back as "input_tick" in telemetry
+
+A binary input is the full control state, not an edge: 0x01 means "thrust on,
+not rotating" however many times it is sent. Left and right together mean no
+rotation.
+"""
+import struct
+
+INPUT_THRUST = 1
+INPUT_ROTATE_LEFT = 2
+INPUT_ROTATE_RIGHT = 4
+
+CONTROLS = struct.Struct('<B')
+CONTROLS_WITH_TICK = struct.Struct('<BI')
+
+
+class InvalidInput(ValueError):
+    """A binary input message that is not 1 or 5 bytes or has unknown control bits"""
+
+
+def encode_input(thrust, rotate=None, client_tick=None):
+    """Pack a control state; rotate is "left", "right" or None"""
+    controls = (INPUT_THRUST if thrust else 0) | {"left": INPUT_ROTATE_LEFT, "right": INPUT_ROTATE_RIGHT}.get(rotate, 0)
+    if client_tick is None:
+        return CONTROLS.pack(controls)
+    return CONTROLS_WITH_TICK.pack(controls, client_tick)
+
+
+def decode_input(payload):
+    """Unpack a binary input into (thrust, rotate, client_tick); raises InvalidInput if malformed"""
+    if len(payload) == CONTROLS.size:
+        controls, = CONTROLS.unpack(payload)
+        client_tick = None
+    elif len(payload) == CONTROLS_WITH_TICK.size:
+        controls, client_tick = CONTROLS_WITH_TICK.unpack(payload)
+    else:
+        raise InvalidInput(f"binary input must be {CONTROLS.size} or {CONTROLS_WITH_TICK.size} bytes, got {len(payload)}")
+
+    if controls & ~(INPUT_THRUST | INPUT_ROTATE_LEFT | INPUT_ROTATE_RIGHT):
+        raise InvalidInput(f"unknown input bits: {controls:#x}")
+
+    rotate = None
+    left = controls & INPUT_ROTATE_LEFT
+    right = controls & INPUT_ROTATE_RIGHT
+    if left and not right:
+        rotate = "left"
+    elif right and not left:
+        rotate = "right"
+    return bool(controls & INPUT_THRUST), rotate, client_tick
@@ -0,0 +1,180 @@
+"""
+Fixed-layout binary telemetry frames
+
+Negotiated with "protocol": "binary" in the start message. Telemetry is sent as
+a websocket binary message; init, game_over and every other message stay JSON.
+All values are little-endian. A frame is:
+
+    header      <BBHHd   kind (1), flags, static_version, player_count, timestamp
+    lander      <9fB     x, y, vx, vy, rotation, fuel, terrain_height,
+                         altitude, speed, state bits
+    input tick  <I       last client tick of a binary input  (if STATE_INPUT_TICK)
+    zone        <3f      nearest landing zone x1, x2, y      (if FLAG_ZONE)
+    advanced    <6fB     elapsed_time, angle_degrees, estimated_score,
+                         max_possible_score, time_to_ground, impact_speed
+                         (NaN when unknown), advanced bits   (if FLAG_ADVANCED)
+    players     <B6fB    per player: index in player_list, x, y, vx, vy,
+                         rotation, fuel, state bits          (if FLAG_MULTIPLAYER)
+                followed by that player's input tick <I  (if STATE_INPUT_TICK)
+
+The lander block is the first player's lander, as in JSON telemetry. The
+STATE_INPUT_TICK bit marks that the record is followed by the "input_tick" the
+player last sent with a binary input (game/binary_input.py).
+"""
+import math
+import struct
+
+KIND_TELEMETRY = 1
+
+# Header flags
+FLAG_MULTIPLAYER = 1
+FLAG_ADVANCED = 2
+FLAG_ZONE = 4
+
+# Lander state bits
+STATE_CRASHED = 1
+STATE_LANDED = 2
+STATE_THRUSTING = 4
+STATE_INPUT_TICK = 8
+
+# Advanced bits
+ADV_OVER_LANDING_ZONE = 1
+ADV_SAFE_SPEED = 2
+ADV_SAFE_ANGLE = 4
+
+HEADER = struct.Struct('<BBHHd')
+LANDER = struct.Struct('<9fB')
+ZONE = struct.Struct('<3f')
+ADVANCED = struct.Struct('<6fB')
+PLAYER = struct.Struct('<B6fB')
+INPUT_TICK = struct.Struct('<I')
+
+LANDER_FIELDS = ('x', 'y', 'vx', 'vy', 'rotation', 'fuel')
+
+
+def _state_bits(lander, thrusting, input_tick):
+    return ((STATE_CRASHED if lander['crashed'] else 0)
+            | (STATE_LANDED if lander['landed'] else 0)
+            | (STATE_THRUSTING if thrusting else 0)
+            | (STATE_INPUT_TICK if input_tick is not None else 0))
+
+
+def _nan_if_none(value):
+    return math.nan if value is None else value
+
+
+def _none_if_nan(value):
+    return None if math.isnan(value) else value
+
+
+def encode_telemetry(message):
+    """Pack a telemetry message (as built by GameSession.build_telemetry) into bytes"""
+    players = message.get('players')
+    zone = message['nearest_landing_zone']
+    advanced = 'elapsed_time' in message
+
+    if players:
+        lander = next(iter(players.values()))['lander']
+    else:
+        lander = message['lander']
+
+    flags = ((FLAG_MULTIPLAYER if players else 0)
+             | (FLAG_ADVANCED if advanced else 0)
+             | (FLAG_ZONE if zone else 0))
+
+    parts = [
+        HEADER.pack(KIND_TELEMETRY, flags, message['static_version'] & 0xFFFF,
+                    len(players) if players else 1, message['timestamp']),
+        LANDER.pack(*(lander[field] for field in LANDER_FIELDS),
+                    message['terrain_height'], message['altitude'], message['speed'],
+                    _state_bits(lander, message['thrusting'], message.get('input_tick')))
+    ]
+    if message.get('input_tick') is not None:
+        parts.append(INPUT_TICK.pack(message['input_tick']))
+    if zone:
+        parts.append(ZONE.pack(zone['x1'], zone['x2'], zone['y']))
+    if advanced:
+        bits = ((ADV_OVER_LANDING_ZONE if message['is_over_landing_zone'] else 0)
+                | (ADV_SAFE_SPEED if message['is_safe_speed'] else 0)
+                | (ADV_SAFE_ANGLE if message['is_safe_angle'] else 0))
+        parts.append(ADVANCED.pack(
+            message['elapsed_time'], message['angle_degrees'], message['estimated_score'],
+            message['max_possible_score'], _nan_if_none(message['time_to_ground']),
+            _nan_if_none(message['impact_speed']), bits
+        ))
+    if players:
+        for index, player in enumerate(players.values()):
+            player_lander = player['lander']
+            input_tick = player.get('input_tick')
+            parts.append(PLAYER.pack(index, *(player_lander[field] for field in LANDER_FIELDS),
+                                     _state_bits(player_lander, player['thrusting'], input_tick)))
+            if input_tick is not None:
+                parts.append(INPUT_TICK.pack(input_tick))
+    return b''.join(parts)
+
+
+def decode_telemetry(payload):
+    """Unpack a binary telemetry frame into a dict (for Python clients and tests)"""
+    kind, flags, static_version, player_count, timestamp = HEADER.unpack_from(payload, 0)
+    if kind != KIND_TELEMETRY:
+        raise ValueError(f"Not a telemetry frame (kind {kind})")
+    offset = HEADER.size
+
+    values = LANDER.unpack_from(payload, offset)
+    offset += LANDER.size
+    state = values[9]
+    message = {
+        'type': 'telemetry',
+        'timestamp': timestamp,
+        'static_version': static_version,
+        'lander': dict(zip(LANDER_FIELDS, values[:6]),
+                       crashed=bool(state & STATE_CRASHED), landed=bool(state & STATE_LANDED)),
+        'terrain_height': values[6],
+        'altitude': values[7],
+        'speed': values[8],
+        'thrusting': bool(state & STATE_THRUSTING),
+        'nearest_landing_zone': None
+    }
+    if state & STATE_INPUT_TICK:
+        message['input_tick'], = INPUT_TICK.unpack_from(payload, offset)
+        offset += INPUT_TICK.size
+
+    if flags & FLAG_ZONE:
+        x1, x2, y = ZONE.unpack_from(payload, offset)
+        offset += ZONE.size
+        message['nearest_landing_zone'] = {'x1': x1, 'x2': x2, 'y': y}
+
+    if flags & FLAG_ADVANCED:
+        values = ADVANCED.unpack_from(payload, offset)
+        offset += ADVANCED.size
+        bits = values[6]
+        message.update({
+            'elapsed_time': values[0],
+            'angle_degrees': values[1],
+            'estimated_score': values[2],
+            'max_possible_score': values[3],
+            'time_to_ground': _none_if_nan(values[4]),
+            'impact_speed': _none_if_nan(values[5]),
+            'is_over_landing_zone': bool(bits & ADV_OVER_LANDING_ZONE),
+            'is_safe_speed': bool(bits & ADV_SAFE_SPEED),
+            'is_safe_angle': bool(bits & ADV_SAFE_ANGLE)
+        })
+
+    if flags & FLAG_MULTIPLAYER:
+        players = []
+        for _ in range(player_count):
+            values = PLAYER.unpack_from(payload, offset)
+            offset += PLAYER.size
+            state = values[7]
+            player = {
+                'index': values[0],
+                'lander': dict(zip(LANDER_FIELDS, values[1:7]),
+                               crashed=bool(state & STATE_CRASHED), landed=bool(state & STATE_LANDED)),
+                'thrusting': bool(state & STATE_THRUSTING)
+            }
+            if state & STATE_INPUT_TICK:
+                player['input_tick'], = INPUT_TICK.unpack_from(payload, offset)
+                offset += INPUT_TICK.size
+            players.append(player)
+        message['players'] = players
+    return message
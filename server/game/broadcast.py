@@ -0,0 +1,114 @@
+"""
+Serialize-once broadcasting of server messages
+
+A Frame wraps one outgoing message and encodes it at most once per wire
+format (JSON by default), so every player and spectator sharing a format gets
+the same cached payload. Encode cost is tracked per scheduler tick by the
+shared Broadcaster.
+"""
+import json
+import time
+
+# Telemetry protocol versions (requested by clients with "protocol_version")
+PROTOCOL_LEGACY = 1  # Terrain and landing zones repeated in every telemetry message
+PROTOCOL_SPLIT = 2   # Static data only in init/static messages, telemetry carries dynamic state
+PROTOCOL_VERSIONS = (PROTOCOL_LEGACY, PROTOCOL_SPLIT)
+PROTOCOL_BINARY = 3  # Like PROTOCOL_SPLIT, with telemetry as packed binary frames ("protocol": "binary")
+
+
+def requested_protocol(message):
+    """Telemetry protocol asked for in a start, create_room or join_room message"""
+    # Packed binary telemetry frames (game/binary_telemetry.py)
+    if message.get("protocol") == "binary":
+        return PROTOCOL_BINARY
+    # 2 = terrain only in init/static messages
+    protocol = message.get("protocol_version", PROTOCOL_LEGACY)
+    return protocol if protocol in PROTOCOL_VERSIONS else PROTOCOL_LEGACY
+
+
+def splice_json(message, members):
+    """json.dumps(message) with pre-encoded members ('"key": value, ...') appended"""
+    payload = json.dumps(message)
+    if not members:
+        return payload
+    return f"{payload[:-1]}{', ' if len(payload) > 2 else ''}{members}}}"
+
+
+class Frame:
+    """One outgoing message, encoded lazily and at most once per encoder"""
+
+    def __init__(self, broadcaster, message, encoders=None, latest_only=False):
+        self.broadcaster = broadcaster
+        self.message = message
+        self.encoders = encoders or {}  # format -> function(message) -> str or bytes payload
+        self.latest_only = latest_only
+        self.payloads = {}
+
+    def payload(self, fmt=None):
+        """Encoded payload for a format (JSON text if fmt has no encoder of its own)"""
+        encoder = self.encoders.get(fmt, json.dumps)
+        payload = self.payloads.get(encoder)
+        if payload is None:
+            start = time.perf_counter()
+            payload = encoder(self.message)
+            self.broadcaster.record_encode(time.perf_counter() - start)
+            self.payloads[encoder] = payload
+        self.broadcaster.sends += 1
+        return payload
+
+
+class Broadcaster:
+    """Creates frames and keeps per-tick encode cost stats"""
+
+    def __init__(self):
+        self.frames = 0
+        self.encodes = 0
+        self.sends = 0
+        self.encode_time = 0.0
+        self.frames_replaced = 0  # Unsent telemetry superseded in an outbound queue
+        self.slow_consumers = 0  # Connections dropped for falling too far behind
+
+        # Encode time of the current and finished scheduler ticks
+        self.tick_encode_time = 0.0
+        self.ticks = 0
+        self.last_tick_encode_time = 0.0
+        self.max_tick_encode_time = 0.0
+
+    def frame(self, message, encoders=None, latest_only=False):
+        """Wrap a message for fan-out; encoders maps format -> payload encoder.
+        
+        latest_only frames (telemetry) may be replaced by a newer frame before
+        a slow client gets them; all other frames are always delivered.
+        """
+        self.frames += 1
+        return Frame(self, message, encoders, latest_only)
+
+    def record_encode(self, duration):
+        self.encodes += 1
+        self.encode_time += duration
+        self.tick_encode_time += duration
+
+    def end_tick(self):
+        """Close out encode accounting for one scheduler tick"""
+        self.ticks += 1
+        self.last_tick_encode_time = self.tick_encode_time
+        self.max_tick_encode_time = max(self.max_tick_encode_time, self.tick_encode_time)
+        self.tick_encode_time = 0.0
+
+    def get_stats(self):
+        """Get encode/fan-out stats (for monitoring)"""
+        return {
+            'frames': self.frames,
+            'encodes': self.encodes,
+            'sends': self.sends,
+            'frames_replaced': self.frames_replaced,
+            'slow_consumers': self.slow_consumers,
+            'encode_ms_total': round(self.encode_time * 1000, 2),
+            'last_tick_encode_ms': round(self.last_tick_encode_time * 1000, 3),
+            'max_tick_encode_ms': round(self.max_tick_encode_time * 1000, 3),
+            'avg_tick_encode_ms': round(self.encode_time * 1000 / max(1, self.ticks), 3)
+        }
+
+
+# Shared by every session in this process
+broadcaster = Broadcaster()
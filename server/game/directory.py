@@ -0,0 +1,230 @@
+"""
+Session directory backing the /games and /rooms lobby listings
+
+Every worker publishes a compact summary of each of its sessions (see
+GameSession.summary) and lobby requests are answered from the directory, so
+with several workers (shards.py) every worker lists every game without asking
+the others.
+
+SessionDirectory keeps summaries in this process (single worker).
+SQLiteSessionDirectory shares them between workers on one machine through a
+SQLite file; rows of a worker that stops republishing expire after ttl
+seconds. Its publish() and remove() only queue the change: a background task
+writes the queue in a worker thread, so waiting on another worker's lock
+never stalls the game tick.
+
+Both keep a version that only goes up when a summary actually changes.
+CachedListing serializes a lobby response once per version and uses it as
+the ETag, so polling an unchanged lobby is a version check and a 304.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from game.eventlog import event_log
+
+DIRECTORY_TTL = 30.0  # Seconds a summary stays listed without being republished
+
+
+class SessionDirectory:
+    """In-process session directory"""
+
+    def __init__(self, shard=0):
+        self.shard = shard
+        self.rooms = {}  # session_id -> summary
+        self.epoch = uuid.uuid4().hex[:8]  # Keeps ETags from a previous run from matching
+        self._version = 0
+
+    def publish(self, summaries):
+        """Add or update session summaries"""
+        for summary in summaries:
+            summary = {**summary, 'shard': self.shard}
+            if self.rooms.get(summary['id']) != summary:
+                self.rooms[summary['id']] = summary
+                self._version += 1
+
+    def remove(self, session_id):
+        if self.rooms.pop(session_id, None) is not None:
+            self._version += 1
+
+    def version(self):
+        """Increases whenever list() would return something different"""
+        return self._version
+
+    def list(self):
+        """All published summaries"""
+        return list(self.rooms.values())
+
+    def get_stats(self):
+        return {'backend': 'memory', 'rooms': len(self.rooms), 'version': self._version}
+
+
+class SQLiteSessionDirectory:
+    """Session directory shared by the workers on one machine through a SQLite file"""
+
+    def __init__(self, path, shard=0, ttl=DIRECTORY_TTL, clock=None):
+        self.path = path
+        self.shard = shard
+        self.ttl = ttl
+        self.clock = clock if clock is not None else time.time
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")  # Readers never block the publishing worker
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS rooms ("
+            "id TEXT PRIMARY KEY, shard INTEGER, updated_at REAL, summary TEXT)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS rooms_updated_at ON rooms (updated_at)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (epoch TEXT, version INTEGER)")
+        self.db.execute(
+            "INSERT INTO meta SELECT ?, 0 WHERE NOT EXISTS (SELECT 1 FROM meta)", (uuid.uuid4().hex[:8],)
+        )
+        self.epoch, = self.db.execute("SELECT epoch FROM meta").fetchone()
+
+        # Anything left under our shard is from a previous run of this worker
+        self.db.execute("BEGIN IMMEDIATE")
+        if self.db.execute("DELETE FROM rooms WHERE shard = ?", (shard,)).rowcount:
+            self.db.execute("UPDATE meta SET version = version + 1")
+        self.db.execute("COMMIT")
+
+        # Writes go through their own connection, used by one write at a time from worker threads
+        self.writer = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self.pending = {}  # session_id -> latest summary, or None to remove
+        self.write_task = None
+
+        # Stats
+        self.writes = 0
+        self.write_errors = 0
+        self.last_write_time = 0.0
+        self.max_write_time = 0.0
+
+    def publish(self, summaries):
+        """Queue summaries to add or update (expired rows are dropped in the same write)"""
+        for summary in summaries:
+            self.pending[summary['id']] = summary
+        self._schedule()
+
+    def remove(self, session_id):
+        self.pending[session_id] = None
+        self._schedule()
+
+    def _schedule(self):
+        if not self.pending:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._take())  # No event loop to block (scripts, tests)
+            return
+
+        # Start writer if not running (or left behind by a closed event loop)
+        if self.write_task is None or self.write_task.done() or self.write_task.get_loop() is not loop:
+            self.write_task = loop.create_task(self._writer())
+
+    def _take(self):
+        updates, self.pending = self.pending, {}
+        return updates
+
+    async def _writer(self):
+        # Changes queued while a write is in flight go out together in the next one
+        while self.pending:
+            try:
+                await asyncio.to_thread(self._write, self._take())
+            except Exception as e:
+                # Rows are republished every sync; a lost remove expires after ttl
+                self.write_errors += 1
+                event_log.error("directory_write_failed", error=str(e))
+
+    async def flush(self):
+        """Wait until every queued change has been written"""
+        while self.write_task is not None and not self.write_task.done():
+            await self.write_task
+
+    def _write(self, updates):
+        """Apply queued changes and drop expired rows in one transaction.
+
+        The version is only bumped if something changed, so periodic
+        republishing of idle sessions does not invalidate lobby caches.
+        Expired rows are already counted by version(); they are folded
+        into the stored version as they are deleted.
+        """
+        start = time.perf_counter()
+        now = self.clock()
+        cutoff = now - self.ttl
+        rows = [(session_id, self.shard, now, json.dumps({**summary, 'shard': self.shard}))
+                for session_id, summary in updates.items() if summary is not None]
+        removed = [(session_id,) for session_id, summary in updates.items() if summary is None]
+        db = self.writer
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            expired, = db.execute("SELECT COUNT(*) FROM rooms WHERE updated_at < ?", (cutoff,)).fetchone()
+            # A republished row that had expired is back in list(), so it counts as changed
+            current = dict(db.execute("SELECT id, summary FROM rooms WHERE shard = ? AND updated_at >= ?",
+                                      (self.shard, cutoff)))
+            changed = any(current.get(row[0]) != row[3] for row in rows)
+            db.executemany("INSERT OR REPLACE INTO rooms VALUES (?, ?, ?, ?)", rows)
+            if removed and db.executemany("DELETE FROM rooms WHERE id = ?", removed).rowcount:
+                changed = True
+            # Rooms of workers that stopped republishing
+            db.execute("DELETE FROM rooms WHERE updated_at < ?", (cutoff,))
+            if expired or changed:
+                db.execute("UPDATE meta SET version = version + ?", (expired + changed,))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        elapsed = time.perf_counter() - start
+        self.writes += 1
+        self.last_write_time = elapsed
+        self.max_write_time = max(self.max_write_time, elapsed)
+
+    def version(self):
+        """Increases whenever list() would return something different (shared by all workers).
+
+        Rows past ttl are counted in, so a worker that stops republishing
+        changes the version when its rows expire, even if nobody writes.
+        """
+        version, = self.db.execute(
+            "SELECT version + (SELECT COUNT(*) FROM rooms WHERE updated_at < ?) FROM meta",
+            (self.clock() - self.ttl,)
+        ).fetchone()
+        return version
+
+    def list(self):
+        """Summaries from every worker that republished within ttl"""
+        rows = self.db.execute("SELECT summary FROM rooms WHERE updated_at >= ?", (self.clock() - self.ttl,))
+        return [json.loads(summary) for summary, in rows]
+
+    def get_stats(self):
+        count, = self.db.execute("SELECT COUNT(*) FROM rooms").fetchone()
+        return {
+            'backend': 'sqlite', 'path': self.path, 'rooms': count, 'ttl': self.ttl, 'version': self.version(),
+            'pending_writes': len(self.pending), 'writes': self.writes, 'write_errors': self.write_errors,
+            'last_write_ms': round(self.last_write_time * 1000, 3),
+            'max_write_ms': round(self.max_write_time * 1000, 3)
+        }
+
+
+class CachedListing:
+    """A lobby response serialized once per directory version"""
+
+    def __init__(self, directory, build):
+        self.directory = directory
+        self.build = build  # Directory summaries -> JSON-serializable response
+        self.cached_version = None
+        self.etag = None
+        self.body = None
+        self.builds = 0
+
+    def get(self):
+        """Current (etag, body); only rebuilt when the directory version changed"""
+        version = self.directory.version()
+        if version != self.cached_version:
+            self.body = json.dumps(self.build(self.directory.list()))
+            self.etag = f'"{self.directory.epoch}-{version}"'
+            self.cached_version = version
+            self.builds += 1
+        return self.etag, self.body
@@ -0,0 +1,170 @@
+"""
+Non-blocking structured logging for the game server
+
+Events are dicts (time, level, event name and fields such as session and
+player). emit() never touches stdout. It filters by level and per-event
+sample rate, then appends the event to an in-memory ring buffer (recent(),
+GET /api/logs) and to a pending queue. A background writer task formats the
+queue and writes it in a worker thread every FLUSH_INTERVAL. If the writer
+falls behind, the oldest pending events are dropped and counted instead of
+slowing the game loop.
+
+Configured from the environment in main.py:
+
+    LOG_LEVEL=debug|info|warning|error   (default info; inputs are debug)
+    LOG_SAMPLE=input=0.1,spectator=0.5   (fraction of each event kept)
+    LOG_FORMAT=text|json                 (json = one object per line)
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import deque
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+RESERVED_FIELDS = frozenset(("time", "level", "event"))  # Set by emit(); clashing fields get a "field_" prefix
+
+RING_SIZE = 2000  # Recent events kept in memory
+MAX_PENDING = 10000  # Unwritten events before the oldest are dropped
+FLUSH_INTERVAL = 0.5  # Seconds between writes
+
+
+def parse_sample_rates(spec):
+    """"input=0.1,spectator=0.5" -> {"input": 0.1, "spectator": 0.5}"""
+    rates = {}
+    for item in (spec or "").split(","):
+        event, _, rate = item.partition("=")
+        if event.strip() and rate.strip():
+            rates[event.strip()] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+class EventLog:
+    """Ring-buffered structured log with a background writer"""
+
+    def __init__(self, level=INFO, sample_rates=None, fmt="text", stream=None,
+                 ring_size=RING_SIZE, max_pending=MAX_PENDING, flush_interval=FLUSH_INTERVAL):
+        self.level = level
+        self.sample_rates = sample_rates or {}  # event -> fraction kept
+        self.fmt = fmt
+        self.stream = stream  # None = sys.stdout at write time
+        self.flush_interval = flush_interval
+        self.ring = deque(maxlen=ring_size)
+        self.pending = deque(maxlen=max_pending)
+        self.write_task = None
+
+        # Stats
+        self.emitted = 0
+        self.filtered = 0  # Below level
+        self.sampled_out = 0
+        self.dropped = 0  # Pushed out of a full pending queue before being written
+        self.written = 0
+
+    def configure(self, level=None, sample_rates=None, fmt=None):
+        if level is not None:
+            self.level = LEVELS[level] if isinstance(level, str) else level
+        if sample_rates is not None:
+            self.sample_rates = sample_rates
+        if fmt is not None:
+            self.fmt = fmt
+
+    def enabled(self, level):
+        """Cheap check callers can use before building expensive fields"""
+        return level >= self.level
+
+    def emit(self, level, event, /, **fields):
+        if level < self.level:
+            self.filtered += 1
+            return
+        rate = self.sample_rates.get(event)
+        if rate is not None and random.random() >= rate:
+            self.sampled_out += 1
+            return
+
+        if not RESERVED_FIELDS.isdisjoint(fields):
+            fields = {f"field_{key}" if key in RESERVED_FIELDS else key: value for key, value in fields.items()}
+        record = {"time": time.time(), "level": LEVEL_NAMES.get(level, str(level)), "event": event, **fields}
+        self.emitted += 1
+        self.ring.append(record)
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append(record)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._take())  # No event loop to block (scripts, startup)
+            return
+
+        # Start writer if not running (or left behind by a closed event loop)
+        if self.write_task is None or self.write_task.done() or self.write_task.get_loop() is not loop:
+            self.write_task = loop.create_task(self._writer())
+
+    def debug(self, event, /, **fields):
+        self.emit(DEBUG, event, **fields)
+
+    def info(self, event, /, **fields):
+        self.emit(INFO, event, **fields)
+
+    def warning(self, event, /, **fields):
+        self.emit(WARNING, event, **fields)
+
+    def error(self, event, /, **fields):
+        self.emit(ERROR, event, **fields)
+
+    def _take(self):
+        records = list(self.pending)
+        self.pending.clear()
+        return records
+
+    async def _writer(self):
+        while self.pending:
+            await asyncio.sleep(self.flush_interval)
+            records = self._take()
+            try:
+                await asyncio.to_thread(self._write, records)
+            except Exception as e:
+                # Nowhere better to report a broken log stream
+                sys.stderr.write(f"Event log write failed: {e}\n")
+
+    def _write(self, records):
+        if not records:
+            return
+        stream = self.stream or sys.stdout
+        stream.write("".join(self.format(record) + "\n" for record in records))
+        stream.flush()
+        self.written += len(records)
+
+    def format(self, record):
+        if self.fmt == "json":
+            return json.dumps(record, default=str)
+        fields = " ".join(f"{key}={value}" for key, value in record.items()
+                          if key not in ("time", "level", "event") and value is not None)
+        stamp = time.strftime("%H:%M:%S", time.localtime(record["time"]))
+        return f"{stamp} {record['level'].upper():7} {record['event']} {fields}".rstrip()
+
+    def recent(self, limit=100, level=DEBUG):
+        """Newest events from the ring buffer, oldest first"""
+        records = [record for record in self.ring if LEVELS.get(record["level"], 0) >= level]
+        return records[-limit:] if limit else []
+
+    def get_stats(self):
+        """Get event counts and writer backlog (for monitoring)"""
+        return {
+            'level': LEVEL_NAMES.get(self.level, self.level),
+            'sample_rates': self.sample_rates,
+            'emitted': self.emitted,
+            'filtered': self.filtered,
+            'sampled_out': self.sampled_out,
+            'dropped': self.dropped,
+            'written': self.written,
+            'pending': len(self.pending),
+            'ring': len(self.ring)
+        }
+
+
+# Shared by every session in this process
+event_log = EventLog()
@@ -0,0 +1,145 @@
+"""
+Headless max-speed simulation of a GameSession
+
+Runs the same physics, collision, telemetry and scoring code as the live
+server, but with no websocket and no sleeping: the session is stepped with a
+fixed dt as fast as the CPU allows, on a simulated clock.
+"""
+import argparse
+import time
+import uuid
+from game.physics import LanderBatch
+from game.session import GameSession
+from game.eventlog import EventLog, ERROR
+
+MAX_EPISODE_TIME = 300.0  # seconds of simulated time before giving up
+QUIET_LOG = EventLog(level=ERROR)  # Training runs do not log every input
+
+
+class SimClock:
+    """Fixed-step clock used in place of time.time()"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, dt):
+        self.now += dt
+
+
+def scripted(stream):
+    """Turn an input stream into a controller.
+
+    The stream yields one entry per control step: an action string, a list of
+    actions, or None for no input. Once exhausted no further inputs are sent.
+    """
+    inputs = iter(stream)
+
+    def controller(telemetry):
+        return next(inputs, None)
+
+    return controller
+
+
+class HeadlessGame:
+    """Single-player game stepped synchronously at a fixed dt"""
+
+    def __init__(self, difficulty="simple", fuel_mode="standard", telemetry_mode="advanced",
+                 update_rate=60, dt=1/60, max_time=MAX_EPISODE_TIME, terrain_seed=None):
+        self.dt = dt
+        self.max_time = max_time
+        self.clock = SimClock()
+        self.session = GameSession(
+            f"headless-{uuid.uuid4()}", None, difficulty, telemetry_mode, update_rate,
+            fuel_mode=fuel_mode, lander_batch=LanderBatch(capacity=1), clock=self.clock,
+            terrain_seed=terrain_seed, event_log=QUIET_LOG
+        )
+        self.session.record_replay = False
+        self.session.waiting = False
+        self.session.running = True
+        self.session.start_time = self.clock()
+        self.session.lander.active = True
+
+        # Controller is consulted at the same rate a live bot would get telemetry
+        self.frames_per_update = int(60 / self.session.update_rate)
+        self.done = False
+
+    def observe(self):
+        """Telemetry message exactly as the server would send it"""
+        return self.session.build_telemetry()
+
+    def apply(self, actions):
+        """Apply input actions (same vocabulary as websocket input messages)"""
+        if actions is None:
+            return
+        if isinstance(actions, str):
+            actions = [actions]
+        for action in actions:
+            self.session.handle_input(action)
+
+    def step(self, actions=None):
+        """Apply actions, advance one frame and return True once the game is over"""
+        self.apply(actions)
+        self.session.lander_batch.step(self.dt)
+        self.clock.advance(self.dt)
+        self.session.frame_count += 1
+        self.done = self.session.resolve_frame() or self.clock() >= self.max_time
+        return self.done
+
+    def run(self, controller):
+        """Play to completion; controller(telemetry) returns the actions to apply"""
+        if not callable(controller):
+            controller = scripted(controller)
+        while not self.done:
+            actions = None
+            if self.session.frame_count % self.frames_per_update == 0:
+                actions = controller(self.observe())
+            self.step(actions)
+        return self.result()
+
+    def result(self):
+        """Final result in the same shape as the single-player game_over message"""
+        session = self.session
+        elapsed_time = self.clock() - session.start_time
+        return {
+            "landed": session.lander.landed,
+            "crashed": session.lander.crashed,
+            "timed_out": not (session.lander.landed or session.lander.crashed),
+            "time": elapsed_time,
+            "fuel_remaining": session.lander.fuel,
+            "inputs": session.input_count,
+            "score": session.calculate_score(elapsed_time),
+            "frames": session.frame_count
+        }
+
+
+def run_episodes(controller_factory, episodes, **game_kwargs):
+    """Run several independent episodes, building a fresh controller for each"""
+    return [HeadlessGame(**game_kwargs).run(controller_factory()) for _ in range(episodes)]
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'bots'))
+    from simple_bot import SimpleBot
+
+    parser = argparse.ArgumentParser(description="Evaluate SimpleBot headlessly")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--difficulty", default="simple", choices=["simple", "medium", "hard"])
+    parser.add_argument("--fuel-mode", default="standard")
+    args = parser.parse_args()
+
+    start = time.time()
+    results = run_episodes(
+        lambda: SimpleBot(log_file=os.devnull).decide_action,
+        args.episodes, difficulty=args.difficulty, fuel_mode=args.fuel_mode
+    )
+    duration = time.time() - start
+
+    landed = sum(1 for r in results if r['landed'])
+    avg_score = sum(r['score'] for r in results) / max(1, len(results))
+    print(f"{args.episodes} episodes in {duration:.1f}s ({args.episodes / duration:.1f}/s)")
+    print(f"Landed: {landed}/{args.episodes} | Avg score: {avg_score:.0f}")
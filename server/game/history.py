@@ -0,0 +1,50 @@
+"""
+Trajectory history bundled into low-rate telemetry
+
+Requested with "history_samples": N in the start message. Every simulated
+tick between two telemetry messages is recorded, and the next message carries
+up to N of those states, evenly spaced and ending at the current frame, as
+column arrays:
+
+    "history": {"t": [...], "x": [...], "y": [...], "vx": [...], "vy": [...], "rotation": [...]}
+
+t is seconds since the game started. History is only added to JSON telemetry
+for the player who asked for it (not to binary frames or spectators).
+"""
+from collections import deque
+
+MAX_HISTORY_SAMPLES = 30
+MAX_BUFFERED_TICKS = 120  # Guard for a player who is never sent telemetry (2 s at 60 Hz)
+HISTORY_FIELDS = ('x', 'y', 'vx', 'vy', 'rotation')
+HISTORY_PRECISION = 3  # Decimal places kept per value
+
+
+class TrajectoryHistory:
+    """States simulated since the last telemetry message, downsampled on send"""
+
+    def __init__(self, samples, max_ticks=MAX_BUFFERED_TICKS):
+        self.samples = max(1, min(MAX_HISTORY_SAMPLES, int(samples)))
+        # Emptied by every bundle(), so a throttled session (longer gaps between
+        # messages) still gets its whole interval
+        self.states = deque(maxlen=max_ticks)  # (t, x, y, vx, vy, rotation)
+
+    def record(self, elapsed, snapshot):
+        """Record one tick; snapshot is a lander snapshot in SNAPSHOT_FIELDS order"""
+        self.states.append((elapsed,) + tuple(snapshot[:len(HISTORY_FIELDS)]))
+
+    def bundle(self):
+        """Column arrays for the states since the last call, then start over"""
+        states = list(self.states)
+        self.states.clear()
+
+        count = len(states)
+        if count > self.samples:
+            # Even spacing, always keeping the newest state
+            step = count / self.samples
+            states = [states[count - 1 - int(i * step)] for i in reversed(range(self.samples))]
+
+        columns = list(zip(*states)) or [()] * (len(HISTORY_FIELDS) + 1)
+        return {
+            name: [round(value, HISTORY_PRECISION) for value in column]
+            for name, column in zip(('t',) + HISTORY_FIELDS, columns)
+        }
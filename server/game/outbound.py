@@ -0,0 +1,124 @@
+"""
+Per-connection outbound queues
+
+Every websocket gets an OutboundQueue drained by its own writer task, so the
+tick loop only enqueues payloads and never waits on a slow receiver.
+Telemetry frames are latest-only: a new frame replaces one still waiting to be
+sent. Every other message (init, game_over, player_list, ...) is queued in
+order and never dropped; a client that stays backed up for too long is
+disconnected instead.
+"""
+import asyncio
+import time
+from collections import deque
+
+MAX_PENDING = 256  # Queued messages before a client counts as a slow consumer
+MAX_BACKLOG_SECONDS = 5.0  # How long a client may stay continuously backed up
+SLOW_CONSUMER_CLOSE_CODE = 1013  # "Try again later"
+
+
+class OutboundQueue:
+    """Bounded outbound queue for one websocket"""
+
+    def __init__(self, websocket, on_error=None, broadcaster=None,
+                 max_pending=MAX_PENDING, max_backlog=MAX_BACKLOG_SECONDS):
+        self.websocket = websocket
+        self.on_error = on_error  # Called with the queue when it gives up on the client
+        self.broadcaster = broadcaster
+        self.max_pending = max_pending
+        self.max_backlog = max_backlog
+        self.pending = deque()  # [payload, latest_only]
+        self.ready = asyncio.Event()
+        self.idle = asyncio.Event()  # Nothing pending and no send in flight
+        self.idle.set()
+        self.backed_up_since = None
+        self.closed = False
+        self.close_reason = None
+        self.task = None
+
+    def put(self, payload, latest_only=False):
+        """Queue a payload; returns False if the client has been dropped"""
+        if self.closed:
+            return False
+
+        if not self.idle.is_set():
+            # Writer has not caught up with the previous payload
+            now = time.monotonic()
+            if self.backed_up_since is None:
+                self.backed_up_since = now
+            elif now - self.backed_up_since > self.max_backlog:
+                self.abort("backed up for too long")
+                return False
+
+        if latest_only and self.pending and self.pending[-1][1]:
+            # Replace the unsent telemetry frame instead of queueing behind it
+            self.pending[-1][0] = payload
+            if self.broadcaster:
+                self.broadcaster.frames_replaced += 1
+        else:
+            if len(self.pending) >= self.max_pending:
+                self.abort("send queue full")
+                return False
+            self.pending.append([payload, latest_only])
+
+        self.idle.clear()
+        self.ready.set()
+
+        # Start writer task if not running
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return True
+
+    async def _run(self):
+        try:
+            while not self.closed:
+                if not self.pending:
+                    self.backed_up_since = None
+                    self.idle.set()
+                    self.ready.clear()
+                    await self.ready.wait()
+                    continue
+
+                payload, _ = self.pending.popleft()
+                if isinstance(payload, bytes):
+                    await self.websocket.send_bytes(payload)
+                else:
+                    await self.websocket.send_text(payload)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.abort(f"send failed: {e}", close=False)
+
+    def abort(self, reason, close=True):
+        """Stop sending to this client and hand it back to the owner to remove"""
+        if self.closed:
+            return
+        self.close_reason = reason
+        if close and self.broadcaster:
+            self.broadcaster.slow_consumers += 1
+        self.close()
+        if close:
+            asyncio.create_task(self._close_websocket())
+        if self.on_error:
+            self.on_error(self)
+
+    async def _close_websocket(self):
+        try:
+            await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except:
+            pass
+
+    def close(self):
+        """Stop the writer; anything still pending is discarded"""
+        self.closed = True
+        self.pending.clear()
+        self.idle.set()
+        if self.task and not self.task.done() and self.task is not asyncio.current_task():
+            self.task.cancel()
+
+    async def drain(self, timeout=None):
+        """Wait until everything queued so far has been sent"""
+        try:
+            await asyncio.wait_for(self.idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -1,4 +1,7 @@
 import math
+import weakref
+
+import numpy as np
 
 GRAVITY = 1.62  # m/s² (lunar gravity)
 THRUST_POWER = 8.0  # m/s² acceleration (increased for better control)
@@ -6,6 +9,11 @@ ROTATION_SPEED = 3.0  # radians/s
 INITIAL_FUEL = 1000.0
 FUEL_CONSUMPTION_RATE = 10.0  # units/s when thrusting
 
+# Landing tolerances
+MAX_LANDING_SPEED = 5.0  # Increased from 2.0 to 5.0
+MAX_LANDING_ANGLE = 0.3  # radians (~17 degrees)
+NOSE_LENGTH = 30  # Nose is the top of the triangle at -30 in local coords
+
 # Fuel presets for different game modes
 FUEL_PRESETS = {
     'unlimited': 1000.0,
@@ -14,81 +22,353 @@ FUEL_PRESETS = {
     'challenge': 150.0,  # ~15 seconds of thrust
 }
 
-class Lander:
-    def __init__(self, x=600, y=100, fuel_mode='standard'):
-        self.x = float(x)
-        self.y = float(y)
-        self.vx = 0.0
-        self.vy = 0.0
-        self.rotation = 0.0  # radians, 0 = pointing up
-        self.fuel = FUEL_PRESETS.get(fuel_mode, INITIAL_FUEL)
-        self.max_fuel = self.fuel  # Track max for percentage calculations
-        self.crashed = False
-        self.landed = False
-        
-    def update(self, dt, thrust, rotate):
-        if self.crashed or self.landed:
-            return
-            
+# Order of values in Lander.snapshot() tuples
+SNAPSHOT_FIELDS = ('x', 'y', 'vx', 'vy', 'rotation', 'fuel', 'crashed', 'landed')
+
+# Rotation input encoded as a direction sign (-1 left, 0 none, 1 right)
+ROTATE_CODES = {"left": -1, "right": 1}
+ROTATE_NAMES = {-1: "left", 0: None, 1: "right"}
+
+
+class LanderBatch:
+    """Struct-of-arrays storage and vectorized stepping for many landers.
+
+    Each lander owns one row. All rows on the server can be stepped with a
+    single call to step() instead of one Python update per lander.
+    """
+
+    FLOAT_FIELDS = ('x', 'y', 'vx', 'vy', 'rotation', 'fuel', 'max_fuel', 'prev_x', 'prev_y')
+    BOOL_FIELDS = ('crashed', 'landed', 'thrust', 'active', 'in_use')
+
+    def __init__(self, capacity=64):
+        self.capacity = 0
+        for name in self.FLOAT_FIELDS:
+            setattr(self, name, np.zeros(0, dtype=np.float64))
+        for name in self.BOOL_FIELDS:
+            setattr(self, name, np.zeros(0, dtype=bool))
+        self.rotate = np.zeros(0, dtype=np.int8)
+        self._free_rows = []
+        self._grow(max(1, capacity))
+
+    def _grow(self, new_capacity):
+        """Grow every column to new_capacity rows (existing rows keep their index)"""
+        extra = new_capacity - self.capacity
+        for name in self.FLOAT_FIELDS + self.BOOL_FIELDS + ('rotate',):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros(extra, dtype=column.dtype)]))
+        # Hand out low rows first
+        self._free_rows.extend(range(new_capacity - 1, self.capacity - 1, -1))
+        self.capacity = new_capacity
+
+    def allocate(self, x, y, fuel):
+        """Reserve a row for a new lander and return its index"""
+        if not self._free_rows:
+            self._grow(self.capacity * 2)
+        row = self._free_rows.pop()
+        self.x[row] = x
+        self.y[row] = y
+        self.prev_x[row] = x
+        self.prev_y[row] = y
+        self.vx[row] = 0.0
+        self.vy[row] = 0.0
+        self.rotation[row] = 0.0
+        self.fuel[row] = fuel
+        self.max_fuel[row] = fuel
+        self.crashed[row] = False
+        self.landed[row] = False
+        self.thrust[row] = False
+        self.rotate[row] = 0
+        self.active[row] = False
+        self.in_use[row] = True
+        return row
+
+    def release(self, row):
+        """Return a row to the free list (called when its Lander is collected)"""
+        if self.in_use[row]:
+            self.in_use[row] = False
+            self.active[row] = False
+            self._free_rows.append(row)
+
+    def __len__(self):
+        return self.capacity - len(self._free_rows)
+
+    def set_controls(self, row, thrust, rotate):
+        self.thrust[row] = bool(thrust)
+        self.rotate[row] = ROTATE_CODES.get(rotate, 0)
+
+    def snapshot(self, row):
+        """State of one row as a tuple of Python values in SNAPSHOT_FIELDS order"""
+        return (
+            self.x.item(row),
+            self.y.item(row),
+            self.vx.item(row),
+            self.vy.item(row),
+            self.rotation.item(row),
+            self.fuel.item(row),
+            self.crashed.item(row),
+            self.landed.item(row)
+        )
+
+    def row_state(self, row):
+        """Every column of one row as plain Python values (for session snapshots)"""
+        state = {name: getattr(self, name).item(row) for name in self.FLOAT_FIELDS + self.BOOL_FIELDS}
+        del state['in_use']
+        state['rotate'] = self.rotate.item(row)
+        return state
+
+    def load_row_state(self, row, state):
+        """Overwrite one row with a row_state() dict"""
+        for name in self.FLOAT_FIELDS + self.BOOL_FIELDS + ('rotate',):
+            if name in state and name != 'in_use':
+                getattr(self, name)[row] = state[name]
+
+    def live_rows(self):
+        """Rows that are active in a running game and still flying"""
+        return np.flatnonzero(self.active & ~self.crashed & ~self.landed)
+
+    def step(self, dt, rows=None):
+        """Advance the given rows (default: every live row) by dt seconds"""
+        if rows is None:
+            rows = self.live_rows()
+        else:
+            rows = np.asarray(rows, dtype=np.intp)
+            rows = rows[~self.crashed[rows] & ~self.landed[rows]]
+        if rows.size == 0:
+            return rows
+
         # Apply rotation
-        if rotate == "left":
-            self.rotation -= ROTATION_SPEED * dt
-        elif rotate == "right":
-            self.rotation += ROTATION_SPEED * dt
-        
+        rotation = self.rotation[rows] + self.rotate[rows] * (ROTATION_SPEED * dt)
+
         # Normalize rotation to -pi to pi
-        while self.rotation > math.pi:
-            self.rotation -= 2 * math.pi
-        while self.rotation < -math.pi:
-            self.rotation += 2 * math.pi
-            
+        while True:
+            over = rotation > math.pi
+            if not over.any():
+                break
+            rotation[over] -= 2 * math.pi
+        while True:
+            under = rotation < -math.pi
+            if not under.any():
+                break
+            rotation[under] += 2 * math.pi
+
+        vx = self.vx[rows]
+        vy = self.vy[rows]
+        fuel = self.fuel[rows]
+
         # Apply thrust
-        if thrust and self.fuel > 0:
-            thrust_x = math.sin(self.rotation) * THRUST_POWER * dt
-            thrust_y = -math.cos(self.rotation) * THRUST_POWER * dt
-            self.vx += thrust_x
-            self.vy += thrust_y
-            self.fuel -= FUEL_CONSUMPTION_RATE * dt
-            self.fuel = max(0, self.fuel)
-            
+        thrusting = self.thrust[rows] & (fuel > 0)
+        if thrusting.any():
+            vx = vx + np.where(thrusting, np.sin(rotation) * THRUST_POWER * dt, 0.0)
+            vy = vy + np.where(thrusting, -np.cos(rotation) * THRUST_POWER * dt, 0.0)
+            fuel = np.where(thrusting, np.maximum(fuel - FUEL_CONSUMPTION_RATE * dt, 0.0), fuel)
+
         # Apply gravity
-        self.vy += GRAVITY * dt
-        
-        # Update position
-        self.x += self.vx * dt
-        self.y += self.vy * dt
-        
-    def check_collision(self, terrain_y, is_landing_zone=False):
-        # Check collision for nose (top of triangle at -30 in local coords)
-        nose_x = self.x
-        nose_y = self.y - 30 * math.cos(self.rotation)
-        
+        vy = vy + GRAVITY * dt
+
+        self.rotation[rows] = rotation
+        self.vx[rows] = vx
+        self.vy[rows] = vy
+        self.fuel[rows] = fuel
+
+        # Update position (keeping where this tick started for swept collision)
+        x = self.x[rows]
+        y = self.y[rows]
+        self.prev_x[rows] = x
+        self.prev_y[rows] = y
+        self.x[rows] = x + vx * dt
+        self.y[rows] = y + vy * dt
+        return rows
+
+    def check_collisions(self, rows, terrain_y, is_landing_zone):
+        """Resolve terrain contact for rows given the terrain height under each"""
+        rows = np.asarray(rows, dtype=np.intp)
+        terrain_y = np.asarray(terrain_y, dtype=np.float64)
+        is_landing_zone = np.asarray(is_landing_zone, dtype=bool)
+
+        y = self.y[rows]
+        rotation = self.rotation[rows]
+
         # Check collision for bottom or nose
-        if self.y >= terrain_y or nose_y >= terrain_y:
-            speed = math.sqrt(self.vx**2 + self.vy**2)
-            angle_upright = abs(self.rotation) < 0.3  # ~17 degrees
-            angle_degrees = abs(self.rotation) * 180 / math.pi
-            
-            import time
-            timestamp = time.time()
-            
-            if is_landing_zone and angle_upright and speed < 5.0:  # Increased from 2.0 to 5.0
-                self.landed = True
-                self.y = terrain_y
-                self.vx = 0
-                self.vy = 0
-            else:
-                self.crashed = True
-                self.y = terrain_y
-                
+        nose_y = y - NOSE_LENGTH * np.cos(rotation)
+        hit = (y >= terrain_y) | (nose_y >= terrain_y)
+        if not hit.any():
+            return
+
+        self._settle(rows[hit], terrain_y[hit], is_landing_zone[hit])
+
+    def resolve_terrain_contact(self, rows, terrain):
+        """Swept collision of each row's path this tick against the terrain polyline.
+
+        The lower of the lander's bottom and nose is moved in a straight line
+        from its position at the start of the tick to its current position and
+        intersected with every terrain segment it passes over, so fast landers
+        cannot tunnel through peaks between ticks. Rows that touch down are
+        moved to the exact point of impact. Returns the time of impact as a
+        fraction of the tick (inf for rows that did not touch).
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        toi = np.full(rows.size, np.inf)
+        if rows.size == 0:
+            return toi
+
+        x0 = self.prev_x[rows]
+        x1 = self.x[rows]
+        # Contact point is whichever of bottom or nose is lower
+        offset = np.maximum(0.0, -NOSE_LENGTH * np.cos(self.rotation[rows]))
+        c0 = self.prev_y[rows] + offset
+        c1 = self.y[rows] + offset
+
+        # Nothing near the highest peak - no contact possible
+        if (np.maximum(c0, c1) < terrain.top_y).all():
+            return toi
+
+        xs = terrain._xs
+        ys = terrain._ys
+        dx = x1 - x0
+        dc = c1 - c0
+        last_segment = terrain.num_segments - 1
+        seg0 = np.clip((np.clip(x0, xs[0], xs[-1]) - xs[0]) // terrain.segment_width, 0, last_segment).astype(np.int64)
+        seg1 = np.clip((np.clip(x1, xs[0], xs[-1]) - xs[0]) // terrain.segment_width, 0, last_segment).astype(np.int64)
+        direction = np.where(dx < 0, -1, 1)
+        span = np.abs(seg1 - seg0)
+        pending = np.ones(rows.size, dtype=bool)
+
+        # Walk the segments under each path in travel order; first hit wins
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for k in range(int(span.max()) + 1):
+                current = pending & (k <= span)
+                if not current.any():
+                    break
+                j = np.clip(seg0 + k * direction, 0, last_segment)
+                xa = xs[j]
+                xb = xs[j + 1]
+                slope = (ys[j + 1] - ys[j]) / (xb - xa)
+
+                # Part of the tick during which the path is over segment j
+                ta = (xa - x0) / dx
+                tb = (xb - x0) / dx
+                vertical = dx == 0
+                t_lo = np.where(vertical, 0.0, np.minimum(ta, tb))
+                t_hi = np.where(vertical, 1.0, np.maximum(ta, tb))
+                over = np.where(vertical, (x0 >= xa) & (x0 <= xb), (t_hi >= 0) & (t_lo <= 1))
+                t_lo = np.clip(t_lo, 0.0, 1.0)
+                t_hi = np.clip(t_hi, 0.0, 1.0)
+
+                # Penetration depth g(t) = a + b*t is linear along the segment
+                a = c0 - (ys[j] + slope * (x0 - xa))
+                b = dc - slope * dx
+                g_lo = a + b * t_lo
+                g_hi = a + b * t_hi
+                hit_lo = g_lo >= 0
+                hit_mid = ~hit_lo & (g_hi >= 0)
+                hit = current & over & (hit_lo | hit_mid)
+
+                toi[hit] = np.where(hit_lo, t_lo, -a / b)[hit]
+                pending &= ~hit
+
+        hit = np.isfinite(toi)
+        if hit.any():
+            x_hit = x0[hit] + toi[hit] * dx[hit]
+            hit_rows = rows[hit]
+            self.x[hit_rows] = x_hit
+            is_landing, _ = terrain.landing_zone_mask(x_hit)
+            self._settle(hit_rows, terrain.get_heights_at(x_hit), is_landing)
+        return toi
+
+    def _settle(self, rows, terrain_y, is_landing_zone):
+        """Land or crash rows that touched the terrain"""
+        speed = np.sqrt(self.vx[rows] ** 2 + self.vy[rows] ** 2)
+        angle_upright = np.abs(self.rotation[rows]) < MAX_LANDING_ANGLE
+        landed = is_landing_zone & angle_upright & (speed < MAX_LANDING_SPEED)
+
+        landed_rows = rows[landed]
+        self.landed[landed_rows] = True
+        self.vx[landed_rows] = 0.0
+        self.vy[landed_rows] = 0.0
+        self.crashed[rows[~landed]] = True
+        self.y[rows] = terrain_y
+
+
+def _float_column(name):
+    def fget(self):
+        return getattr(self._batch, name).item(self._row)
+
+    def fset(self, value):
+        getattr(self._batch, name)[self._row] = value
+
+    return property(fget, fset)
+
+
+def _bool_column(name):
+    def fget(self):
+        return getattr(self._batch, name).item(self._row)
+
+    def fset(self, value):
+        getattr(self._batch, name)[self._row] = bool(value)
+
+    return property(fget, fset)
+
+
+# Process-wide batch shared by every session so one step() covers all landers
+shared_batch = LanderBatch()
+
+
+class Lander:
+    """Thin view onto one row of a LanderBatch"""
+
+    __slots__ = ('_batch', '_row', '__weakref__')
+
+    def __init__(self, x=600, y=100, fuel_mode='standard', batch=None):
+        self._batch = batch if batch is not None else shared_batch
+        self._row = self._batch.allocate(float(x), float(y), FUEL_PRESETS.get(fuel_mode, INITIAL_FUEL))
+        # Free the row once nothing references this lander
+        weakref.finalize(self, self._batch.release, self._row)
+
+    x = _float_column('x')
+    y = _float_column('y')
+    vx = _float_column('vx')
+    vy = _float_column('vy')
+    rotation = _float_column('rotation')  # radians, 0 = pointing up
+    fuel = _float_column('fuel')
+    max_fuel = _float_column('max_fuel')  # Track max for percentage calculations
+    crashed = _bool_column('crashed')
+    landed = _bool_column('landed')
+    active = _bool_column('active')  # Stepped by LanderBatch.step() without explicit rows
+
+    @property
+    def batch(self):
+        return self._batch
+
+    @property
+    def row(self):
+        return self._row
+
+    def set_controls(self, thrust, rotate):
+        """Store the inputs used by LanderBatch.step() for this lander"""
+        self._batch.set_controls(self._row, thrust, rotate)
+
+    def update(self, dt, thrust, rotate):
+        if self.crashed or self.landed:
+            return
+        self.set_controls(thrust, rotate)
+        self._batch.step(dt, [self._row])
+
+    def check_collision(self, terrain_y, is_landing_zone=False):
+        self._batch.check_collisions([self._row], [terrain_y], [is_landing_zone])
+
+    def snapshot(self):
+        """Current state as a tuple in SNAPSHOT_FIELDS order (no dict allocation)"""
+        return self._batch.snapshot(self._row)
+
     def to_dict(self):
-        return {
-            "x": self.x,
-            "y": self.y,
-            "vx": self.vx,
-            "vy": self.vy,
-            "rotation": self.rotation,
-            "fuel": self.fuel,
-            "crashed": self.crashed,
-            "landed": self.landed
-        }
+        # A dict literal from the snapshot tuple (serializers call this once per player per frame)
+        x, y, vx, vy, rotation, fuel, crashed, landed = self._batch.snapshot(self._row)
+        return {'x': x, 'y': y, 'vx': vx, 'vy': vy, 'rotation': rotation,
+                'fuel': fuel, 'crashed': crashed, 'landed': landed}
+
+    def save_state(self):
+        """Full state including controls and previous position (see LanderBatch.row_state)"""
+        return self._batch.row_state(self._row)
+
+    def load_state(self, state):
+        self._batch.load_row_state(self._row, state)
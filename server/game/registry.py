@@ -0,0 +1,140 @@
+"""
+Session registry with status indexes and a deadline-driven reaper
+
+Replaces scanning every session on each lobby request. The registry keeps a
+set of session ids per status (waiting / playing / finished), updated when a
+session changes state, and a heap of cleanup deadlines drained by one
+background task:
+
+- finished games are removed SESSION_TIMEOUT seconds after they started
+- waiting rooms with no players left are removed right away
+"""
+import asyncio
+import heapq
+import time
+
+SESSION_TIMEOUT = 600  # Seconds after start before a finished game is removed
+REAPER_MAX_SLEEP = 5.0  # Upper bound on the reaper's sleep between checks
+STATUSES = ("waiting", "playing", "finished")
+
+
+class SessionRegistry:
+    """Dict of session_id -> GameSession with status indexes and a reaper"""
+
+    def __init__(self, timeout=SESSION_TIMEOUT, on_reap=None, clock=None):
+        self.timeout = timeout
+        self.on_reap = on_reap  # Called with each session the reaper removes
+        self.clock = clock if clock is not None else time.time
+        self.sessions = {}
+        self.status = {}  # session_id -> status it is indexed under
+        self.by_status = {status: set() for status in STATUSES}
+        self.deadlines = []  # Heap of (deadline, session_id); stale entries are skipped
+        self.wakeup = asyncio.Event()
+        self.reaper_task = None
+        self.reaped = 0
+
+    # Mapping interface used by main.py
+    def __setitem__(self, session_id, session):
+        self.sessions[session_id] = session
+        self.update(session)
+
+    def __getitem__(self, session_id):
+        return self.sessions[session_id]
+
+    def __delitem__(self, session_id):
+        del self.sessions[session_id]
+        self.by_status[self.status.pop(session_id)].discard(session_id)
+
+    def __contains__(self, session_id):
+        return session_id in self.sessions
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(self.sessions)
+
+    def get(self, session_id, default=None):
+        return self.sessions.get(session_id, default)
+
+    def values(self):
+        return self.sessions.values()
+
+    def items(self):
+        return self.sessions.items()
+
+    def update(self, session):
+        """Re-index a session after a state change and schedule its cleanup if due"""
+        session_id = session.session_id
+        if session_id not in self.sessions:
+            return
+        status = session.status
+        previous = self.status.get(session_id)
+        if previous != status:
+            if previous:
+                self.by_status[previous].discard(session_id)
+            self.by_status[status].add(session_id)
+            self.status[session_id] = status
+
+        deadline = self._deadline(session, self.clock())
+        if deadline is not None:
+            heapq.heappush(self.deadlines, (deadline, session_id))
+            self.wakeup.set()
+
+            # Start reaper if not running
+            if self.reaper_task is None or self.reaper_task.done():
+                self.reaper_task = asyncio.create_task(self._run())
+
+    def _deadline(self, session, now):
+        """When a session should be removed, or None while it is in use"""
+        if session.status == "finished":
+            return session.start_time + self.timeout
+        if session.waiting and not session.players:
+            return now
+        return None
+
+    def ids(self, status):
+        """Ids of the sessions currently in a status"""
+        return self.by_status[status]
+
+    def count(self, status):
+        return len(self.by_status[status])
+
+    def reap(self):
+        """Remove every session whose deadline has passed; returns how many"""
+        now = self.clock()
+        removed = 0
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, session_id = heapq.heappop(self.deadlines)
+            session = self.sessions.get(session_id)
+            # Skip entries for sessions that were removed or became active again
+            deadline = self._deadline(session, now) if session is not None else None
+            if deadline is None or deadline > now:
+                continue
+            del self[session_id]
+            removed += 1
+            if self.on_reap:
+                self.on_reap(session)
+        self.reaped += removed
+        return removed
+
+    async def _run(self):
+        while self.deadlines:
+            self.reap()
+            if not self.deadlines:
+                break
+            delay = min(max(0.0, self.deadlines[0][0] - self.clock()), REAPER_MAX_SLEEP)
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self):
+        """Get session counts by status and reaper state (for monitoring)"""
+        return {
+            'sessions': len(self.sessions),
+            **{status: len(ids) for status, ids in self.by_status.items()},
+            'pending_deadlines': len(self.deadlines),
+            'reaped': self.reaped
+        }
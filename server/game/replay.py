@@ -1,6 +1,7 @@
 import json
 import gzip
 import time
+from game.physics import SNAPSHOT_FIELDS
 
 class ReplayRecorder:
     def __init__(self, session_id, user_id, difficulty):
@@ -20,25 +21,36 @@ class ReplayRecorder:
     def set_terrain(self, terrain_data):
         """Store terrain data for replay"""
         self.metadata["terrain"] = terrain_data
+        # Seed regenerates the same terrain via the terrain pool
+        self.metadata["terrain_seed"] = terrain_data.get("seed")
         
     def record_frame(self, lander_state, terrain_height, altitude, speed, thrusting):
         """Record a single frame of game state at 30Hz with quantization"""
+        self.record_snapshot(
+            tuple(lander_state[field] for field in SNAPSHOT_FIELDS),
+            terrain_height, altitude, speed, thrusting
+        )
+    
+    def record_snapshot(self, snapshot, terrain_height, altitude, speed, thrusting):
+        """Record a frame from a Lander.snapshot() tuple at 30Hz with quantization"""
         self.frame_counter += 1
         
         # Only record every other frame (30Hz instead of 60Hz)
         if self.frame_counter % 2 != 0:
             return
         
+        x, y, vx, vy, rotation, fuel, crashed, landed = snapshot
+        
         # Quantize values to reduce size
         quantized_lander = {
-            "x": round(lander_state["x"], 1),
-            "y": round(lander_state["y"], 1),
-            "vx": round(lander_state["vx"], 2),
-            "vy": round(lander_state["vy"], 2),
-            "rotation": round(lander_state["rotation"], 2),
-            "fuel": round(lander_state["fuel"]),
-            "crashed": lander_state["crashed"],
-            "landed": lander_state["landed"]
+            "x": round(x, 1),
+            "y": round(y, 1),
+            "vx": round(vx, 2),
+            "vy": round(vy, 2),
+            "rotation": round(rotation, 2),
+            "fuel": round(fuel),
+            "crashed": crashed,
+            "landed": landed
         }
         
         self.frames.append({
@@ -69,6 +81,20 @@ class ReplayRecorder:
             "frames": self.frames
         }
         
+    def save_state(self):
+        """Recording so far, to continue it in a restored session"""
+        return {**self.to_dict(), "frame_counter": self.frame_counter}
+    
+    @classmethod
+    def load_state(cls, state):
+        """Recorder continuing a save_state() recording"""
+        metadata = state["metadata"]
+        recorder = cls(metadata["session_id"], metadata["user_id"], metadata["difficulty"])
+        recorder.metadata = metadata
+        recorder.frames = state["frames"]
+        recorder.frame_counter = state["frame_counter"]
+        return recorder
+        
     def to_json(self):
         """Convert replay to JSON string"""
         return json.dumps(self.to_dict())
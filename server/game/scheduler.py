@@ -0,0 +1,147 @@
+"""
+Process-wide tick scheduler driving every running GameSession
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from game.broadcast import broadcaster as shared_broadcaster
+from game.eventlog import event_log
+
+LOAD_WINDOW = 10  # Seconds of tick samples kept for load measurement
+
+
+class TickScheduler:
+    """Drives all registered sessions from one monotonic-deadline loop.
+
+    Each tick steps every lander batch once, then calls session.tick(dt, publish)
+    for each session. publish is True on every divisor-th tick of that session,
+    which is how per-session telemetry rates (update_rate) are applied.
+    throttle() can raise a session's divisor under load (game/admission.py).
+    """
+
+    def __init__(self, tick_rate=60, max_catchup_ticks=5, broadcaster=None):
+        self.tick_rate = tick_rate
+        self.broadcaster = broadcaster if broadcaster is not None else shared_broadcaster
+        self.dt = 1.0 / tick_rate
+        self.max_catchup_ticks = max_catchup_ticks
+        self.sessions = {}  # session -> [divisor, frames since registration, registered divisor]
+        self.run_task = None
+
+        # Timing stats (for monitoring)
+        self.tick_count = 0
+        self.late_ticks = 0
+        self.ticks_dropped = 0
+        self.max_lag = 0.0
+
+        # Recent samples for load measurement (about LOAD_WINDOW seconds of ticks)
+        self.tick_times = deque(maxlen=LOAD_WINDOW * tick_rate)  # Seconds spent in each tick
+        self.loop_lags = deque(maxlen=LOAD_WINDOW * tick_rate)  # How late each sleep woke up
+
+    def register(self, session, divisor=1):
+        """Start ticking a session; its output is published every divisor ticks"""
+        divisor = max(1, int(divisor))
+        self.sessions[session] = [divisor, 0, divisor]
+
+        # Start tick loop if not running
+        if self.run_task is None or self.run_task.done():
+            self.run_task = asyncio.create_task(self._run())
+
+    def unregister(self, session):
+        self.sessions.pop(session, None)
+
+    def throttle(self, session, max_rate=None):
+        """Publish a session's output at most max_rate times per second (None restores its own rate)"""
+        entry = self.sessions.get(session)
+        if entry is None:
+            return
+        divisor = entry[2]
+        if max_rate:
+            divisor = max(divisor, math.ceil(self.tick_rate / max_rate))
+        entry[0] = divisor
+
+    def load(self):
+        """p99 tick time and event-loop lag over the recent window, in seconds"""
+        return {
+            'tick_p99': percentile(self.tick_times, 0.99),
+            'loop_lag_p99': percentile(self.loop_lags, 0.99)
+        }
+
+    async def _run(self):
+        # Samples from an earlier run say nothing about the current load
+        self.tick_times.clear()
+        self.loop_lags.clear()
+        deadline = time.monotonic()
+        while self.sessions:
+            now = time.monotonic()
+            if now < deadline:
+                await asyncio.sleep(deadline - now)
+                now = time.monotonic()
+                if now < deadline:
+                    continue  # Woke up early - sleep the rest
+            else:
+                # Still yield so websocket handlers get to run while we are behind
+                await asyncio.sleep(0)
+
+            lag = now - deadline
+            self.loop_lags.append(lag)  # Late sleeps and ticks that started behind
+            self.max_lag = max(self.max_lag, lag)
+            behind = int(lag // self.dt)
+            if behind:
+                self.late_ticks += 1
+            if behind >= self.max_catchup_ticks:
+                # Too far behind to catch up - drop the backlog and resync
+                self.ticks_dropped += behind
+                deadline = now
+                behind = 0
+
+            # Run the due tick plus any missed ones back-to-back
+            for _ in range(behind + 1):
+                start = time.perf_counter()
+                await self._tick()
+                self.tick_times.append(time.perf_counter() - start)
+                deadline += self.dt
+
+    async def _tick(self):
+        self.tick_count += 1
+        entries = list(self.sessions.items())
+
+        # One vectorized physics step for every lander on the server
+        for batch in {session.lander_batch for session, _ in entries}:
+            batch.step(self.dt)
+
+        for session, entry in entries:
+            divisor, frame, _ = entry
+            entry[1] = frame + 1
+            try:
+                await session.tick(self.dt, frame % divisor == 0)
+            except Exception as e:
+                event_log.error("tick_error", session=session.get_session_info(), error=str(e))
+                session.stop()
+        
+        self.broadcaster.end_tick()
+
+    def get_stats(self):
+        """Get scheduler timing stats (for monitoring)"""
+        return {
+            'tick_rate': self.tick_rate,
+            'sessions': len(self.sessions),
+            'ticks': self.tick_count,
+            'late_ticks': self.late_ticks,
+            'ticks_dropped': self.ticks_dropped,
+            'max_lag_ms': round(self.max_lag * 1000, 2),
+            'p99_tick_ms': round(percentile(self.tick_times, 0.99) * 1000, 2),
+            'p99_loop_lag_ms': round(percentile(self.loop_lags, 0.99) * 1000, 2)
+        }
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a sequence of numbers (0.0 if empty)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# Shared by every session in this process
+scheduler = TickScheduler()
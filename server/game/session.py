@@ -2,14 +2,65 @@ import asyncio
 import time
 import json
 import math
-from game.physics import Lander
-from game.terrain import Terrain
+import secrets
+from game.physics import Lander, SNAPSHOT_FIELDS, shared_batch
+from game.terrain import terrain_pool
 from game.replay import ReplayRecorder
+from game.scheduler import scheduler as shared_scheduler
+from game.broadcast import broadcaster as shared_broadcaster
+from game.broadcast import PROTOCOL_LEGACY, PROTOCOL_SPLIT, PROTOCOL_BINARY, splice_json
+from game.spectator_hub import spectator_hub as shared_spectator_hub
+from game.binary_telemetry import encode_telemetry
+from game.binary_input import decode_input
+from game.history import TrajectoryHistory
+from game.outbound import OutboundQueue
+from game.eventlog import event_log as shared_event_log, DEBUG, INFO, WARNING
+from game.snapshot import SNAPSHOT_VERSION, token_matches
 from metrics.game_metrics import GameMetrics
-from metrics.collector import MetricsCollector
+from metrics.collector import collector as shared_collector
+
+FLUSH_TIMEOUT = 2.0  # Max seconds to wait for queued messages to go out at game end
+
+# Session lifecycle: a room waits in the lobby until start_game(), then plays
+# until stop(); a waiting room can also be closed straight away
+STATE_TRANSITIONS = {
+    "waiting": ("playing", "finished"),
+    "playing": ("finished",),
+    "finished": ()
+}
+
+# Player fields carried over by snapshot() (the lander and connection are handled separately)
+PLAYER_SNAPSHOT_FIELDS = ('thrust', 'rotate', 'name', 'color', 'status', 'finish_time', 'protocol', 'input_tick')
+
+def calculate_score(lander, elapsed_time, difficulty):
+    """Calculate score based on landing success, fuel, time, and difficulty"""
+    if lander.crashed:
+        return 0
+    
+    if not lander.landed:
+        return 0
+    
+    # Base score for successful landing
+    score = 1000
+    
+    # Fuel bonus (up to 500 points)
+    fuel_bonus = int((lander.fuel / 1000) * 500)
+    score += fuel_bonus
+    
+    # Time bonus (faster = better, up to 300 points)
+    # Assume 60s is slow, 20s is fast
+    time_bonus = max(0, int(300 - (elapsed_time - 20) * 5))
+    score += time_bonus
+    
+    # Difficulty multiplier
+    multipliers = {"simple": 1.0, "medium": 1.5, "hard": 2.0}
+    multiplier = multipliers.get(difficulty, 1.0)
+    score = int(score * multiplier)
+    
+    return score
 
 class GameSession:
-    def __init__(self, session_id, websocket, difficulty="simple", telemetry_mode="standard", update_rate=60, room_name=None, fuel_mode="standard"):
+    def __init__(self, session_id, websocket, difficulty="simple", telemetry_mode="standard", update_rate=60, room_name=None, fuel_mode="standard", lander_batch=None, scheduler=None, clock=None, terrain_seed=None, broadcaster=None, spectator_hub=None, metrics_collector=None, event_log=None):
         self.session_id = session_id
         self.websocket = websocket
         self.difficulty = difficulty
@@ -17,6 +68,12 @@ class GameSession:
         self.update_rate = update_rate  # Hz: 60 for humans/bots, 2-10 for LLMs
         self.room_name = room_name
         self.fuel_mode = fuel_mode  # "standard", "limited", "challenge"
+        self.lander_batch = lander_batch if lander_batch is not None else shared_batch
+        self.scheduler = scheduler if scheduler is not None else shared_scheduler
+        self.clock = clock if clock is not None else time.time  # Simulated in headless runs
+        self.broadcaster = broadcaster if broadcaster is not None else shared_broadcaster
+        self.spectator_hub = spectator_hub if spectator_hub is not None else shared_spectator_hub
+        self.event_log = event_log if event_log is not None else shared_event_log
         
         # Multiplayer support - players dictionary
         self.players = {}
@@ -24,14 +81,16 @@ class GameSession:
         # Backward compatibility - create default player
         default_player_id = "default"
         self.players[default_player_id] = {
-            'lander': Lander(fuel_mode=fuel_mode),
+            'lander': Lander(fuel_mode=fuel_mode, batch=self.lander_batch),
             'thrust': False,
             'rotate': None,
             'websocket': websocket,
             'name': 'Player',
             'color': '#00ff00',
             'status': 'playing',  # playing, crashed, landed
-            'finish_time': None
+            'finish_time': None,
+            'protocol': PROTOCOL_LEGACY,
+            'input_tick': None  # Last client tick sent with a binary input
         }
         
         # Keep reference for backward compatibility
@@ -39,16 +98,25 @@ class GameSession:
         self.current_thrust = False
         self.current_rotate = None
         
-        self.terrain = Terrain(difficulty=difficulty)
-        self.running = False
-        self.waiting = True  # New: waiting for game to start
+        # Seeded terrains are shared through the pool; unseeded games get a fresh random one
+        self.terrain = terrain_pool.get(difficulty, terrain_seed)
+        self.running = False  # True from start() until stop()
+        self.state = "waiting"  # See STATE_TRANSITIONS
+        self._state_changed = asyncio.Event()  # Set (and replaced) on every transition
         self.start_time = None
         self.input_count = 0
         self.last_update = time.time()
         self.user_id = "anonymous"
         self.replay = None
         self.record_replay = True  # Enable replay recording
-        self.spectators = []  # List of spectator websockets
+        self.static_version = 1  # Bumped whenever terrain/landing zones change
+        self.outbound = {}  # Websocket -> OutboundQueue (one writer task per connection)
+        self.connections_closed = False  # Set by close_connections() once the game is handed over
+        self.frame_count = 0  # Frames published to players
+        self.tick_count = 0  # Scheduler ticks since the game started
+        self.history = None  # TrajectoryHistory if the player asked for bundled states
+        self.on_change = None  # Called with the session when its lobby status changes
+        self.elapsed_at_snapshot = None  # Game time a restored session resumes from
         
         # Bot metadata (optional, for future leaderboard/registration)
         self.bot_name = None
@@ -62,9 +130,59 @@ class GameSession:
             'rotation_changes': 0,
             'last_rotate': None
         }
-        self._metrics_collector = MetricsCollector()
+        self._metrics_collector = metrics_collector if metrics_collector is not None else shared_collector
         self._game_metrics = None
     
+    @property
+    def status(self):
+        """Lobby status: waiting, playing or finished"""
+        return self.state
+    
+    @property
+    def waiting(self):
+        """True while the room is in the lobby"""
+        return self.state == "waiting"
+    
+    @waiting.setter
+    def waiting(self, value):
+        if not value:
+            self.start_game()
+    
+    def _enter(self, state):
+        """Move to a new lifecycle state and wake everything waiting on a transition"""
+        if state == self.state:
+            return
+        if state not in STATE_TRANSITIONS[self.state]:
+            raise RuntimeError(f"Invalid session transition {self.state} -> {state}")
+        self.state = state
+        self._state_changed.set()
+        self._state_changed = asyncio.Event()
+        self._changed()
+    
+    async def wait_for_state(self, *states):
+        """Wait (without polling) until the session is in one of states"""
+        while self.state not in states:
+            await self._state_changed.wait()
+    
+    def summary(self):
+        """Compact description for the session directory (lobby listings)"""
+        return {
+            "id": self.session_id,
+            "name": self.room_name or self.session_id[:8],
+            "player_count": len(self.players),
+            "difficulty": self.difficulty,
+            "status": self.status,
+            "user_id": self.user_id,
+            "spectators": self.spectator_count,
+            "start_time": self.start_time
+        }
+    
+    def log(self, level, event, /, **fields):
+        """Structured log event tagged with this session (see game/eventlog.py)"""
+        if self.event_log.enabled(level):
+            self.event_log.emit(level, event, session=self.session_id, room=self.room_name,
+                                players=len(self.players), **fields)
+    
     def get_session_info(self):
         """Get formatted session info for logging"""
         mode = "multiplayer" if len(self.players) > 1 else "single-player"
@@ -76,132 +194,401 @@ class GameSession:
     async def start(self):
         self.running = True
         # Don't set waiting = False here - let start_game() do it
-        self.start_time = time.time()
+        self.start_time = self.clock()
         
         # Initialize replay recorder
         if self.record_replay:
             self.replay = ReplayRecorder(self.session_id, self.user_id, self.difficulty)
             self.replay.set_terrain(self.terrain.to_dict())
+        
+        # Spectators can join from now on
+        self.publish_spectator_init()
+        self._changed()
             
         await self.game_loop()
     
+    def enable_history(self, samples):
+        """Bundle up to `samples` states simulated since the last message into each telemetry message"""
+        self.history = TrajectoryHistory(samples)
+    
     def start_game(self):
-        """Start the game (called by room creator)"""
-        self.waiting = False
+        """Start the game (called by room creator); the loop picks it up on the next tick"""
+        if self.state == "waiting":
+            self._enter("playing")
         
     async def game_loop(self):
         
-        # Wait for game to start
-        while self.waiting and self.running:
-            await asyncio.sleep(0.1)
+        # Wait for game to start (or the room to be closed) - no CPU while idle
+        await self.wait_for_state("playing", "finished")
         
-        if not self.running:
+        if self.state == "finished":
             return
         
         
         # Game has started - reset start time for accurate timing
-        self.start_time = time.time()
-            
-        target_fps = 60
-        dt = 1.0 / target_fps
-        frame_count = 0
+        self.start_time = self.clock()
+        self.frame_count = 0
+        self.tick_count = 0
+        
+        # Let the shared scheduler step our landers and drive tick()
+        for player in self.players.values():
+            player['lander'].active = True
+        frames_per_update = int(60 / self.update_rate)
+        self.scheduler.register(self, divisor=frames_per_update)
+        try:
+            await self.wait_for_state("finished")
+        finally:
+            self.scheduler.unregister(self)
         
-        while self.running:
-            loop_start = time.time()
-            
-            # Skip physics simulation while waiting
-            if self.waiting:
-                await asyncio.sleep(0.1)
-                continue
-            
-            # Update physics for all players
-            for player_id, player in self.players.items():
-                lander = player['lander']
-                
-                # Skip if player is already done
-                if player['status'] != 'playing':
-                    continue
-                    
-                lander.update(dt, player['thrust'], player['rotate'])
-                
-                # Check collision
-                terrain_y = self.terrain.get_height_at(lander.x)
-                is_landing, multiplier = self.terrain.is_landing_zone(lander.x)
-                lander.check_collision(terrain_y, is_landing)
-                
-                # Check bounds
-                if lander.x < 0 or lander.x > self.terrain.width:
-                    lander.crashed = True
-                
-                # Update player status
-                if lander.crashed:
-                    if player['status'] == 'playing':  # Only record time on first crash
-                        player['finish_time'] = time.time() - self.start_time
-                    player['status'] = 'crashed'
-                elif lander.landed:
-                    if player['status'] == 'playing':  # Only record time on first landing
-                        player['finish_time'] = time.time() - self.start_time
-                    player['status'] = 'landed'
-            
-            # Update backward compatibility references (use first player)
-            if self.players:
-                first_player = next(iter(self.players.values()))
-                self.lander = first_player['lander']
-                self.current_thrust = first_player['thrust']
-                self.current_rotate = first_player['rotate']
-            
-            # Calculate altitude and speed for replay (backward compatibility)
-            terrain_height = self.terrain.get_height_at(self.lander.x)
-            altitude = terrain_height - self.lander.y
-            speed = math.sqrt(self.lander.vx**2 + self.lander.vy**2)
-            
-            # MINIMAL metrics tracking (4 comparisons, 1 increment per frame)
-            if self.lander.y > self._metrics['max_alt']:
-                self._metrics['max_alt'] = self.lander.y
-            if self.lander.y < self._metrics['min_alt']:
-                self._metrics['min_alt'] = self.lander.y
-            if speed > self._metrics['max_speed']:
-                self._metrics['max_speed'] = speed
-            if self.current_thrust:
-                self._metrics['thrust_frames'] += 1
-            
-            # Record frame for replay
-            if self.replay:
-                self.replay.record_frame(self.lander.to_dict(), terrain_height, altitude, speed, self.current_thrust)
+        # Let queued telemetry and game_over reach clients before handlers close
+        await self.flush()
+    
+    async def tick(self, dt, send_to_player):
+        """Run one frame after the scheduler has stepped physics for our landers"""
+        if not self.running:
+            self.stop()
+            return
+        
+        if self.resolve_frame():
+            # Send final telemetry with all player states
+            await self.send_telemetry(send_to_spectators=True)
+            await self.send_game_over()
+            self.stop()
+            return
+        
+        # Players get telemetry at their update_rate (applied by the scheduler),
+        # the spectator hub whenever one of its rate tiers is due
+        to_spectators = bool(self.spectator_hub.due_rates(self.session_id, self.tick_count))
+        if send_to_player or to_spectators:
+            await self.send_telemetry(to_spectators, send_to_player, spectator_tick=self.tick_count)
+        if send_to_player:
+            self.frame_count += 1
+        self.tick_count += 1
+    
+    def stop(self):
+        """End the game loop and stop stepping this session's landers"""
+        self.running = False
+        for player in self.players.values():
+            player['lander'].active = False
+        self.scheduler.unregister(self)
+        self.spectator_hub.close_channel(self.session_id)
+        self._enter("finished")
+    
+    def snapshot(self):
+        """JSON-serializable state of a running game, to continue it with restore().
+        
+        Terrain is stored as its seed. Every player gets a new resume_token
+        they must present to reclaim their lander after the move.
+        """
+        players = {}
+        for player_id, player in self.players.items():
+            players[player_id] = {
+                **{key: player[key] for key in PLAYER_SNAPSHOT_FIELDS},
+                'lander': player['lander'].save_state(),
+                'resume_token': secrets.token_urlsafe(16)
+            }
+        return {
+            'version': SNAPSHOT_VERSION,
+            'session_id': self.session_id,
+            'difficulty': self.difficulty,
+            'telemetry_mode': self.telemetry_mode,
+            'update_rate': self.update_rate,
+            'room_name': self.room_name,
+            'fuel_mode': self.fuel_mode,
+            'terrain_seed': self.terrain.seed,
+            'user_id': self.user_id,
+            'bot_name': self.bot_name,
+            'bot_version': getattr(self, 'bot_version', None),
+            'bot_author': getattr(self, 'bot_author', None),
+            'elapsed': self.clock() - self.start_time,
+            'input_count': self.input_count,
+            'frame_count': self.frame_count,
+            'tick_count': self.tick_count,
+            'metrics': dict(self._metrics),
+            'history_samples': self.history.samples if self.history else 0,
+            'replay': self.replay.save_state() if self.replay else None,
+            'players': players
+        }
+    
+    @classmethod
+    def restore(cls, snapshot, **kwargs):
+        """Rebuild a snapshot() as a paused game; resume() continues it.
+        
+        Players have no connection until they come back through reconnect_player().
+        """
+        session = cls(snapshot['session_id'], None, snapshot['difficulty'], snapshot['telemetry_mode'],
+                      snapshot['update_rate'], room_name=snapshot['room_name'], fuel_mode=snapshot['fuel_mode'],
+                      terrain_seed=snapshot['terrain_seed'], **kwargs)
+        session.players = {}
+        for player_id, state in snapshot['players'].items():
+            lander = Lander(fuel_mode=snapshot['fuel_mode'], batch=session.lander_batch)
+            lander.load_state(state['lander'])
+            lander.active = False
+            session.players[player_id] = {**state, 'lander': lander, 'websocket': None}
+        first_player = next(iter(session.players.values()))
+        session.lander = first_player['lander']
+        session.current_thrust = first_player['thrust']
+        session.current_rotate = first_player['rotate']
+        
+        session.user_id = snapshot['user_id']
+        session.bot_name = snapshot['bot_name']
+        session.bot_version = snapshot['bot_version']
+        session.bot_author = snapshot['bot_author']
+        session.state = "playing"
+        session.elapsed_at_snapshot = snapshot['elapsed']
+        session.start_time = session.clock() - snapshot['elapsed']
+        session.input_count = snapshot['input_count']
+        session.frame_count = snapshot['frame_count']
+        session.tick_count = snapshot['tick_count']
+        session._metrics.update(snapshot['metrics'])
+        if snapshot['history_samples']:
+            session.enable_history(snapshot['history_samples'])
+        if snapshot['replay']:
+            session.replay = ReplayRecorder.load_state(snapshot['replay'])
+        return session
+    
+    def resume(self):
+        """Continue a restored game; the scheduler steps it from its next tick"""
+        if self.running or self.state != "playing":
+            return
+        self.running = True
+        # Time spent moving between workers does not count as flight time
+        self.start_time = self.clock() - self.elapsed_at_snapshot
+        for player in self.players.values():
+            player['lander'].active = player['status'] == 'playing'
+        self.scheduler.register(self, divisor=int(60 / self.update_rate))
+        self.publish_spectator_init()
+        self._changed()
+    
+    def reconnect_player(self, player_id, resume_token, websocket):
+        """Hand a restored player their lander back; False unless the snapshot's token matches"""
+        player = self.players.get(player_id)
+        if not token_matches(player, resume_token):
+            return False
+        if player['websocket'] is not None:
+            self._close_outbound(player['websocket'])
+        player['websocket'] = websocket
+        if player['lander'] is self.lander:
+            self.websocket = websocket
+        return True
+    
+    async def hand_over(self, snapshot, timeout=FLUSH_TIMEOUT):
+        """Send each connected player the migrate message for a saved snapshot(), then end
+        the game here and close every player and spectator connection's writer"""
+        for player_id, player in snapshot['players'].items():
+            websocket = self.players[player_id]['websocket']
+            if websocket is not None:
+                await self.send_to(websocket, {
+                    "type": "migrate",
+                    "room_id": self.session_id,
+                    "player_id": player_id,
+                    "resume_token": player['resume_token']
+                })
+        self.stop()
+        await self.flush(timeout=timeout)
+        self.close_connections()
+    
+    def close_connections(self):
+        """Stop every outbound writer task; nothing more is sent to players or spectators"""
+        self.connections_closed = True
+        for websocket in list(self.outbound):
+            self._close_outbound(websocket)
+        self.spectator_hub.disconnect(self.session_id)
+    
+    def _changed(self):
+        if self.on_change:
+            self.on_change(self)
+    
+    async def wait_finished(self):
+        """Wait until the game has ended"""
+        await self.wait_for_state("finished")
+    
+    def resolve_frame(self):
+        """Collisions, player status, metrics and replay for the frame just stepped.
+        
+        Returns True once all players are done.
+        """
+        playing = [player for player in self.players.values() if player['status'] == 'playing']
+        if playing:
+            rows = [player['lander'].row for player in playing]
             
-            # Check game over - only when ALL players are done
-            all_players_done = all(player['status'] != 'playing' for player in self.players.values())
+            # Check collision along each lander's path this tick
+            self.lander_batch.resolve_terrain_contact(rows, self.terrain)
+        
+        for player in playing:
+            lander = player['lander']
             
-            if all_players_done:
-                # Send final telemetry with all player states
-                await self.send_telemetry(send_to_spectators=True)
-                await self.send_game_over()
-                self.running = False
-                break
-                
-            # Send telemetry at configured rate
-            # Calculate how often to send based on update_rate
-            frames_per_update = int(60 / self.update_rate)
-            send_to_player = (frame_count % frames_per_update == 0)
-            send_to_spectators = (frame_count % 2 == 0)
+            # Check bounds
+            if lander.x < 0 or lander.x > self.terrain.width:
+                lander.crashed = True
             
-            if send_to_player:
-                await self.send_telemetry(send_to_spectators)
-            frame_count += 1
+            # Update player status
+            if lander.crashed:
+                player['finish_time'] = self.clock() - self.start_time
+                player['status'] = 'crashed'
+            elif lander.landed:
+                player['finish_time'] = self.clock() - self.start_time
+                player['status'] = 'landed'
+            if player['status'] != 'playing':
+                lander.active = False
+        
+        # Update backward compatibility references (use first player)
+        if self.players:
+            first_player = next(iter(self.players.values()))
+            self.lander = first_player['lander']
+            self.current_thrust = first_player['thrust']
+            self.current_rotate = first_player['rotate']
+        
+        # Calculate altitude and speed for replay (backward compatibility)
+        snapshot = self.lander.snapshot()
+        x, y, vx, vy = snapshot[:4]
+        terrain_height = self.terrain.get_height_at(x)
+        altitude = terrain_height - y
+        speed = math.sqrt(vx**2 + vy**2)
+        
+        # MINIMAL metrics tracking (4 comparisons, 1 increment per frame)
+        if y > self._metrics['max_alt']:
+            self._metrics['max_alt'] = y
+        if y < self._metrics['min_alt']:
+            self._metrics['min_alt'] = y
+        if speed > self._metrics['max_speed']:
+            self._metrics['max_speed'] = speed
+        if self.current_thrust:
+            self._metrics['thrust_frames'] += 1
+        
+        # Record frame for the next bundled history
+        if self.history:
+            self.history.record(self.clock() - self.start_time, snapshot)
+        
+        # Record frame for replay
+        if self.replay:
+            self.replay.record_snapshot(snapshot, terrain_height, altitude, speed, self.current_thrust)
+        
+        # Check game over - only when ALL players are done
+        return all(player['status'] != 'playing' for player in self.players.values())
             
-            # Sleep to maintain 60Hz
-            elapsed = time.time() - loop_start
-            sleep_time = max(0, dt - elapsed)
-            await asyncio.sleep(sleep_time)
+    async def send_telemetry(self, send_to_spectators=True, send_to_players=True, spectator_tick=None):
+        """Send this tick's telemetry to players and/or the spectator hub.
+        
+        The hub applies spectator rate tiers for spectator_tick (None = every tier).
+        """
+        message = self.build_telemetry(PROTOCOL_SPLIT)
+        
+        if send_to_players:
+            player_message = message
+            if self.history:
+                player_message = {**message, "history": self.history.bundle()}
             
-    async def send_telemetry(self, send_to_spectators=True):
+            # Encoded once per protocol; legacy recipients get the cached static JSON spliced in
+            frame = self.broadcaster.frame(player_message, {
+                PROTOCOL_LEGACY: lambda message: splice_json(message, self.static_json()),
+                PROTOCOL_BINARY: encode_telemetry
+            }, latest_only=True)
+            await self.broadcast(frame, spectators=False)
+        
+        if send_to_spectators:
+            self.spectator_hub.publish(self.session_id, "telemetry", message, spectator_tick)
+    
+    async def broadcast(self, frame, players=True, spectators=True, protocols=None):
+        """Send a frame to players (each in its protocol's format) and/or spectators.
+        
+        If protocols is given, players using any other protocol are skipped.
+        Spectators get the message through the spectator hub.
+        """
+        if players:
+            for player in list(self.players.values()):
+                protocol = player['protocol']
+                if player['websocket'] is None:
+                    continue  # Restored player who has not reconnected yet
+                if protocols is None or protocol in protocols:
+                    self.enqueue(player['websocket'], frame.payload(protocol), frame.latest_only)
+        
+        if spectators:
+            self.spectator_hub.publish(self.session_id, "event", frame.message)
+    
+    async def send_to(self, websocket, message):
+        """Send a JSON message to one connection, in order with its broadcasts"""
+        self.enqueue(websocket, self.broadcaster.frame(message).payload())
+    
+    def enqueue(self, websocket, payload, latest_only=False):
+        """Queue a payload on a connection's outbound queue (never waits on the client)"""
+        if self.connections_closed:
+            return False
+        queue = self.outbound.get(websocket)
+        if queue is None:
+            queue = OutboundQueue(websocket, on_error=self._drop_connection, broadcaster=self.broadcaster)
+            self.outbound[websocket] = queue
+        return queue.put(payload, latest_only)
+    
+    def _drop_connection(self, queue):
+        """Remove the player whose outbound queue gave up"""
+        self.log(WARNING, "connection_dropped", reason=queue.close_reason)
+        for player_id, player in list(self.players.items()):
+            if player['websocket'] is queue.websocket:
+                self.remove_player(player_id)
+                return
+    
+    def _close_outbound(self, websocket):
+        queue = self.outbound.pop(websocket, None)
+        if queue:
+            queue.close()
+    
+    async def flush(self, websocket=None, timeout=FLUSH_TIMEOUT):
+        """Wait (up to timeout) for queued messages to one or all connections to be sent"""
+        if websocket is not None:
+            queues = [self.outbound[websocket]] if websocket in self.outbound else []
+        else:
+            queues = list(self.outbound.values())
+        if queues:
+            await asyncio.gather(*(queue.drain(timeout) for queue in queues))
+        if websocket is None:
+            await self.spectator_hub.flush(self.session_id, timeout=timeout)
+    
+    def static_fields(self):
+        """Terrain data that legacy clients get in every telemetry message"""
+        return {
+            "terrain": self.terrain.to_dict(),
+            "all_landing_zones": self.terrain.landing_zones
+        }
+    
+    def static_json(self):
+        """static_fields() as JSON members, reusing the terrain's cached encoding"""
+        return f'"terrain": {self.terrain.to_json()}, "all_landing_zones": {json.dumps(self.terrain.landing_zones)}'
+    
+    async def set_terrain(self, terrain):
+        """Replace the terrain and push it to clients that only get static data on change"""
+        self.terrain = terrain
+        self.static_version += 1
+        if self.replay:
+            self.replay.set_terrain(terrain.to_dict())
+        
+        frame = self.broadcaster.frame({
+            "type": "static",
+            "static_version": self.static_version,
+            **self.static_fields()
+        })
+        
+        # Legacy clients pick the new terrain up from the next telemetry message
+        await self.broadcast(frame, spectators=False, protocols=(PROTOCOL_SPLIT, PROTOCOL_BINARY))
+        self.spectator_hub.publish(self.session_id, "static", frame.message)
+    
+    @property
+    def spectator_count(self):
+        return self.spectator_hub.count(self.session_id)
+    
+    def build_telemetry(self, protocol=PROTOCOL_LEGACY):
+        """Build the telemetry message for the current frame in the given protocol"""
+        # Read the first player's state once (no per-field attribute lookups)
+        snapshot = self.lander.snapshot()
+        x, y, vx, vy, rotation, fuel = snapshot[:6]
+        
         # Find nearest landing zone (using first player for backward compatibility)
         nearest_zone = None
         min_distance = float('inf')
         
         for zone in self.terrain.landing_zones:
             zone_center_x = (zone['x1'] + zone['x2']) / 2
-            distance = abs(self.lander.x - zone_center_x)
+            distance = abs(x - zone_center_x)
             if distance < min_distance:
                 min_distance = distance
                 nearest_zone = {
@@ -211,55 +598,58 @@ class GameSession:
                     'y': zone['y'],
                     'width': zone['x2'] - zone['x1'],
                     'distance': distance,
-                    'direction': 'left' if zone_center_x < self.lander.x else 'right'
+                    'direction': 'left' if zone_center_x < x else 'right'
                 }
         
         # Calculate actual altitude above terrain
-        terrain_height = self.terrain.get_height_at(self.lander.x)
-        altitude_above_terrain = terrain_height - self.lander.y
+        terrain_height = self.terrain.get_height_at(x)
+        altitude_above_terrain = terrain_height - y
         
         # Calculate total speed
-        import math
-        speed = math.sqrt(self.lander.vx**2 + self.lander.vy**2)
-        
-        # Collect all players' states
-        players_data = {}
-        for player_id, player in self.players.items():
-            lander = player['lander']
-            players_data[player_id] = {
-                'lander': lander.to_dict(),
-                'name': player['name'],
-                'color': player['color'],
-                'thrusting': player['thrust'],
-                'status': player['status']
-            }
+        speed = math.sqrt(vx**2 + vy**2)
         
         # Standard telemetry (always included)
         message = {
             "type": "telemetry",
-            "timestamp": time.time(),
-            "terrain": self.terrain.to_dict(),
+            "timestamp": self.clock(),
+            "static_version": self.static_version,
             "terrain_height": terrain_height,
             "altitude": altitude_above_terrain,
             "speed": speed,
             "thrusting": self.current_thrust,
             "nearest_landing_zone": nearest_zone,
-            "all_landing_zones": self.terrain.landing_zones,
-            "spectator_count": len(self.spectators)
+            "spectator_count": self.spectator_count
         }
         
+        if protocol == PROTOCOL_LEGACY:
+            message.update(self.static_fields())
+        
         # Single-player vs multiplayer format
         if len(self.players) == 1 and 'default' in self.players:
             # Send single-player format (backward compatible)
-            message['lander'] = self.players['default']['lander'].to_dict()
+            message['lander'] = dict(zip(SNAPSHOT_FIELDS, snapshot))
+            input_tick = self.players['default']['input_tick']
+            if input_tick is not None:
+                message['input_tick'] = input_tick
         else:
-            # Send multiplayer format
+            # Send multiplayer format with all players' states
+            players_data = {}
+            for player_id, player in self.players.items():
+                players_data[player_id] = {
+                    'lander': player['lander'].to_dict(),
+                    'name': player['name'],
+                    'color': player['color'],
+                    'thrusting': player['thrust'],
+                    'status': player['status']
+                }
+                if player['input_tick'] is not None:
+                    players_data[player_id]['input_tick'] = player['input_tick']
             message['players'] = players_data
         
         # Advanced telemetry (only for AI clients)
         if self.telemetry_mode == "advanced":
-            elapsed_time = time.time() - self.start_time
-            angle_degrees = abs(self.lander.rotation) * 180 / math.pi
+            elapsed_time = self.clock() - self.start_time
+            angle_degrees = abs(rotation) * 180 / math.pi
             is_safe_speed = speed < 5.0
             is_safe_angle = angle_degrees < 17.0
             
@@ -268,7 +658,7 @@ class GameSession:
             landing_zone_center_x = None
             if nearest_zone:
                 zone = nearest_zone
-                is_over_landing_zone = zone['x1'] <= self.lander.x <= zone['x2']
+                is_over_landing_zone = zone['x1'] <= x <= zone['x2']
                 landing_zone_center_x = zone['center_x']
             
             # Estimate score if landed now
@@ -279,9 +669,9 @@ class GameSession:
             # Predict time to ground (simple physics, no thrust)
             time_to_ground = None
             impact_speed = None
-            if self.lander.vy > 0 and altitude_above_terrain > 0:
+            if vy > 0 and altitude_above_terrain > 0:
                 a = 1.62  # lunar gravity
-                v = self.lander.vy
+                v = vy
                 d = altitude_above_terrain
                 discriminant = v*v + 2*a*d
                 if discriminant >= 0:
@@ -295,35 +685,20 @@ class GameSession:
                 "is_safe_speed": is_safe_speed,
                 "is_safe_angle": is_safe_angle,
                 "angle_degrees": angle_degrees,
-                "vertical_speed": self.lander.vy,
-                "horizontal_speed": self.lander.vx,
+                "vertical_speed": vy,
+                "horizontal_speed": vx,
                 "elapsed_time": elapsed_time,
-                "fuel_remaining_percent": self.lander.fuel / 1000.0,
+                "fuel_remaining_percent": fuel / 1000.0,
                 "estimated_score": estimated_score,
                 "max_possible_score": int(1800 * (2.0 if self.difficulty == "hard" else 1.5 if self.difficulty == "medium" else 1.0)),
                 "time_to_ground": time_to_ground,
                 "impact_speed": impact_speed
             })
         
-        # Send to all players
-        for player_id, player in list(self.players.items()):
-            try:
-                await player['websocket'].send_text(json.dumps(message))
-            except:
-                # Remove player if websocket is closed
-                self.remove_player(player_id)
-        
-        # Send to spectators (30Hz when send_to_spectators=True)
-        if send_to_spectators:
-            for spectator_ws in self.spectators[:]:  # Copy list to avoid modification during iteration
-                try:
-                    await spectator_ws.send_text(json.dumps(message))
-                except:
-                    if spectator_ws in self.spectators:
-                        self.spectators.remove(spectator_ws)
+        return message
         
     async def send_game_over(self):
-        elapsed_time = time.time() - self.start_time
+        elapsed_time = self.clock() - self.start_time
         
         # Calculate final speed and altitude
         terrain_height = self.terrain.get_height_at(self.lander.x)
@@ -349,7 +724,8 @@ class GameSession:
             # Single-player format (backward compatible)
             score = self.calculate_score(elapsed_time)
             status = "LANDED" if self.lander.landed else "CRASHED"
-            print(f"{self.get_session_info()} Game ended: {status} | Score: {score} | Time: {elapsed_time:.1f}s | Fuel: {self.lander.fuel:.0f}")
+            self.log(INFO, "game_over", player="default", status=status.lower(), score=score,
+                     elapsed=round(elapsed_time, 1), fuel=round(self.lander.fuel))
             
             # Finalize and save metrics (async, non-blocking)
             await self._finalize_metrics(elapsed_time, score, speed, angle, altitude)
@@ -381,9 +757,9 @@ class GameSession:
                 })
             
             # Log multiplayer results
-            print(f"{self.get_session_info()} Game ended:")
             for result in sorted(players_results, key=lambda x: x['score'], reverse=True):
-                print(f"  {result['player_name']}: {result['status'].upper()} | Score: {result['score']} | Time: {result['time']:.1f}s")
+                self.log(INFO, "game_over", player=result['player_name'], status=result['status'],
+                         score=result['score'], elapsed=round(result['time'], 1))
             
             # Finalize metrics for default player
             score = self.calculate_score(elapsed_time)
@@ -396,20 +772,8 @@ class GameSession:
                 "replay_id": replay_id
             }
         
-        # Send to all players
-        for player_id, player in list(self.players.items()):
-            try:
-                await player['websocket'].send_text(json.dumps(message))
-            except:
-                # Remove player if websocket is closed
-                self.remove_player(player_id)
-        
-        # Send to all spectators
-        for spectator_ws in self.spectators[:]:
-            try:
-                await spectator_ws.send_text(json.dumps(message))
-            except:
-                pass
+        # Send to all players and spectators
+        await self.broadcast(self.broadcaster.frame(message))
     
     async def _finalize_metrics(self, elapsed_time, score, speed, angle, altitude):
         """Finalize and save game metrics (async, non-blocking)"""
@@ -458,62 +822,18 @@ class GameSession:
     
     def calculate_score(self, elapsed_time):
         """Calculate score based on landing success, fuel, time, and difficulty"""
-        if self.lander.crashed:
-            return 0
-        
-        if not self.lander.landed:
-            return 0
-        
-        # Base score for successful landing
-        score = 1000
-        
-        # Fuel bonus (up to 500 points)
-        fuel_bonus = int((self.lander.fuel / 1000) * 500)
-        score += fuel_bonus
-        
-        # Time bonus (faster = better, up to 300 points)
-        # Assume 60s is slow, 20s is fast
-        time_bonus = max(0, int(300 - (elapsed_time - 20) * 5))
-        score += time_bonus
-        
-        # Difficulty multiplier
-        multipliers = {"simple": 1.0, "medium": 1.5, "hard": 2.0}
-        multiplier = multipliers.get(self.difficulty, 1.0)
-        score = int(score * multiplier)
-        
-        return score
+        return calculate_score(self.lander, elapsed_time, self.difficulty)
     
     def calculate_player_score(self, lander, elapsed_time):
         """Calculate score for a specific player's lander"""
-        if lander.crashed:
-            return 0
-        
-        if not lander.landed:
-            return 0
+        return calculate_score(lander, elapsed_time, self.difficulty)
         
-        # Base score for successful landing
-        score = 1000
-        
-        # Fuel bonus (up to 500 points)
-        fuel_bonus = int((lander.fuel / 1000) * 500)
-        score += fuel_bonus
-        
-        # Time bonus (faster = better, up to 300 points)
-        # Assume 60s is slow, 20s is fast
-        time_bonus = max(0, int(300 - (elapsed_time - 20) * 5))
-        score += time_bonus
-        
-        # Difficulty multiplier
-        multipliers = {"simple": 1.0, "medium": 1.5, "hard": 2.0}
-        multiplier = multipliers.get(self.difficulty, 1.0)
-        score = int(score * multiplier)
-        
-        return score
-        
-    async def send_initial_state(self):
-        message = {
+    def build_init(self):
+        """Build the init message (terrain, lander and game constants)"""
+        return {
             "type": "init",
-            "terrain": self.terrain.to_dict(),
+            "static_version": self.static_version,
+            **self.static_fields(),
             "lander": self.lander.to_dict(),
             "constants": {
                 "gravity": 1.62,
@@ -526,21 +846,21 @@ class GameSession:
                 "terrain_height": 800
             }
         }
-        
-        # Send to all players
-        for player_id, player in list(self.players.items()):
-            try:
-                await player['websocket'].send_text(json.dumps(message))
-            except:
-                # Remove player if websocket is closed
-                self.remove_player(player_id)
-        
-        # Send to all spectators
-        for spectator_ws in self.spectators[:]:
-            try:
-                await spectator_ws.send_text(json.dumps(message))
-            except:
-                self.spectators.remove(spectator_ws)
+    
+    async def send_initial_state(self):
+        await self.broadcast(self.broadcaster.frame(self.build_init()), spectators=False)
+        self.publish_spectator_init()
+    
+    def publish_spectator_init(self):
+        """Give the spectator hub the init message for current and late-joining spectators"""
+        message = self.build_init()
+        message["spectator_count"] = self.spectator_count
+        
+        # Multiplayer spectators get every player's lander
+        if len(self.players) > 1:
+            del message["lander"]
+            message["players"] = {pid: p['lander'].to_dict() for pid, p in self.players.items()}
+        self.spectator_hub.publish(self.session_id, "init", message)
     
     async def send_player_list(self):
         """Send current player list to all players"""
@@ -559,12 +879,7 @@ class GameSession:
         }
         
         # Send to all players
-        for player_id, player in list(self.players.items()):
-            try:
-                await player['websocket'].send_text(json.dumps(message))
-            except:
-                # Remove player if websocket is closed
-                self.remove_player(player_id)
+        await self.broadcast(self.broadcaster.frame(message), spectators=False)
         
     def handle_input(self, action, player_id="default"):
         self.input_count += 1
@@ -583,53 +898,73 @@ class GameSession:
         elif action == 'rotate_stop':
             self._metrics['last_rotate'] = None
         
-        # Only log state changes, not every input
+        previous = (player['thrust'], player['rotate'])
         if action == "thrust" or action == "thrust_on":
-            if not player['thrust']:
-                print(f"{self.get_session_info()} THRUST ON (Player: {player_id})")
             player['thrust'] = True
         elif action == "thrust_off":
-            if player['thrust']:
-                print(f"{self.get_session_info()} THRUST OFF (Player: {player_id})")
             player['thrust'] = False
         elif action == "rotate_left":
-            if player['rotate'] != "left":
-                print(f"{self.get_session_info()} ROTATE LEFT (Player: {player_id})")
             player['rotate'] = "left"
         elif action == "rotate_right":
-            if player['rotate'] != "right":
-                print(f"{self.get_session_info()} ROTATE RIGHT (Player: {player_id})")
             player['rotate'] = "right"
         elif action == "rotate_stop":
-            if player['rotate'] is not None:
-                print(f"{self.get_session_info()} ROTATE STOP (Player: {player_id})")
             player['rotate'] = None
         
+        # Only log state changes, not every input (debug level, off by default)
+        if (player['thrust'], player['rotate']) != previous:
+            self.log(DEBUG, "input", player=player_id, action=action)
+        
+        player['lander'].set_controls(player['thrust'], player['rotate'])
+        
         # Update backward compatibility references if this is the default player
         if player_id == "default":
             self.current_thrust = player['thrust']
             self.current_rotate = player['rotate']
     
-    def add_player(self, player_id, websocket, name, color):
+    def handle_binary_input(self, payload, player_id="default"):
+        """Apply a compact binary input (game/binary_input.py) as the player's full control state"""
+        thrust, rotate, client_tick = decode_input(payload)
+        
+        if player_id not in self.players:
+            player_id = "default"
+        player = self.players[player_id]
+        if client_tick is not None:
+            player['input_tick'] = client_tick
+        
+        # Only changes go through handle_input, so logging and metrics match JSON inputs
+        if thrust != player['thrust']:
+            self.handle_input("thrust_on" if thrust else "thrust_off", player_id)
+        if rotate != player['rotate']:
+            self.handle_input(f"rotate_{rotate}" if rotate else "rotate_stop", player_id)
+    
+    def add_player(self, player_id, websocket, name, color, protocol=PROTOCOL_LEGACY):
         """Add a new player to the game session"""
         self.players[player_id] = {
-            'lander': Lander(),
+            'lander': Lander(batch=self.lander_batch),
             'thrust': False,
             'rotate': None,
             'websocket': websocket,
             'name': name,
             'color': color,
             'status': 'playing',
-            'finish_time': None
+            'finish_time': None,
+            'protocol': protocol,
+            'input_tick': None
         }
-        print(f"{self.get_session_info()} Player {player_id} ({name}) joined")
+        # Joining a game in progress - start stepping right away
+        if self in self.scheduler.sessions:
+            self.players[player_id]['lander'].active = True
+        self.log(INFO, "player_joined", player=player_id, name=name)
+        self._changed()
     
     def remove_player(self, player_id):
         """Remove a player from the game session"""
         if player_id in self.players:
             player_name = self.players[player_id]['name']
+            self.players[player_id]['lander'].active = False
+            self._close_outbound(self.players[player_id]['websocket'])
             del self.players[player_id]
-            print(f"{self.get_session_info()} Player {player_id} ({player_name}) left")
+            self.log(INFO, "player_left", player=player_id, name=player_name)
             
             # Send updated player list to remaining players
             if self.players:
@@ -644,3 +979,5 @@ class GameSession:
                 self.current_thrust = first_player['thrust']
                 self.current_rotate = first_player['rotate']
                 self.websocket = first_player['websocket']
+            
+            self._changed()
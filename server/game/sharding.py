@@ -0,0 +1,59 @@
+"""
+Room-affinity sharding across worker processes
+
+In sharded mode each worker process owns the sessions it creates. The owning
+shard is encoded in the first two hex digits of every session id (and so of
+every replay id, which starts with the session id), so a reverse proxy can
+route /ws?room=<id>, /spectate/<id> and /replay/<id> to the right worker
+with a plain prefix match and no shared state. New games can go to any
+worker.
+
+Run the workers with `python shards.py --workers N`, which can also print the
+matching nginx config.
+"""
+import re
+import uuid
+
+MAX_SHARDS = 256  # Two hex digits
+
+
+def new_session_id(shard_index=0):
+    """Random session id whose first two hex digits are shard_index"""
+    return f"{shard_index:02x}{str(uuid.uuid4())[2:]}"
+
+
+def shard_of(session_id, shard_count):
+    """Index of the shard owning a session or replay id, or None if it is not one of ours"""
+    if not isinstance(session_id, str) or not re.match(r'^[0-9a-f]{2}', session_id):
+        return None
+    shard = int(session_id[:2], 16)
+    return shard if shard < shard_count else None
+
+
+def nginx_config(shard_count, base_port=8000, host="127.0.0.1"):
+    """nginx snippet routing room traffic to its owning worker (include it in the http block)"""
+    workers = [f"{host}:{base_port + shard}" for shard in range(shard_count)]
+    lines = [
+        "# Generated by `python shards.py --nginx` - one uvicorn worker per shard",
+        "upstream lunarlander_workers {",
+        "    least_conn;  # New games go to the least busy worker",
+    ]
+    lines += [f"    server {worker};" for worker in workers]
+    lines += [
+        "}",
+        "",
+        "# Owning worker for a room, spectated game or replay id",
+        "map $arg_room$uri $lunarlander_shard {",
+        "    default lunarlander_workers;",
+    ]
+    for shard, worker in enumerate(workers):
+        prefix = f"{shard:02x}"
+        lines.append(f"    ~^{prefix} {worker};")
+        lines.append(f"    ~^/(spectate|replay)/{prefix} {worker};")
+    lines += [
+        "}",
+        "",
+        "# In the server block, proxy /ws, /spectate/ and /replay/ with:",
+        "#     proxy_pass http://$lunarlander_shard;",
+    ]
+    return "\n".join(lines) + "\n"
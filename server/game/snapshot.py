@@ -0,0 +1,87 @@
+"""
+Session snapshots for draining a worker without dropping games
+
+POST /drain writes a snapshot of every running game (GameSession.snapshot)
+to a SnapshotStore and tells each player to reconnect with a "resume"
+message. The worker that gets the first resume for a room (the restarted
+worker, or any other one reading the same directory) restores the session
+and play continues on its next tick.
+
+Snapshots are plain JSON files, one per session. load() claims a file by
+renaming it first, so only one worker can restore a given session.
+"""
+import json
+import os
+import secrets
+import time
+import uuid
+from pathlib import Path
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_TTL = 300.0  # Seconds a drained game can wait for its players to come back
+
+
+def token_matches(player, resume_token):
+    """True if resume_token is the one a snapshot gave this player (player may be None)"""
+    return (player is not None and isinstance(resume_token, str) and bool(player.get('resume_token'))
+            and secrets.compare_digest(player['resume_token'], resume_token))
+
+
+class SnapshotStore:
+    """Directory of session snapshots waiting to be restored"""
+
+    def __init__(self, path="data/snapshots", ttl=SNAPSHOT_TTL, clock=None):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.clock = clock if clock is not None else time.time
+        self.saved = 0
+        self.restored = 0
+
+    def _file(self, session_id):
+        # Session ids are uuids; refuse anything that could leave the directory
+        if not isinstance(session_id, str) or not session_id or not all(c.isalnum() or c == '-' for c in session_id):
+            return None
+        return self.path / f"{session_id}.json"
+
+    def save(self, snapshot):
+        self.path.mkdir(parents=True, exist_ok=True)
+        file_path = self._file(snapshot['session_id'])
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({**snapshot, 'saved_at': self.clock()}, f)
+        os.replace(tmp_path, file_path)
+        self.saved += 1
+
+    def load(self, session_id, accept=None):
+        """Claim and return the snapshot of a session, or None if there is no usable one.
+
+        A snapshot that accept(snapshot) turns down is left for a later load.
+        """
+        file_path = self._file(session_id)
+        if file_path is None:
+            return None
+        claimed = file_path.with_name(f"{file_path.name}.{uuid.uuid4().hex[:8]}.claimed")
+        try:
+            os.rename(file_path, claimed)
+        except FileNotFoundError:
+            return None  # Never drained, or another worker got it first
+        try:
+            with open(claimed) as f:
+                snapshot = json.load(f)
+        except Exception:
+            os.remove(claimed)
+            raise
+
+        if snapshot.get('version') != SNAPSHOT_VERSION or self.clock() - snapshot['saved_at'] > self.ttl:
+            os.remove(claimed)
+            return None
+        if accept is not None and not accept(snapshot):
+            os.rename(claimed, file_path)
+            return None
+        os.remove(claimed)
+        self.restored += 1
+        return snapshot
+
+    def get_stats(self):
+        waiting = len(list(self.path.glob("*.json"))) if self.path.exists() else 0
+        return {'path': str(self.path), 'saved': self.saved, 'restored': self.restored, 'waiting': waiting}
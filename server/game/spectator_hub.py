@@ -0,0 +1,412 @@
+"""
+Spectator fan-out hub, decoupled from the game tick
+
+Sessions publish one packet per event or telemetry frame to the hub. Each game
+has a channel with its own fan-out task that encodes the frame once per
+spectator protocol, applies rate tiers and queues the payloads on every
+subscriber's OutboundQueue. Publishing never waits on spectators.
+
+The hub only deals in plain packets (session id, kind, message dict, tick), so
+it can also run in its own process (SpectatorHubProcess) and serve
+/spectate/{session_id} there, keeping spectator fan-out off the game server's
+event loop entirely.
+"""
+import asyncio
+import json
+import multiprocessing
+import queue
+from collections import deque
+from game.binary_telemetry import encode_telemetry
+from game.broadcast import broadcaster as shared_broadcaster
+from game.broadcast import PROTOCOL_LEGACY, PROTOCOL_BINARY, PROTOCOL_VERSIONS, splice_json
+from game.outbound import OutboundQueue
+from game.eventlog import event_log
+
+MAX_SPECTATORS_PER_GAME = 5000
+
+# Spectator stream rate tiers (Hz), requested with ?rate= on /spectate
+SPECTATOR_RATES = (5, 10, 15, 30)
+DEFAULT_SPECTATOR_RATE = 30
+TICK_RATE = 60  # Publisher ticks per second (matches the TickScheduler)
+
+STATUS_POLL_INTERVAL = 0.25  # Seconds between subscriber count updates from a hub process
+
+
+def is_due(rate, tick):
+    """Whether a rate tier gets the frame published on this tick"""
+    return tick % max(1, round(TICK_RATE / rate)) == 0
+
+
+def static_members(message):
+    """Terrain and landing zones of an init/static message, encoded once as JSON members"""
+    return json.dumps({"terrain": message["terrain"], "all_landing_zones": message["all_landing_zones"]})[1:-1]
+
+
+class Channel:
+    """Spectators and pending packets for one game"""
+
+    def __init__(self):
+        self.subscribers = {}  # websocket -> (protocol, rate)
+        self.queues = {}  # websocket -> OutboundQueue
+        self.packets = deque()  # [kind, message, tick]
+        self.init = None  # Last init message, sent to late joiners
+        self.static_json = ""  # Current terrain/landing zones as JSON members, spliced into legacy telemetry
+        self.closed = False
+        self.finished = asyncio.Event()  # Set once closed; ends the spectators' connections
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.task = None
+
+    def tiers(self):
+        counts = {}
+        for _, rate in self.subscribers.values():
+            counts[rate] = counts.get(rate, 0) + 1
+        return counts
+
+
+class SpectatorHub:
+    """Fans published frames out to spectators on per-game tasks"""
+
+    def __init__(self, max_spectators=MAX_SPECTATORS_PER_GAME, broadcaster=None, on_change=None):
+        self.max_spectators = max_spectators
+        self.broadcaster = broadcaster if broadcaster is not None else shared_broadcaster
+        self.on_change = on_change  # Called with (session_id, tiers) when subscribers change
+        self.channels = {}
+
+    def _channel(self, session_id):
+        channel = self.channels.get(session_id)
+        if channel is None:
+            channel = self.channels[session_id] = Channel()
+        return channel
+
+    def subscribe(self, session_id, websocket, protocol=PROTOCOL_LEGACY, rate=DEFAULT_SPECTATOR_RATE):
+        """Add a spectator; returns False if the game is at its spectator limit"""
+        channel = self._channel(session_id)
+        if len(channel.subscribers) >= self.max_spectators:
+            return False
+        channel.subscribers[websocket] = (protocol, rate)
+        channel.queues[websocket] = OutboundQueue(
+            websocket, on_error=lambda q: self.unsubscribe(session_id, q.websocket), broadcaster=self.broadcaster
+        )
+        if channel.init is not None:
+            channel.queues[websocket].put(self.broadcaster.frame(channel.init).payload())
+        self._changed(session_id, channel)
+        return True
+
+    def unsubscribe(self, session_id, websocket):
+        channel = self.channels.get(session_id)
+        if channel is None or websocket not in channel.subscribers:
+            return
+        del channel.subscribers[websocket]
+        channel.queues.pop(websocket).close()
+        self._changed(session_id, channel)
+        self._discard_if_done(session_id, channel)
+
+    def _changed(self, session_id, channel):
+        if self.on_change:
+            self.on_change(session_id, channel.tiers())
+
+    def count(self, session_id):
+        channel = self.channels.get(session_id)
+        return len(channel.subscribers) if channel else 0
+
+    def tiers(self, session_id):
+        """Subscriber count per rate tier"""
+        channel = self.channels.get(session_id)
+        return channel.tiers() if channel else {}
+
+    def due_rates(self, session_id, tick):
+        """Rate tiers with subscribers that get a frame on this tick"""
+        return {rate for rate in self.tiers(session_id) if is_due(rate, tick)}
+
+    def publish(self, session_id, kind, message, tick=None):
+        """Queue a packet for a game's spectators (never waits).
+
+        kind is "init", "static", "event" or "telemetry"; telemetry is
+        latest-only if the fan-out task falls behind.
+        """
+        channel = self._channel(session_id)
+        if kind == "telemetry" and channel.packets and channel.packets[-1][0] == "telemetry":
+            channel.packets[-1] = [kind, message, tick]
+        else:
+            channel.packets.append([kind, message, tick])
+        channel.idle.clear()
+
+        # Start fan-out task if not running
+        if channel.task is None or channel.task.done():
+            channel.task = asyncio.create_task(self._run(session_id, channel))
+
+    def close_channel(self, session_id):
+        """Mark a game finished; the channel goes away once its spectators leave"""
+        channel = self.channels.get(session_id)
+        if channel:
+            channel.closed = True
+            channel.finished.set()
+            self._discard_if_done(session_id, channel)
+
+    def disconnect(self, session_id):
+        """Drop every spectator of a game now and stop its fan-out (the game moved to another worker)"""
+        channel = self.channels.pop(session_id, None)
+        if channel is None:
+            return
+        channel.closed = True
+        channel.finished.set()
+        channel.packets.clear()
+        if channel.task and not channel.task.done():
+            channel.task.cancel()
+        for spectator_queue in channel.queues.values():
+            spectator_queue.close()
+        channel.subscribers.clear()
+        channel.queues.clear()
+        channel.idle.set()
+        self._changed(session_id, channel)
+
+    def is_live(self, session_id):
+        channel = self.channels.get(session_id)
+        return channel is not None and not channel.closed
+
+    async def wait_closed(self, session_id):
+        """Wait until a game's channel is closed (returns at once if there is none)"""
+        channel = self.channels.get(session_id)
+        if channel is not None:
+            await channel.finished.wait()
+
+    def _discard_if_done(self, session_id, channel):
+        if channel.closed and not channel.subscribers and not channel.packets:
+            self.channels.pop(session_id, None)
+
+    async def _run(self, session_id, channel):
+        while channel.packets:
+            kind, message, tick = channel.packets.popleft()
+            try:
+                self._fan_out(channel, kind, message, tick)
+            except Exception as e:
+                event_log.error("spectator_fanout_error", session=session_id, error=str(e))
+            # Yield between packets so a busy channel cannot starve the loop
+            await asyncio.sleep(0)
+        channel.idle.set()
+        self._discard_if_done(session_id, channel)
+
+    def _fan_out(self, channel, kind, message, tick):
+        if kind == "init":
+            channel.init = message
+            channel.static_json = static_members(message)
+            recipients = channel.subscribers
+        elif kind == "static":
+            channel.static_json = static_members(message)
+            # Legacy spectators pick the new terrain up from the next telemetry
+            recipients = {ws: sub for ws, sub in channel.subscribers.items() if sub[0] != PROTOCOL_LEGACY}
+        elif kind == "telemetry":
+            # tick None (final frame) goes to every tier
+            recipients = {ws: sub for ws, sub in channel.subscribers.items() if tick is None or is_due(sub[1], tick)}
+        else:
+            recipients = channel.subscribers
+
+        if not recipients:
+            return
+
+        encoders = None
+        if kind == "telemetry":
+            encoders = {
+                PROTOCOL_LEGACY: lambda m: splice_json(m, channel.static_json),
+                PROTOCOL_BINARY: encode_telemetry
+            }
+        frame = self.broadcaster.frame(message, encoders, latest_only=(kind == "telemetry"))
+        for websocket, (protocol, _) in list(recipients.items()):
+            spectator_queue = channel.queues.get(websocket)
+            if spectator_queue:
+                spectator_queue.put(frame.payload(protocol), frame.latest_only)
+
+    async def flush(self, session_id, websocket=None, timeout=2.0):
+        """Wait (up to timeout) for published packets to reach one or all spectators"""
+        channel = self.channels.get(session_id)
+        if channel is None:
+            return
+        try:
+            await asyncio.wait_for(channel.idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return
+        if websocket is not None:
+            queues = [channel.queues[websocket]] if websocket in channel.queues else []
+        else:
+            queues = list(channel.queues.values())
+        if queues:
+            await asyncio.gather(*(q.drain(timeout) for q in queues))
+
+    def get_stats(self):
+        """Get channel/subscriber counts (for monitoring)"""
+        return {
+            'channels': len(self.channels),
+            'spectators': sum(len(channel.subscribers) for channel in self.channels.values()),
+            'max_spectators_per_game': self.max_spectators
+        }
+
+
+async def serve_spectator(hub, websocket, session_id, protocol_version=PROTOCOL_LEGACY,
+                          rate=DEFAULT_SPECTATOR_RATE, is_live=None):
+    """Run one spectator connection until the game ends or the client leaves"""
+    if protocol_version not in PROTOCOL_VERSIONS:
+        protocol_version = PROTOCOL_LEGACY
+    # Snap the requested stream rate to the nearest tier (5/10/15/30 Hz)
+    rate = min(SPECTATOR_RATES, key=lambda tier: abs(tier - rate))
+
+    if not hub.subscribe(session_id, websocket, protocol_version, rate):
+        await websocket.send_text(json.dumps({
+            "type": "error",
+            "message": "Spectator limit reached"
+        }))
+        await websocket.close()
+        return
+
+    if is_live is None:
+        is_live = lambda: hub.is_live(session_id)
+    try:
+        if is_live():
+            # Answer pings until the client leaves or the game's channel is closed
+            receive_task = asyncio.create_task(_answer_pings(websocket))
+            closed_task = asyncio.create_task(hub.wait_closed(session_id))
+            await asyncio.wait({receive_task, closed_task}, return_when=asyncio.FIRST_COMPLETED)
+            receive_task.cancel()
+            closed_task.cancel()
+            # Let the pending receive unwind before the connection is closed
+            await asyncio.gather(receive_task, closed_task, return_exceptions=True)
+
+        # Deliver the queued game_over before the connection closes
+        await hub.flush(session_id, websocket)
+    finally:
+        hub.unsubscribe(session_id, websocket)
+
+    # Returning from the handler does not close the websocket
+    try:
+        await websocket.close()
+    except:
+        pass
+
+
+async def _answer_pings(websocket):
+    """Handle spectator messages (like ping) until the connection fails"""
+    try:
+        while True:
+            msg = json.loads(await websocket.receive_text())
+            if msg.get("type") == "ping":
+                await websocket.send_text(json.dumps({"type": "pong"}))
+    except Exception:
+        return
+
+
+def create_hub_app(hub):
+    """FastAPI app serving /spectate/{session_id} straight from a hub"""
+    from fastapi import FastAPI, WebSocket
+
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", **hub.get_stats()}
+
+    @app.websocket("/spectate/{session_id}")
+    async def spectate_game(websocket: WebSocket, session_id: str, protocol_version: int = PROTOCOL_LEGACY,
+                            rate: int = DEFAULT_SPECTATOR_RATE):
+        await websocket.accept()
+        if not hub.is_live(session_id):
+            await websocket.send_text(json.dumps({
+                "type": "error",
+                "message": "Game session not found"
+            }))
+            await websocket.close()
+            return
+        await serve_spectator(hub, websocket, session_id, protocol_version, rate)
+
+    return app
+
+
+def _hub_main(packets, status, host, port, max_spectators):
+    import uvicorn
+
+    hub = SpectatorHub(max_spectators, on_change=lambda session_id, tiers: status.put((session_id, tiers)))
+    app = create_hub_app(hub)
+
+    async def pump():
+        loop = asyncio.get_running_loop()
+        while True:
+            session_id, kind, message, tick = await loop.run_in_executor(None, packets.get)
+            if kind == "close":
+                hub.close_channel(session_id)
+            else:
+                hub.publish(session_id, kind, message, tick)
+
+    @app.on_event("startup")
+    async def start_pump():
+        asyncio.create_task(pump())
+
+    uvicorn.run(app, host=host, port=port, log_level="warning")
+
+
+class SpectatorHubProcess:
+    """Same publishing API as SpectatorHub, with fan-out in a separate process.
+
+    Spectators connect to the hub process's own /spectate/{session_id} on
+    `port` (route /spectate there from your reverse proxy).
+    """
+
+    def __init__(self, port, host="0.0.0.0", max_spectators=MAX_SPECTATORS_PER_GAME):
+        self.max_spectators = max_spectators
+        self.packets = multiprocessing.Queue()
+        self.status = multiprocessing.Queue()
+        self.subscriber_tiers = {}  # session_id -> {rate: count}, reported by the hub process
+        self.status_task = None
+        self.process = multiprocessing.Process(
+            target=_hub_main, args=(self.packets, self.status, host, port, max_spectators), daemon=True
+        )
+        self.process.start()
+
+    def publish(self, session_id, kind, message, tick=None):
+        self.packets.put((session_id, kind, message, tick))
+
+        # Start status polling if not running
+        if self.status_task is None or self.status_task.done():
+            self.status_task = asyncio.create_task(self._poll_status())
+
+    async def _poll_status(self):
+        while True:
+            try:
+                while True:
+                    session_id, tiers = self.status.get_nowait()
+                    if tiers:
+                        self.subscriber_tiers[session_id] = tiers
+                    else:
+                        self.subscriber_tiers.pop(session_id, None)
+            except queue.Empty:
+                pass
+            await asyncio.sleep(STATUS_POLL_INTERVAL)
+
+    def close_channel(self, session_id):
+        self.packets.put((session_id, "close", None, 0))
+
+    def disconnect(self, session_id):
+        self.close_channel(session_id)  # Spectators are served by the hub process, which keeps running
+
+    def count(self, session_id):
+        return sum(self.tiers(session_id).values())
+
+    def tiers(self, session_id):
+        return self.subscriber_tiers.get(session_id, {})
+
+    def due_rates(self, session_id, tick):
+        """Rate tiers with subscribers that get a frame on this tick"""
+        return {rate for rate in self.tiers(session_id) if is_due(rate, tick)}
+
+    async def flush(self, session_id, websocket=None, timeout=2.0):
+        pass  # Delivery happens in the hub process
+
+    def get_stats(self):
+        return {
+            'channels': len(self.subscriber_tiers),
+            'spectators': sum(sum(tiers.values()) for tiers in self.subscriber_tiers.values()),
+            'max_spectators_per_game': self.max_spectators,
+            'process_alive': self.process.is_alive()
+        }
+
+
+# Shared by every session in this process
+spectator_hub = SpectatorHub()
@@ -1,19 +1,35 @@
+import json
 import random
+from collections import OrderedDict
+import numpy as np
+
+MAX_SEED = 2**32
+
+def normalize_difficulty(difficulty):
+    """Normalize difficulty names (handle test aliases)"""
+    if difficulty == "intermediate":
+        return "medium"
+    elif difficulty == "advanced":
+        return "hard"
+    return difficulty
 
 class Terrain:
-    def __init__(self, width=1200, height=800, difficulty="simple"):
+    """Terrain generated deterministically from a seed.
+    
+    Terrains handed out by the pool are shared between sessions and must be
+    treated as read-only.
+    """
+    def __init__(self, width=1200, height=800, difficulty="simple", seed=None):
         self.width = width
         self.height = height
-        # Normalize difficulty names (handle test aliases)
-        if difficulty == "intermediate":
-            difficulty = "medium"
-        elif difficulty == "advanced":
-            difficulty = "hard"
-        self.difficulty = difficulty
-        self.points = self._generate(difficulty)
+        self.difficulty = normalize_difficulty(difficulty)
+        # Every terrain has a seed so replays and leaderboards can reference it
+        self.seed = seed if seed is not None else random.randrange(MAX_SEED)
+        self.points = self._generate(self.difficulty, random.Random(self.seed))
         self.landing_zones = self._find_landing_zones()
+        self._build_index()
         
-    def _generate(self, difficulty):
+    def _generate(self, difficulty, rng):
         points = []
         
         # Determine step size based on difficulty
@@ -37,7 +53,7 @@ class Terrain:
             variation = 50
         
         # Determine landing zone position (aligned to step)
-        landing_x_start = random.randint(400 // step, 700 // step) * step
+        landing_x_start = rng.randint(400 // step, 700 // step) * step
         landing_x_end = landing_x_start + landing_width
         
         if difficulty == "simple":
@@ -48,10 +64,10 @@ class Terrain:
                     y = landing_y
                 else:
                     # Ensure variation to prevent accidental flat zones
-                    y = prev_y + random.randint(-variation, variation)
+                    y = prev_y + rng.randint(-variation, variation)
                     # Force at least 10 units difference from landing zone height
                     if abs(y - landing_y) < 10:
-                        y = landing_y + (15 if random.random() > 0.5 else -15)
+                        y = landing_y + (15 if rng.random() > 0.5 else -15)
                 points.append((x, y))
                 prev_y = y
         elif difficulty == "medium":
@@ -61,11 +77,11 @@ class Terrain:
                 if landing_x_start <= x <= landing_x_end:
                     y = landing_y
                 else:
-                    y += random.randint(-variation, variation)
+                    y += rng.randint(-variation, variation)
                     y = max(self.height - 300, min(self.height - 50, y))
                     # Force at least 10 units difference from landing zone height
                     if abs(y - landing_y) < 10:
-                        y = landing_y + (15 if random.random() > 0.5 else -15)
+                        y = landing_y + (15 if rng.random() > 0.5 else -15)
                 points.append((x, y))
         else:  # hard
             # Steep mountains with one flat landing zone
@@ -74,11 +90,11 @@ class Terrain:
                 if landing_x_start <= x <= landing_x_end:
                     y = landing_y
                 else:
-                    y += random.randint(-variation, variation)
+                    y += rng.randint(-variation, variation)
                     y = max(self.height - 500, min(self.height - 50, y))
                     # Force at least 10 units difference from landing zone height
                     if abs(y - landing_y) < 10:
-                        y = landing_y + (15 if random.random() > 0.5 else -15)
+                        y = landing_y + (15 if rng.random() > 0.5 else -15)
                 points.append((x, y))
                 
         return points
@@ -130,26 +146,148 @@ class Terrain:
             return [max(zones, key=lambda z: z['x2'] - z['x1'])]
         return zones
         
+    def _build_index(self):
+        """Precompute segment arrays so lookups index directly instead of scanning.
+        
+        Points are generated on a uniform step, so the segment under x is
+        simply int(x // segment_width).
+        """
+        self.segment_width = self.points[1][0] - self.points[0][0]
+        self.num_segments = len(self.points) - 1
+        self._last_x = self.points[-1][0]
+        self._xs = np.array([p[0] for p in self.points], dtype=np.float64)
+        self._ys = np.array([p[1] for p in self.points], dtype=np.float64)
+        self.top_y = float(self._ys.min())  # Highest peak (smallest y)
+        
+        # Landing zone covering each segment (-1 for none)
+        self._segment_zone = np.full(self.num_segments, -1, dtype=np.int64)
+        for zone_index, zone in enumerate(self.landing_zones):
+            covered = (self._xs[:-1] >= zone["x1"]) & (self._xs[1:] <= zone["x2"])
+            self._segment_zone[covered] = zone_index
+        self._zone_multipliers = np.array([zone["multiplier"] for zone in self.landing_zones] + [1.0])
+        
+        # Serialized forms are built lazily, once
+        self._dict = None
+        self._json = None
+    
+    def segment_index(self, x):
+        """Index of the segment under x, or -1 outside the terrain"""
+        if not (self.points[0][0] <= x <= self._last_x):
+            return -1
+        return min(int((x - self.points[0][0]) // self.segment_width), self.num_segments - 1)
+        
     def get_height_at(self, x):
         # Linear interpolation between points
-        for i in range(len(self.points) - 1):
-            x1, y1 = self.points[i]
-            x2, y2 = self.points[i + 1]
-            if x1 <= x <= x2:
-                t = (x - x1) / (x2 - x1)
-                return y1 + (y2 - y1) * t
-        return self.height
+        i = self.segment_index(x)
+        if i < 0:
+            return self.height
+        x1, y1 = self.points[i]
+        x2, y2 = self.points[i + 1]
+        t = (x - x1) / (x2 - x1)
+        return y1 + (y2 - y1) * t
+    
+    def _segment_indices(self, xs):
+        """Vectorized segment_index; returns (indices clipped to range, inside mask)"""
+        xs = np.asarray(xs, dtype=np.float64)
+        inside = (xs >= self._xs[0]) & (xs <= self._last_x)
+        offsets = np.where(inside, xs - self._xs[0], 0.0)
+        indices = np.minimum((offsets // self.segment_width).astype(np.int64), self.num_segments - 1)
+        return xs, indices, inside
+    
+    def get_heights_at(self, xs):
+        """Batch get_height_at for an array of x positions"""
+        xs, i, inside = self._segment_indices(xs)
+        x1 = self._xs[i]
+        y1 = self._ys[i]
+        t = (xs - x1) / (self._xs[i + 1] - x1)
+        return np.where(inside, y1 + (self._ys[i + 1] - y1) * t, float(self.height))
+        
+    def _zone_at(self, i, x):
+        zone_index = self._segment_zone[i]
+        # Zones include their right edge, which starts the next segment
+        if zone_index < 0 and i > 0 and x == self.points[i][0]:
+            zone_index = self._segment_zone[i - 1]
+        return zone_index
         
     def is_landing_zone(self, x):
-        for zone in self.landing_zones:
-            if zone["x1"] <= x <= zone["x2"]:
-                return True, zone["multiplier"]
+        i = self.segment_index(x)
+        if i >= 0:
+            zone_index = self._zone_at(i, x)
+            if zone_index >= 0:
+                return True, self.landing_zones[zone_index]["multiplier"]
         return False, 1.0
+    
+    def landing_zone_mask(self, xs):
+        """Batch is_landing_zone; returns (bool array, multiplier array)"""
+        xs, i, inside = self._segment_indices(xs)
+        zone_index = self._segment_zone[i]
+        on_right_edge = (zone_index < 0) & (i > 0) & (xs == self._xs[i])
+        zone_index = np.where(on_right_edge, self._segment_zone[np.maximum(i - 1, 0)], zone_index)
+        zone_index = np.where(inside, zone_index, -1)
+        return zone_index >= 0, self._zone_multipliers[zone_index]
         
     def to_dict(self):
+        # Built once - terrain never changes after generation
+        if self._dict is None:
+            self._dict = {
+                "points": self.points,
+                "landing_zones": self.landing_zones,
+                "width": self.width,
+                "height": self.height,
+                "seed": self.seed
+            }
+        return self._dict
+    
+    def to_json(self):
+        """Pre-serialized to_dict(), encoded once"""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict())
+        return self._json
+
+
+class TerrainPool:
+    """Process-wide LRU cache of generated terrains keyed by (difficulty, seed, width, height)"""
+    
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._terrains = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.unseeded = 0
+    
+    def get(self, difficulty="simple", seed=None, width=1200, height=800):
+        """Get the shared terrain for a seed, generating it on first use.
+        
+        Without a seed a fresh random terrain is returned and not cached:
+        random seeds almost never repeat, so they would only churn the cache.
+        """
+        if seed is None:
+            self.unseeded += 1
+            return Terrain(width, height, difficulty)
+        key = (normalize_difficulty(difficulty), seed, width, height)
+        
+        terrain = self._terrains.get(key)
+        if terrain is not None:
+            self.hits += 1
+            self._terrains.move_to_end(key)
+            return terrain
+        
+        self.misses += 1
+        terrain = Terrain(width, height, key[0], seed)
+        self._terrains[key] = terrain
+        if len(self._terrains) > self.max_size:
+            self._terrains.popitem(last=False)
+        return terrain
+    
+    def get_stats(self):
+        """Get pool size and hit rate (for monitoring)"""
         return {
-            "points": self.points,
-            "landing_zones": self.landing_zones,
-            "width": self.width,
-            "height": self.height
+            'size': len(self._terrains),
+            'hits': self.hits,
+            'misses': self.misses,
+            'unseeded': self.unseeded
         }
+
+
+# Shared by every session in this process
+terrain_pool = TerrainPool()
@@ -0,0 +1,197 @@
+"""
+Vectorized multi-environment API for training bots locally
+
+Steps N independent single-player episodes in lockstep on one LanderBatch,
+using the same physics, collision and scoring code as the live server.
+"""
+import multiprocessing
+import random
+import numpy as np
+from game.physics import Lander, LanderBatch, NOSE_LENGTH
+from game.terrain import Terrain, MAX_SEED
+from game.session import calculate_score
+
+# Observation columns
+OBS_FIELDS = ('x', 'y', 'vx', 'vy', 'rotation', 'fuel', 'altitude', 'zone_dx')
+OBS_SIZE = len(OBS_FIELDS)
+
+
+class VectorLanderEnv:
+    """N lockstep lander episodes with NumPy observations, actions and rewards.
+
+    Actions are an (N, 2) int array of [thrust, rotate] where thrust is 0/1
+    and rotate is -1 (left), 0 (none) or 1 (right). The reward is the server
+    score when an episode ends and 0 otherwise. Finished episodes are reset
+    automatically; their last observation is returned in info. Terrain seeds
+    come from the env's own random.Random, so seeding never touches the
+    global random module.
+    """
+
+    def __init__(self, num_envs, difficulty="simple", fuel_mode="standard", dt=1/60, max_steps=60 * 120, seed=None):
+        self.num_envs = num_envs
+        self.difficulty = difficulty
+        self.fuel_mode = fuel_mode
+        self.dt = dt
+        self.max_steps = max_steps
+        self.rng = random.Random(seed)
+        self.batch = LanderBatch(capacity=num_envs)
+        self.landers = [None] * num_envs
+        self.terrains = [None] * num_envs
+        self.terrain_top = np.zeros(num_envs)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.rows = np.zeros(num_envs, dtype=np.intp)
+
+    def _reset_env(self, i):
+        self.terrains[i] = Terrain(difficulty=self.difficulty, seed=self.rng.randrange(MAX_SEED))
+        self.terrain_top[i] = self.terrains[i].top_y
+        self.landers[i] = Lander(fuel_mode=self.fuel_mode, batch=self.batch)
+        self.rows[i] = self.landers[i].row
+        self.steps[i] = 0
+
+    def reset(self, seed=None):
+        """Start fresh episodes in every env and return the observations"""
+        if seed is not None:
+            self.rng.seed(seed)
+        for i in range(self.num_envs):
+            self._reset_env(i)
+        return self._observe()
+
+    def _terrain_heights(self):
+        xs = self.batch.x[self.rows]
+        return np.array([terrain.get_height_at(x) for terrain, x in zip(self.terrains, xs)])
+
+    def _observe(self):
+        batch = self.batch
+        rows = self.rows
+        obs = np.empty((self.num_envs, OBS_SIZE))
+        obs[:, 0] = batch.x[rows]
+        obs[:, 1] = batch.y[rows]
+        obs[:, 2] = batch.vx[rows]
+        obs[:, 3] = batch.vy[rows]
+        obs[:, 4] = batch.rotation[rows]
+        obs[:, 5] = batch.fuel[rows]
+        obs[:, 6] = self._terrain_heights() - obs[:, 1]
+        zone_center = np.array([(t.landing_zones[0]['x1'] + t.landing_zones[0]['x2']) / 2 for t in self.terrains])
+        obs[:, 7] = zone_center - obs[:, 0]
+        return obs
+
+    def step(self, actions):
+        """Advance every env one frame; returns (obs, rewards, terminated, truncated, info)"""
+        actions = np.asarray(actions).reshape(self.num_envs, 2)
+        batch = self.batch
+        rows = self.rows
+
+        batch.thrust[rows] = actions[:, 0] != 0
+        batch.rotate[rows] = np.sign(actions[:, 1])
+        batch.step(self.dt, rows)
+        self.steps += 1
+
+        # Same order as GameSession.resolve_frame: terrain contact, then bounds.
+        # Each env has its own terrain, so only envs low enough to touch it are swept.
+        contact_y = np.maximum(batch.y[rows], batch.prev_y[rows]) + np.maximum(0.0, -NOSE_LENGTH * np.cos(batch.rotation[rows]))
+        for i in np.flatnonzero(contact_y >= self.terrain_top):
+            batch.resolve_terrain_contact(rows[i:i + 1], self.terrains[i])
+        x = batch.x[rows]
+        out_of_bounds = (x < 0) | (x > np.array([t.width for t in self.terrains]))
+        batch.crashed[rows[out_of_bounds]] = True
+
+        landed = batch.landed[rows].copy()
+        crashed = batch.crashed[rows].copy()
+        terminated = landed | crashed
+        truncated = ~terminated & (self.steps >= self.max_steps)
+
+        rewards = np.zeros(self.num_envs)
+        for i in np.flatnonzero(terminated):
+            rewards[i] = calculate_score(self.landers[i], self.steps[i] * self.dt, self.difficulty)
+
+        obs = self._observe()
+        done = terminated | truncated
+        info = {
+            'landed': landed,
+            'crashed': crashed,
+            'final_observation': obs[done].copy(),
+            'final_index': np.flatnonzero(done)
+        }
+
+        # Auto-reset finished episodes
+        if done.any():
+            for i in np.flatnonzero(done):
+                self._reset_env(i)
+            obs[done] = self._observe()[done]
+
+        return obs, rewards, terminated, truncated, info
+
+    def close(self):
+        pass
+
+
+def _worker_seeds(seed, count):
+    """One seed per worker derived from seed (None lets each worker seed from the OS)"""
+    if seed is None:
+        return [None] * count
+    rng = random.Random(seed)
+    return [rng.randrange(MAX_SEED) for _ in range(count)]
+
+
+def _worker(conn, num_envs, seed, kwargs):
+    env = VectorLanderEnv(num_envs, seed=seed, **kwargs)
+    while True:
+        cmd, data = conn.recv()
+        if cmd == 'reset':
+            conn.send(env.reset(data))
+        elif cmd == 'step':
+            conn.send(env.step(data))
+        else:
+            conn.close()
+            break
+
+
+class ProcessVectorEnv:
+    """Same API as VectorLanderEnv with envs spread across worker processes"""
+
+    def __init__(self, num_envs, num_workers=None, seed=None, **kwargs):
+        num_workers = min(num_envs, num_workers or multiprocessing.cpu_count())
+        self.num_envs = num_envs
+        self.splits = np.array_split(np.arange(num_envs), num_workers)
+        self.conns = []
+        self.processes = []
+        for split, worker_seed in zip(self.splits, _worker_seeds(seed, num_workers)):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(child, len(split), worker_seed, kwargs), daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def reset(self, seed=None):
+        for conn, worker_seed in zip(self.conns, _worker_seeds(seed, len(self.conns))):
+            conn.send(('reset', worker_seed))
+        return np.concatenate([conn.recv() for conn in self.conns])
+
+    def step(self, actions):
+        actions = np.asarray(actions).reshape(self.num_envs, 2)
+        for conn, split in zip(self.conns, self.splits):
+            conn.send(('step', actions[split]))
+        results = [conn.recv() for conn in self.conns]
+
+        obs, rewards, terminated, truncated, infos = zip(*results)
+        info = {
+            'landed': np.concatenate([i['landed'] for i in infos]),
+            'crashed': np.concatenate([i['crashed'] for i in infos]),
+            'final_observation': np.concatenate([i['final_observation'] for i in infos]),
+            'final_index': np.concatenate([i['final_index'] + split[0] for i, split in zip(infos, self.splits)])
+        }
+        return np.concatenate(obs), np.concatenate(rewards), np.concatenate(terminated), np.concatenate(truncated), info
+
+    def close(self):
+        for conn in self.conns:
+            conn.send(('close', None))
+        for process in self.processes:
+            process.join()
+
+
+def make_vector_env(num_envs, backend="inline", **kwargs):
+    """Create a vector env; backend is "inline" or "process" """
+    if backend == "process":
+        return ProcessVectorEnv(num_envs, **kwargs)
+    return VectorLanderEnv(num_envs, **kwargs)
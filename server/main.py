@@ -1,4 +1,4 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -9,8 +9,22 @@ import uuid
 import time
 import asyncio
 import os
+import secrets
+import traceback
 from game.session import GameSession
+from game.terrain import MAX_SEED, terrain_pool
+from game.scheduler import scheduler
+from game.broadcast import broadcaster, requested_protocol, PROTOCOL_LEGACY
+from game.spectator_hub import SpectatorHub, SpectatorHubProcess, serve_spectator, MAX_SPECTATORS_PER_GAME, DEFAULT_SPECTATOR_RATE
+from game.sharding import new_session_id, shard_of
+from game.directory import SessionDirectory, SQLiteSessionDirectory, CachedListing
+from game.registry import SessionRegistry, SESSION_TIMEOUT
+from game.admission import AdmissionController
+from game.snapshot import SnapshotStore, token_matches
+from game.binary_input import InvalidInput
+from game.eventlog import event_log, parse_sample_rates, LEVELS, DEBUG, INFO, WARNING, ERROR
 from metrics.live_stats import LiveStatsTracker
+from metrics.collector import collector as metrics_collector
 from metrics.analytics import AnalyticsEngine
 from metrics.config import AnalyticsConfig
 
@@ -36,8 +50,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store active sessions and replays
-sessions = {}
+# Structured, non-blocking logging (game/eventlog.py)
+event_log.configure(
+    level=os.getenv('LOG_LEVEL', 'info').lower(),
+    sample_rates=parse_sample_rates(os.getenv('LOG_SAMPLE')),
+    fmt=os.getenv('LOG_FORMAT', 'text')
+)
+
+# Store active sessions (indexed by status, reaped in the background) and replays
+sessions = SessionRegistry(SESSION_TIMEOUT)
 replays = {}  # In-memory replay storage (would use database in production)
 
 # Initialize live stats tracker
@@ -52,32 +73,76 @@ analytics_config = AnalyticsConfig(
 analytics = AnalyticsEngine(config=analytics_config)
 
 # Security limits
-MAX_SESSIONS = 100
-MAX_SPECTATORS_PER_GAME = 100
+MAX_SESSIONS = 100  # Per worker
+MAX_MESSAGE_SIZE = 1024  # Bytes per client message
+INPUT_ACTIONS = ("thrust", "thrust_on", "thrust_off", "rotate_left", "rotate_right", "rotate_stop")
 MAX_REPLAYS = 500
-SESSION_TIMEOUT = 600  # 10 minutes
 
-def cleanup_stale_sessions():
-    """Remove sessions that have been idle for too long"""
-    current_time = time.time()
-    stale_sessions = []
-    
-    for session_id, session in sessions.items():
-        # Remove finished games that are idle
-        if not session.running and session.start_time:
-            idle_time = current_time - session.start_time
-            if idle_time > SESSION_TIMEOUT:
-                stale_sessions.append(session_id)
-        # Remove waiting rooms with no players
-        elif session.waiting and len(session.players) == 0:
-            stale_sessions.append(session_id)
-    
-    for session_id in stale_sessions:
-        session = sessions[session_id]
-        print(f"{session.get_session_info()} Removing stale session")
-        del sessions[session_id]
+# New games are admitted by measured load (p99 tick, loop lag, outbound backlog)
+admission = AdmissionController(sessions, MAX_SESSIONS)
+
+# Sharded mode (shards.py): this worker owns the sessions whose ids start with SHARD_INDEX
+SHARD_INDEX = int(os.getenv('SHARD_INDEX', 0))
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', 1))
+if SHARD_COUNT > 1:
+    # Shards share data/metrics; each writes its own daily files
+    metrics_collector.worker = f"shard{SHARD_INDEX}"
+
+# Spectator fan-out runs in its own process when SPECTATOR_HUB_PORT is set
+# (route /spectate/* to that port); otherwise in this process, off the game tick
+SPECTATOR_HUB_PORT = os.getenv('SPECTATOR_HUB_PORT')
+if SPECTATOR_HUB_PORT:
+    spectator_hub = SpectatorHubProcess(int(SPECTATOR_HUB_PORT), max_spectators=MAX_SPECTATORS_PER_GAME)
+else:
+    spectator_hub = SpectatorHub(MAX_SPECTATORS_PER_GAME)
+
+# Lobby listings (/games, /rooms) are served from the session directory; set
+# SESSION_DIRECTORY to a SQLite file path to share it between workers
+SESSION_DIRECTORY = os.getenv('SESSION_DIRECTORY')
+DIRECTORY_SYNC_INTERVAL = 5.0  # Seconds between republishing every local session
+if SESSION_DIRECTORY:
+    directory = SQLiteSessionDirectory(SESSION_DIRECTORY, shard=SHARD_INDEX)
+else:
+    directory = SessionDirectory(shard=SHARD_INDEX)
+directory_sync_task = None
+
+# Running games are snapshotted here by POST /drain and restored by the first "resume"
+snapshots = SnapshotStore(os.getenv('SNAPSHOT_DIR', 'data/snapshots'))
+DRAIN_TOKEN = os.getenv('DRAIN_TOKEN')  # /drain is disabled unless set
+
+def publish_session(session):
+    """Re-index a session and publish its summary to the directory after a state change"""
+    global directory_sync_task
+    sessions.update(session)
+    directory.publish([session.summary()])
     
-    return len(stale_sessions)
+    # Start periodic republishing (spectator counts, TTL refresh) if not running
+    if directory_sync_task is None or directory_sync_task.done():
+        directory_sync_task = asyncio.create_task(sync_directory())
+
+def unpublish_session(session_id):
+    directory.remove(session_id)
+
+async def sync_directory():
+    """Republish every local session so counts stay fresh and our rows do not expire"""
+    while sessions:
+        await asyncio.sleep(DIRECTORY_SYNC_INTERVAL)
+        try:
+            directory.publish([session.summary() for session in list(sessions.values())])
+        except Exception as e:
+            event_log.error("directory_sync_failed", error=str(e))
+
+def reap_session(session):
+    """Drop a session the registry's reaper removed (finished or abandoned)"""
+    session.log(INFO, "session_reaped", status=session.status)
+    session.stop()  # Ends the game loop of a room abandoned in the lobby
+    unpublish_session(session.session_id)
+
+sessions.on_reap = reap_session
+
+def cleanup_stale_sessions():
+    """Remove sessions whose cleanup deadline has passed (the reaper also does this in the background)"""
+    return sessions.reap()
 
 @app.get("/health")
 async def health():
@@ -89,51 +154,106 @@ async def manual_cleanup():
     removed = cleanup_stale_sessions()
     return {"status": "ok", "sessions_removed": removed}
 
-@app.get("/games")
-@limiter.limit("30/minute")
-async def list_active_games(request: Request):
-    """List all active game sessions"""
-    from fastapi.responses import JSONResponse
-    cleanup_stale_sessions()
+@app.post("/drain")
+async def drain_worker(x_drain_token: str = Header(None)):
+    """Stop admitting games and hand every running game over to the next worker.
+    
+    Each game is snapshotted to the snapshot directory and its players are
+    told to reconnect with a resume message; rooms still in the lobby are
+    closed. Afterwards the worker can be stopped without dropping matches.
+    """
+    if not DRAIN_TOKEN or not secrets.compare_digest(x_drain_token or "", DRAIN_TOKEN):
+        from fastapi.responses import JSONResponse
+        return JSONResponse({"error": "Draining requires the X-Drain-Token header (DRAIN_TOKEN)"}, status_code=403)
+    
+    admission.close()
+    handovers = []
+    for session_id in list(sessions.ids("playing")):
+        session = sessions[session_id]
+        snapshot = session.snapshot()
+        snapshots.save(snapshot)
+        
+        # Detach first so connection handlers neither save a replay nor announce departures
+        session.on_change = None
+        del sessions[session_id]
+        unpublish_session(session_id)
+        handovers.append(session.hand_over(snapshot))
+    
+    # Migrate messages go out in parallel; then every writer task is closed
+    await asyncio.gather(*handovers)
+    drained = len(handovers)
+    
+    closed = 0
+    for session_id in list(sessions.ids("waiting")):
+        session = sessions[session_id]
+        await session.broadcast(session.broadcaster.frame({
+            "type": "error",
+            "message": "Server is restarting. Please create the room again."
+        }), spectators=False)
+        session.stop()
+        closed += 1
     
+    event_log.warning("worker_drained", games=drained, rooms=closed)
+    return {"status": "ok", "games_drained": drained, "rooms_closed": closed}
+
+def build_games(summaries):
+    now = time.time()
     games = []
-    for session_id, session in sessions.items():
-        player_count = len(session.players)
+    for room in summaries:
+        player_count = room["player_count"]
         games.append({
-            "session_id": session_id,
-            "user_id": session.user_id,
-            "difficulty": session.difficulty,
-            "spectators": len(session.spectators),
-            "duration": time.time() - session.start_time if session.start_time else 0,
+            "session_id": room["id"],
+            "user_id": room["user_id"],
+            "difficulty": room["difficulty"],
+            "spectators": room["spectators"],
+            "start_time": room["start_time"],
+            "duration": now - room["start_time"] if room["start_time"] else 0,  # As of the last change
             "is_multiplayer": player_count > 1,
             "player_count": player_count
         })
-    return JSONResponse(content={"games": games}, headers={"Cache-Control": "no-cache, no-store, must-revalidate"})
+    return {"games": games}
 
-@app.get("/rooms")
-@limiter.limit("30/minute")
-async def list_active_rooms(request: Request):
-    """List all active rooms with at least 1 player"""
-    from fastapi.responses import JSONResponse
-    cleanup_stale_sessions()
-    
+def build_rooms(summaries):
     rooms = []
-    for session_id, session in sessions.items():
-        player_count = len(session.players)
-        if player_count > 0:
-            status = "waiting" if session.waiting else "playing"
+    for room in summaries:
+        if room["player_count"] > 0:
             rooms.append({
-                "id": session_id,
-                "name": session.room_name or session_id[:8],
-                "player_count": player_count,
+                "id": room["id"],
+                "name": room["name"],
+                "player_count": room["player_count"],
                 "max_players": 8,
-                "difficulty": session.difficulty,
-                "status": status
+                "difficulty": room["difficulty"],
+                "status": room["status"]
             })
-    return JSONResponse(content=rooms, headers={"Cache-Control": "no-cache, no-store, must-revalidate"})
+    return rooms
+
+# Lobby responses are serialized once per directory version and served with an ETag
+games_listing = CachedListing(directory, build_games)
+rooms_listing = CachedListing(directory, build_rooms)
+
+def listing_response(request, listing):
+    """Cached listing body, or 304 if the client already has this version"""
+    etag, body = listing.get()
+    # no-cache: browsers keep the copy but revalidate it (cheaply) on every poll
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/games")
+@limiter.limit("30/minute")
+async def list_active_games(request: Request):
+    """List all active game sessions"""
+    return listing_response(request, games_listing)
+
+@app.get("/rooms")
+@limiter.limit("30/minute")
+async def list_active_rooms(request: Request):
+    """List all active rooms with at least 1 player"""
+    return listing_response(request, rooms_listing)
 
 @app.websocket("/spectate/{session_id}")
-async def spectate_game(websocket: WebSocket, session_id: str):
+async def spectate_game(websocket: WebSocket, session_id: str, protocol_version: int = PROTOCOL_LEGACY, rate: int = DEFAULT_SPECTATOR_RATE):
     await websocket.accept()
     
     try:
@@ -145,64 +265,21 @@ async def spectate_game(websocket: WebSocket, session_id: str):
             await websocket.close()
             return
             
-        session = sessions[session_id]
-        
-        # Check spectator limit
-        if len(session.spectators) >= MAX_SPECTATORS_PER_GAME:
+        if SPECTATOR_HUB_PORT:
             await websocket.send_text(json.dumps({
                 "type": "error",
-                "message": "Spectator limit reached"
+                "message": f"Spectators are served on port {SPECTATOR_HUB_PORT}"
             }))
             await websocket.close()
             return
         
-        session.spectators.append(websocket)
-        print(f"{session.get_session_info()} Spectator joined (total: {len(session.spectators)})")
-        
-        # Send current game state to spectator immediately
-        init_message = {
-            "type": "init",
-            "terrain": session.terrain.to_dict(),
-            "spectator_count": len(session.spectators),
-            "constants": {
-                "gravity": 1.62,
-                "thrust_power": 5.0,
-                "rotation_speed": 3.0,
-                "fuel_consumption_rate": 10.0,
-                "max_landing_speed": 5.0,
-                "max_landing_angle": 0.3,
-                "terrain_width": 1200,
-                "terrain_height": 800
-            }
-        }
-        
-        # Check if multiplayer game and send appropriate data format
-        if len(session.players) > 1:
-            init_message['players'] = {pid: p['lander'].to_dict() for pid, p in session.players.items()}
-        else:
-            init_message['lander'] = session.lander.to_dict()
-        await websocket.send_text(json.dumps(init_message))
-        
-        # Keep connection alive
-        while session.running:
-            try:
-                # Handle spectator messages (like ping)
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=1.0)
-                msg = json.loads(data)
-                if msg.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
-            except asyncio.TimeoutError:
-                continue
-            except:
-                break
-                
+        session = sessions[session_id]
+        session.log(DEBUG, "spectator_joined")
+        await serve_spectator(spectator_hub, websocket, session_id, protocol_version, rate,
+                              is_live=lambda: session.running)
+        session.log(DEBUG, "spectator_left", spectators=session.spectator_count)
     except Exception as e:
-        print(f"{session.get_session_info()} Spectator error: {e}")
-    finally:
-        if session_id in sessions and websocket in sessions[session_id].spectators:
-            session = sessions[session_id]
-            session.spectators.remove(websocket)
-            print(f"{session.get_session_info()} Spectator left (remaining: {len(session.spectators)})")
+        event_log.error("spectator_error", session=session_id, error=str(e))
 
 @app.get("/replays")
 @limiter.limit("30/minute")
@@ -238,6 +315,30 @@ async def get_live_stats(request: Request):
     """Get real-time statistics"""
     return live_stats.get_stats()
 
+@app.get("/api/stats/server")
+@limiter.limit("120/minute")
+async def get_server_stats(request: Request):
+    """Get tick scheduler, terrain cache, broadcast encode, metrics writer, admission, logging and shard stats for this worker"""
+    return {
+        "scheduler": scheduler.get_stats(),
+        "terrain_pool": terrain_pool.get_stats(),
+        "broadcast": broadcaster.get_stats(),
+        "spectator_hub": spectator_hub.get_stats(),
+        "metrics_writer": metrics_collector.get_stats(),
+        "admission": admission.get_stats(),
+        "snapshots": snapshots.get_stats(),
+        "event_log": event_log.get_stats(),
+        "shard": {"index": SHARD_INDEX, "count": SHARD_COUNT, "sessions": len(sessions)},
+        "directory": {**directory.get_stats(), "listing_builds": games_listing.builds + rooms_listing.builds},
+        "sessions": sessions.get_stats()
+    }
+
+@app.get("/api/logs")
+@limiter.limit("60/minute")
+async def get_recent_logs(request: Request, limit: int = 100, level: str = "debug"):
+    """Get the newest structured log events from this worker's in-memory ring buffer"""
+    return {"events": event_log.recent(max(0, min(limit, 1000)), LEVELS.get(level, DEBUG))}
+
 @app.get("/api/stats/aggregate")
 @limiter.limit("60/minute")
 async def get_aggregate_stats(request: Request, hours: int = None):
@@ -296,6 +397,67 @@ async def get_analytics_config():
         'recent_events_window': analytics.config.recent_events_window
     }
 
+async def handle_messages(session, websocket, player_id="default"):
+    """Handle a player's messages until they disconnect or send something invalid.
+    
+    Waits on the socket directly; the caller cancels this task when the game ends.
+    """
+    session_id = session.session_id
+    while True:
+        try:
+            event = await websocket.receive()
+            if event["type"] == "websocket.disconnect":
+                break
+            
+            data = event.get("bytes")
+            if data is None:
+                data = event.get("text") or ""
+            
+            # Validate message size
+            if len(data) > MAX_MESSAGE_SIZE:
+                session.log(WARNING, "message_too_large", player=player_id, size=len(data))
+                break
+            
+            if isinstance(data, bytes):
+                # Compact input: the full control state in 1 or 5 bytes (game/binary_input.py)
+                session.handle_binary_input(data, player_id)
+                continue
+            
+            msg = json.loads(data)
+            
+            # Validate message structure
+            if not isinstance(msg, dict):
+                continue
+            
+            if msg.get("type") == "input":
+                action = msg.get("action")
+                # Validate action
+                if action in INPUT_ACTIONS:
+                    session.handle_input(action, player_id)
+                else:
+                    session.log(WARNING, "invalid_action", player=player_id, action=str(action)[:32])
+            elif msg.get("type") == "start_game":
+                # Only room creator (default player) can start the game
+                if session.waiting and player_id == "default":
+                    session.start_game()
+                    # Send initial state now that game is starting
+                    await session.send_initial_state()
+                    # Broadcast game_started to all players
+                    start_message = {"type": "game_started"}
+                    await session.broadcast(session.broadcaster.frame(start_message), spectators=False)
+            elif msg.get("type") == "ping":
+                # Respond to ping with pong
+                await session.send_to(websocket, {"type": "pong"})
+        except json.JSONDecodeError:
+            session.log(WARNING, "invalid_json", player=player_id)
+            break
+        except InvalidInput as e:
+            session.log(WARNING, "invalid_binary_input", player=player_id, error=str(e))
+            break
+        except Exception as e:
+            session.log(ERROR, "message_error", player=player_id, error=str(e))
+            break
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
@@ -303,16 +465,7 @@ async def websocket_endpoint(websocket: WebSocket):
     # Track session start
     live_stats.session_started()
     
-    # Check session limit
-    if len(sessions) >= MAX_SESSIONS:
-        await websocket.send_text(json.dumps({
-            "type": "error",
-            "message": "Server at capacity. Please try again later."
-        }))
-        await websocket.close()
-        return
-    
-    session_id = str(uuid.uuid4())
+    session_id = new_session_id(SHARD_INDEX)
     session = None
     user_id = "anonymous"
     
@@ -353,6 +506,19 @@ async def websocket_endpoint(websocket: WebSocket):
                 return
             user_id = auth_result["uid"]
         
+        # New games wait for admission while the worker is over budget
+        if message.get("type") in ("start", "create_room"):
+            async def notify_queued(position):
+                await websocket.send_text(json.dumps({"type": "queued", "position": position}))
+            
+            if not await admission.admit(notify_queued):
+                await websocket.send_text(json.dumps({
+                    "type": "error",
+                    "message": "Server at capacity. Please try again later."
+                }))
+                await websocket.close()
+                return
+        
         if message.get("type") == "start":
             difficulty = message.get("difficulty", "simple")
             telemetry_mode = message.get("telemetry_mode", "standard")
@@ -380,7 +546,20 @@ async def websocket_endpoint(websocket: WebSocket):
             # Validate update rate (2-60 Hz)
             update_rate = max(2, min(60, int(update_rate)))
             
-            session = GameSession(session_id, websocket, difficulty, telemetry_mode, update_rate, fuel_mode=fuel_mode)
+            # Optional terrain seed for reproducible games
+            terrain_seed = message.get("seed")
+            if not isinstance(terrain_seed, int) or not 0 <= terrain_seed < MAX_SEED:
+                terrain_seed = None
+            
+            # Optional telemetry protocol: protocol_version 2, or "protocol": "binary"
+            protocol = requested_protocol(message)
+            
+            # Optional bundled trajectory history for low-rate clients (game/history.py)
+            history_samples = message.get("history_samples", 0)
+            if not isinstance(history_samples, int) or history_samples < 0:
+                history_samples = 0
+            
+            session = GameSession(session_id, websocket, difficulty, telemetry_mode, update_rate, fuel_mode=fuel_mode, terrain_seed=terrain_seed, spectator_hub=spectator_hub)
             session.user_id = user_id
             session.bot_name = bot_name
             session.bot_version = bot_version
@@ -389,15 +568,20 @@ async def websocket_endpoint(websocket: WebSocket):
             # Update default player name and ensure player is added
             session.players["default"]["name"] = player_name
             session.players["default"]["websocket"] = websocket
+            session.players["default"]["protocol"] = protocol
+            if history_samples:
+                session.enable_history(history_samples)
             
             sessions[session_id] = session
-            session.waiting = False  # Single-player games start immediately
+            session.start_game()  # Single-player games start immediately
+            session.on_change = publish_session
+            publish_session(session)
             
             # Send room_id back to client
-            await websocket.send_text(json.dumps({
+            await session.send_to(websocket, {
                 "type": "room_created",
                 "room_id": session_id
-            }))
+            })
             
             # Send current player list
             await session.send_player_list()
@@ -406,66 +590,19 @@ async def websocket_endpoint(websocket: WebSocket):
             try:
                 await session.send_initial_state()
             except Exception as e:
-                print(f"Error in send_initial_state: {e}")
-                import traceback
-                traceback.print_exc()
+                session.log(ERROR, "send_initial_state_failed", error=str(e))
                 raise
             
             # Start game loop in background (will wait until game starts)
             game_task = asyncio.create_task(session.start())
             
             # Handle incoming messages in parallel
-            async def handle_messages():
-                while session.running:
-                    try:
-                        data = await asyncio.wait_for(websocket.receive_text(), timeout=1.0)
-                        
-                        # Validate message size
-                        if len(data) > 1024:
-                            print(f"Message too large from {session_id}")
-                            break
-                        
-                        msg = json.loads(data)
-                        
-                        # Validate message structure
-                        if not isinstance(msg, dict):
-                            continue
-                        
-                        if msg.get("type") == "input":
-                            action = msg.get("action")
-                            # Validate action
-                            if action in ["thrust", "thrust_on", "thrust_off", "rotate_left", "rotate_right", "rotate_stop"]:
-                                session.handle_input(action, "default")
-                            else:
-                                print(f"Invalid action from {session_id}: {action}")
-                        elif msg.get("type") == "start_game":
-                            # Only room creator (default player) can start the game
-                            if session.waiting:
-                                session.start_game()
-                                # Send initial state now that game is starting
-                                await session.send_initial_state()
-                                # Broadcast game_started to all players
-                                start_message = {"type": "game_started"}
-                                for pid, player in session.players.items():
-                                    try:
-                                        await player['websocket'].send_text(json.dumps(start_message))
-                                    except:
-                                        pass
-                        elif msg.get("type") == "ping":
-                            # Respond to ping with pong
-                            await websocket.send_text(json.dumps({"type": "pong"}))
-                    except asyncio.TimeoutError:
-                        continue
-                    except json.JSONDecodeError:
-                        print(f"Invalid JSON from {session_id}")
-                        break
-                    except Exception as e:
-                        print(f"Message handling error: {e}")
-                        break
-            
-            message_task = asyncio.create_task(handle_messages())
-            
-            # Wait for game to end
+            message_task = asyncio.create_task(handle_messages(session, websocket))
+            
+            # Wait for game to end; a creator who leaves the lobby closes the room
+            await asyncio.wait({game_task, message_task}, return_when=asyncio.FIRST_COMPLETED)
+            if session.waiting:
+                session.stop()
             await game_task
             message_task.cancel()
             
@@ -477,8 +614,8 @@ async def websocket_endpoint(websocket: WebSocket):
             # Check for duplicate room name
             if room_name:
                 duplicate = any(
-                    session.room_name == room_name and session.waiting 
-                    for session in sessions.values()
+                    sessions[waiting_id].room_name == room_name
+                    for waiting_id in sessions.ids("waiting")
                 )
                 if duplicate:
                     await websocket.send_text(json.dumps({
@@ -491,22 +628,33 @@ async def websocket_endpoint(websocket: WebSocket):
             if difficulty not in ["simple", "medium", "hard"]:
                 difficulty = "simple"
             
-            session = GameSession(session_id, websocket, difficulty, "standard", 60, room_name=room_name)
+            # Optional terrain seed for reproducible games
+            terrain_seed = message.get("seed")
+            if not isinstance(terrain_seed, int) or not 0 <= terrain_seed < MAX_SEED:
+                terrain_seed = None
+            
+            # Optional telemetry protocol: protocol_version 2, or "protocol": "binary"
+            protocol = requested_protocol(message)
+            
+            session = GameSession(session_id, websocket, difficulty, "standard", 60, room_name=room_name, terrain_seed=terrain_seed, spectator_hub=spectator_hub)
             session.user_id = user_id
             
             # Update default player name and ensure player is added
             session.players["default"]["name"] = player_name
             session.players["default"]["websocket"] = websocket
+            session.players["default"]["protocol"] = protocol
             
             sessions[session_id] = session
             # Keep session.waiting = True for multiplayer rooms
+            session.on_change = publish_session
+            publish_session(session)
             
             
             # Send room_id back to client
-            await websocket.send_text(json.dumps({
+            await session.send_to(websocket, {
                 "type": "room_created",
                 "room_id": session_id
-            }))
+            })
             
             # Send current player list
             await session.send_player_list()
@@ -517,57 +665,12 @@ async def websocket_endpoint(websocket: WebSocket):
             game_task = asyncio.create_task(session.start())
             
             # Handle incoming messages in parallel
-            async def handle_messages():
-                while session.running:
-                    try:
-                        data = await asyncio.wait_for(websocket.receive_text(), timeout=1.0)
-                        
-                        # Validate message size
-                        if len(data) > 1024:
-                            print(f"Message too large from {session_id}")
-                            break
-                        
-                        msg = json.loads(data)
-                        
-                        # Validate message structure
-                        if not isinstance(msg, dict):
-                            continue
-                        
-                        if msg.get("type") == "input":
-                            action = msg.get("action")
-                            # Validate action
-                            if action in ["thrust", "thrust_on", "thrust_off", "rotate_left", "rotate_right", "rotate_stop"]:
-                                session.handle_input(action, "default")
-                            else:
-                                print(f"Invalid action from {session_id}: {action}")
-                        elif msg.get("type") == "start_game":
-                            # Only room creator (default player) can start the game
-                            if session.waiting:
-                                session.start_game()
-                                # Send initial state now that game is starting
-                                await session.send_initial_state()
-                                # Broadcast game_started to all players
-                                start_message = {"type": "game_started"}
-                                for pid, player in session.players.items():
-                                    try:
-                                        await player['websocket'].send_text(json.dumps(start_message))
-                                    except:
-                                        pass
-                        elif msg.get("type") == "ping":
-                            # Respond to ping with pong
-                            await websocket.send_text(json.dumps({"type": "pong"}))
-                    except asyncio.TimeoutError:
-                        continue
-                    except json.JSONDecodeError:
-                        print(f"Invalid JSON from {session_id}")
-                        break
-                    except Exception as e:
-                        print(f"Message handling error: {e}")
-                        break
-            
-            message_task = asyncio.create_task(handle_messages())
-            
-            # Wait for game to end
+            message_task = asyncio.create_task(handle_messages(session, websocket))
+            
+            # Wait for game to end; a creator who leaves the lobby closes the room
+            await asyncio.wait({game_task, message_task}, return_when=asyncio.FIRST_COMPLETED)
+            if session.waiting:
+                session.stop()
             await game_task
             message_task.cancel()
             
@@ -575,10 +678,16 @@ async def websocket_endpoint(websocket: WebSocket):
             room_id = message.get("room_id")
             player_name = message.get("player_name", "Player")
             
+            # Optional telemetry protocol: protocol_version 2, or "protocol": "binary"
+            protocol = requested_protocol(message)
+            
             if not room_id or room_id not in sessions:
+                # In sharded mode a join that reached the wrong worker was not sent with ?room=
+                owner = shard_of(room_id, SHARD_COUNT)
+                misrouted = SHARD_COUNT > 1 and owner is not None and owner != SHARD_INDEX
                 await websocket.send_text(json.dumps({
                     "type": "error",
-                    "message": "Room not found"
+                    "message": f"Room is on worker {owner}; connect to /ws?room={room_id}" if misrouted else "Room not found"
                 }))
                 await websocket.close()
                 return
@@ -592,7 +701,7 @@ async def websocket_endpoint(websocket: WebSocket):
             
             # Add player to session
             player_id = str(uuid.uuid4())
-            session.add_player(player_id, websocket, player_name, player_color)
+            session.add_player(player_id, websocket, player_name, player_color, protocol)
             
             # Broadcast player_joined to all players
             join_message = {
@@ -602,102 +711,75 @@ async def websocket_endpoint(websocket: WebSocket):
                 "player_color": player_color
             }
             
-            for pid, player in session.players.items():
-                try:
-                    await player['websocket'].send_text(json.dumps(join_message))
-                except:
-                    pass
+            await session.broadcast(session.broadcaster.frame(join_message), spectators=False)
             
             # Send current player list to all players
             await session.send_player_list()
             
             # Send room_joined confirmation to joining player
-            await websocket.send_text(json.dumps({
+            await session.send_to(websocket, {
                 'type': 'room_joined',
                 'room_id': room_id,
                 'room_name': session.room_name
-            }))
+            })
             
             # Only send initial state if game has already started
             if not session.waiting:
                 await session.send_initial_state()
             
             # No game loop needed - joining existing session
-            game_task = None
+            # Handle incoming messages until the player leaves or the game ends
+            message_task = asyncio.create_task(handle_messages(session, websocket, player_id))
+            finished_task = asyncio.create_task(session.wait_finished())
+            await asyncio.wait({message_task, finished_task}, return_when=asyncio.FIRST_COMPLETED)
+            message_task.cancel()
+            finished_task.cancel()
+            await session.flush(websocket)
             
-            # Handle incoming messages in parallel
-            async def handle_messages():
-                current_player_id = "default"  # Default for room creators
-                
-                # Find current player ID for joiners
-                for pid, player in session.players.items():
-                    if player['websocket'] == websocket:
-                        current_player_id = pid
-                        break
-                
-                while session.running:
-                    try:
-                        data = await asyncio.wait_for(websocket.receive_text(), timeout=1.0)
-                        
-                        # Validate message size
-                        if len(data) > 1024:
-                            print(f"Message too large from {session_id}")
-                            break
-                        
-                        msg = json.loads(data)
-                        
-                        # Validate message structure
-                        if not isinstance(msg, dict):
-                            continue
-                        
-                        if msg.get("type") == "input":
-                            action = msg.get("action")
-                            # Validate action
-                            if action in ["thrust", "thrust_on", "thrust_off", "rotate_left", "rotate_right", "rotate_stop"]:
-                                session.handle_input(action, current_player_id)
-                            else:
-                                print(f"Invalid action from {session_id}: {action}")
-                        elif msg.get("type") == "start_game":
-                            # Only room creator (default player) can start the game
-                            if session.waiting and current_player_id == "default":
-                                session.start_game()
-                                # Send initial state now that game is starting
-                                await session.send_initial_state()
-                                # Broadcast game_started to all players
-                                start_message = {"type": "game_started"}
-                                for pid, player in session.players.items():
-                                    try:
-                                        await player['websocket'].send_text(json.dumps(start_message))
-                                    except:
-                                        pass
-                        elif msg.get("type") == "ping":
-                            # Respond to ping with pong
-                            await websocket.send_text(json.dumps({"type": "pong"}))
-                    except asyncio.TimeoutError:
-                        continue
-                    except json.JSONDecodeError:
-                        print(f"Invalid JSON from {session_id}")
-                        break
-                    except Exception as e:
-                        print(f"Message handling error: {e}")
-                        break
-            
-            if game_task:
-                message_task = asyncio.create_task(handle_messages())
-                
-                # Wait for game to end
-                await game_task
-                message_task.cancel()
-            else:
-                # Just handle messages for joiners
-                await handle_messages()
+        elif message.get("type") == "resume":
+            # A player of a game drained from another worker (or a previous run of this one)
+            room_id = message.get("room_id")
+            player_id = message.get("player_id")
+            resume_token = message.get("resume_token")
+            
+            session = sessions.get(room_id)
+            if session is None:
+                snapshot = snapshots.load(room_id, accept=lambda snapshot: token_matches(
+                    snapshot['players'].get(player_id), resume_token))
+                if snapshot is not None:
+                    session = GameSession.restore(snapshot, spectator_hub=spectator_hub)
+                    sessions[room_id] = session
+                    session.on_change = publish_session
+            
+            if session is None or not session.reconnect_player(player_id, resume_token, websocket):
+                await websocket.send_text(json.dumps({
+                    "type": "error",
+                    "message": "Game not found"
+                }))
+                await websocket.close()
+                return
+            
+            session_id = room_id
+            await session.send_to(websocket, {
+                "type": "resumed",
+                "room_id": room_id,
+                "player_id": player_id
+            })
+            await session.send_to(websocket, session.build_init())
+            session.resume()  # Next scheduler tick, unless another player already resumed it
+            
+            # Play on like a player who joined the room
+            message_task = asyncio.create_task(handle_messages(session, websocket, player_id))
+            finished_task = asyncio.create_task(session.wait_finished())
+            await asyncio.wait({message_task, finished_task}, return_when=asyncio.FIRST_COMPLETED)
+            message_task.cancel()
+            finished_task.cancel()
+            await session.flush(websocket)
             
     except WebSocketDisconnect:
-        print(f"Client disconnected: {session_id}")
+        event_log.info("client_disconnected", session=session_id)
     except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        event_log.error("connection_error", session=session_id, error=str(e), traceback=traceback.format_exc())
     finally:
         # Track session end
         live_stats.session_ended()
@@ -706,9 +788,10 @@ async def websocket_endpoint(websocket: WebSocket):
             session = sessions[session_id]
             
             # Debug: Show all players before removal
-            for pid, player in session.players.items():
-                print(f"  Player {pid}: {player['name']} (websocket: {id(player['websocket'])})")
-            print(f"  Disconnecting websocket: {id(websocket)}")
+            if event_log.enabled(DEBUG):
+                session.log(DEBUG, "disconnecting", websocket=id(websocket), connections={
+                    pid: id(player['websocket']) for pid, player in session.players.items()
+                })
             
             # Find and remove disconnected player
             for pid, player in list(session.players.items()):
@@ -716,19 +799,14 @@ async def websocket_endpoint(websocket: WebSocket):
                     disconnected_player_name = player['name']
                     session.remove_player(pid)
                     
-                    # Broadcast player_left to remaining players
+                    # Broadcast player_left to remaining players (through their outbound queues)
                     if session.players:
                         left_message = {
                             "type": "player_left",
                             "player_id": pid,
                             "player_name": disconnected_player_name
                         }
-                        
-                        for remaining_pid, remaining_player in session.players.items():
-                            try:
-                                await remaining_player['websocket'].send_text(json.dumps(left_message))
-                            except:
-                                pass
+                        await session.broadcast(session.broadcaster.frame(left_message), spectators=False)
                     break
             
             # Only delete session if no players left
@@ -742,11 +820,11 @@ async def websocket_endpoint(websocket: WebSocket):
                         # Remove oldest replay
                         oldest_id = min(replays.keys(), key=lambda k: replays[k]['metadata'].get('timestamp', 0))
                         del replays[oldest_id]
-                        print(f"Removed oldest replay: {oldest_id}")
+                        event_log.debug("replay_evicted", replay=oldest_id)
                     
                     replays[replay_id] = session.replay.to_dict()
-                    print(f"Saved replay: {replay_id}")
-                    print(f"Total replays in memory: {len(replays)}")
+                    session.log(INFO, "replay_saved", replay=replay_id, replays=len(replays))
                 else:
-                    print(f"No replay to save for session {session_id}")
+                    session.log(DEBUG, "no_replay")
                 del sessions[session_id]
+                unpublish_session(session_id)
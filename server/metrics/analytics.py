@@ -108,9 +108,9 @@ class AnalyticsEngine:
         current_date = start_date
         while current_date <= end_date:
             date_str = current_date.strftime('%Y-%m-%d')
-            file_path = self.storage_path / f"games_{date_str}.json"
             
-            if file_path.exists():
+            # One file per day, or one per worker per day in sharded mode
+            for file_path in self._daily_files(date_str):
                 with open(file_path, 'r') as f:
                     daily_games = json.load(f)
                     games.extend([
@@ -120,8 +120,15 @@ class AnalyticsEngine:
             
             current_date += timedelta(days=1)
         
+        games.sort(key=lambda g: g['started_at'])
         return games
     
+    def _daily_files(self, date_str):
+        """games_DATE.json plus any games_DATE.<worker>.json written by shard workers"""
+        files = [self.storage_path / f"games_{date_str}.json"]
+        files.extend(sorted(self.storage_path.glob(f"games_{date_str}.*.json")))
+        return [file_path for file_path in files if file_path.exists()]
+    
     def _load_games_since(self, cutoff_time):
         """Load games since cutoff timestamp"""
         return self._load_games_in_range(cutoff_time, time.time())
@@ -132,6 +139,7 @@ class AnalyticsEngine:
         for file_path in sorted(self.storage_path.glob("games_*.json")):
             with open(file_path, 'r') as f:
                 games.extend(json.load(f))
+        games.sort(key=lambda g: g['started_at'])
         
         if len(games) > self.config.max_games_in_memory:
             games = games[-self.config.max_games_in_memory:]
@@ -1,75 +1,146 @@
 """
 Async metrics collector with batch writing for efficiency
+
+One collector is shared by every session in the process (`collector` below),
+so a single writer task owns the daily games_YYYY-MM-DD.json files and
+concurrent games can no longer overwrite each other's read-modify-write.
+In sharded mode every worker process writes its own daily file
+(games_YYYY-MM-DD.shard2.json) and AnalyticsEngine merges them.
 """
 import asyncio
 import json
+import os
+import time
 from pathlib import Path
 from collections import deque
 from datetime import datetime
+from game.eventlog import event_log
+
+FLUSH_INTERVAL = 1.0  # Seconds to let writes accumulate before a flush
 
 
 class MetricsCollector:
     """Collects and persists game metrics with batched async writes"""
-    
-    def __init__(self, storage_path="data/metrics", batch_size=10):
+
+    def __init__(self, storage_path="data/metrics", batch_size=10, flush_interval=FLUSH_INTERVAL, worker=None):
         self.storage_path = Path(storage_path)
-        self.storage_path.mkdir(parents=True, exist_ok=True)
-        self.batch_size = batch_size
+        self.worker = worker  # Suffix of this process's files when several share storage_path
+        self.batch_size = batch_size  # Flush early once this many games are queued
+        self.flush_interval = flush_interval
         self.pending_writes = deque()
         self.write_task = None
-        
+        self.wakeup = None
+
+        # Stats
+        self.queued = 0
+        self.written = 0
+        self.flushes = 0
+        self.write_errors = 0
+        self.max_queue_depth = 0
+        self.flush_time = 0.0
+        self.last_flush_time = 0.0
+        self.max_flush_time = 0.0
+
     async def save_game_metrics_async(self, metrics_dict):
         """Non-blocking save - queues for batch write"""
         self.pending_writes.append(metrics_dict)
-        
-        # Start batch writer if not running
-        if self.write_task is None or self.write_task.done():
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self.pending_writes))
+
+        # Start batch writer if not running (or left behind by a closed event loop)
+        if (self.write_task is None or self.write_task.done()
+                or self.write_task.get_loop() is not asyncio.get_running_loop()):
+            self.wakeup = asyncio.Event()
             self.write_task = asyncio.create_task(self._batch_writer())
-    
+        elif len(self.pending_writes) >= self.batch_size:
+            self.wakeup.set()
+
     async def _batch_writer(self):
         """Write metrics in batches to reduce I/O"""
         while self.pending_writes:
             # Wait to accumulate more writes
-            await asyncio.sleep(1)
-            
-            if not self.pending_writes:
-                break
-            
-            # Group by date
+            if len(self.pending_writes) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self.wakeup.clear()
+
+            # Group everything queued by date
             by_date = {}
-            batch_count = min(self.batch_size, len(self.pending_writes))
-            
-            for _ in range(batch_count):
-                if not self.pending_writes:
-                    break
+            while self.pending_writes:
                 metrics = self.pending_writes.popleft()
                 date_str = datetime.fromtimestamp(metrics['started_at']).strftime('%Y-%m-%d')
-                
-                if date_str not in by_date:
-                    by_date[date_str] = []
-                by_date[date_str].append(metrics)
-            
-            # Write each date's batch
-            for date_str, metrics_list in by_date.items():
-                await self._append_to_file(date_str, metrics_list)
-    
-    async def _append_to_file(self, date_str, metrics_list):
+                by_date.setdefault(date_str, []).append(metrics)
+
+            # One read-modify-write per daily file, off the event loop
+            count = sum(len(metrics_list) for metrics_list in by_date.values())
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write_batch, by_date)
+            except Exception as e:
+                self.write_errors += 1
+                event_log.error("metrics_write_failed", error=str(e))
+
+                # Days not yet written go back to the front of the queue for the next flush
+                unwritten = [metrics for metrics_list in by_date.values() for metrics in metrics_list]
+                self.written += count - len(unwritten)
+                self.pending_writes.extendleft(reversed(unwritten))
+                await asyncio.sleep(self.flush_interval)
+                continue
+            elapsed = time.perf_counter() - start
+            self.flushes += 1
+            self.written += count
+            self.flush_time += elapsed
+            self.last_flush_time = elapsed
+            self.max_flush_time = max(self.max_flush_time, elapsed)
+
+    def _write_batch(self, by_date):
+        """Append each day's metrics, removing days from by_date once written"""
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        for date_str in list(by_date):
+            self._append_to_file(date_str, by_date[date_str])
+            del by_date[date_str]
+
+    def _append_to_file(self, date_str, metrics_list):
         """Append metrics to daily file"""
-        file_path = self.storage_path / f"games_{date_str}.json"
-        
+        suffix = f".{self.worker}" if self.worker else ""
+        file_path = self.storage_path / f"games_{date_str}{suffix}.json"
+
         # Read existing (only once per batch)
         existing = []
         if file_path.exists():
             with open(file_path, 'r') as f:
                 existing = json.load(f)
-        
+
         # Append new metrics
         existing.extend(metrics_list)
-        
-        # Write back (single write operation)
-        with open(file_path, 'w') as f:
+
+        # Write back and swap in, so readers never see a partial file
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
             json.dump(existing, f)
-    
+        os.replace(tmp_path, file_path)
+
     def get_pending_count(self):
         """Get number of pending writes (for monitoring)"""
         return len(self.pending_writes)
+
+    def get_stats(self):
+        """Get queue depth, flush latency and write throughput (for monitoring)"""
+        return {
+            'queue_depth': len(self.pending_writes),
+            'max_queue_depth': self.max_queue_depth,
+            'queued': self.queued,
+            'written': self.written,
+            'flushes': self.flushes,
+            'write_errors': self.write_errors,
+            'last_flush_ms': round(self.last_flush_time * 1000, 3),
+            'max_flush_ms': round(self.max_flush_time * 1000, 3),
+            'avg_flush_ms': round(self.flush_time / self.flushes * 1000, 3) if self.flushes else 0.0,
+            'games_per_second': round(self.written / self.flush_time, 1) if self.flush_time else 0.0
+        }
+
+
+# Shared by every session in this process
+collector = MetricsCollector()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Run the game server as N sharded worker processes
+
+Each worker is a separate uvicorn process on base_port + index that owns the
+sessions it creates (see game/sharding.py). Put nginx in front with the
+config printed by --nginx so room joins, spectators and replays reach the
+owning worker. The workers share lobby listings through a SQLite session
+directory (game/directory.py):
+
+    python shards.py --workers 4 --base-port 8000
+    python shards.py --workers 4 --base-port 8000 --nginx > /etc/nginx/conf.d/lunarlander-shards.conf
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+from game.sharding import MAX_SHARDS, nginx_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--base-port", type=int, default=8000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--directory", default="data/session_directory.db",
+                        help="SQLite file the workers share for /games and /rooms")
+    parser.add_argument("--nginx", action="store_true", help="Print the nginx routing config and exit")
+    args = parser.parse_args()
+
+    if not 1 <= args.workers <= MAX_SHARDS:
+        parser.error(f"--workers must be between 1 and {MAX_SHARDS}")
+
+    if args.nginx:
+        sys.stdout.write(nginx_config(args.workers, args.base_port, args.host))
+        return
+
+    workers = []
+    for shard in range(args.workers):
+        env = dict(os.environ, SHARD_INDEX=str(shard), SHARD_COUNT=str(args.workers),
+                   SESSION_DIRECTORY=args.directory)
+        port = args.base_port + shard
+        workers.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", args.host, "--port", str(port)],
+            env=env
+        ))
+        print(f"Shard {shard} on {args.host}:{port} (pid {workers[-1].pid})")
+
+    try:
+        # Exit as soon as any worker does; its rooms would be unreachable
+        os.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.send_signal(signal.SIGTERM)
+        for worker in workers:
+            worker.wait()
+
+
+if __name__ == "__main__":
+    main()
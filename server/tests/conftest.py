@@ -0,0 +1,42 @@
+"""
+Shared test fixtures
+"""
+import pytest
+from unittest.mock import AsyncMock
+from game.physics import LanderBatch
+from game.scheduler import TickScheduler
+from game.session import GameSession
+from game.spectator_hub import SpectatorHub
+from metrics.collector import MetricsCollector
+
+
+class SessionFactory:
+    """Builds GameSessions on one test's private scheduler, spectator hub and metrics collector"""
+
+    def __init__(self, metrics_path):
+        self.scheduler = TickScheduler()
+        self.spectator_hub = SpectatorHub()
+        self.metrics_collector = MetricsCollector(storage_path=metrics_path)
+
+    def services(self, **kwargs):
+        """GameSession keyword arguments; every session gets its own LanderBatch unless given one"""
+        return {
+            "lander_batch": LanderBatch(),
+            "scheduler": self.scheduler,
+            "spectator_hub": self.spectator_hub,
+            "metrics_collector": self.metrics_collector,
+            **kwargs
+        }
+
+    def __call__(self, session_id="test", difficulty="simple", telemetry_mode="standard", **kwargs):
+        """A new session whose default player has an AsyncMock websocket"""
+        return GameSession(session_id, AsyncMock(), difficulty, telemetry_mode, **self.services(**kwargs))
+
+    def restore(self, snapshot, **kwargs):
+        return GameSession.restore(snapshot, **self.services(**kwargs))
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    """Session factory that keeps tests off the process-wide scheduler, hub and metrics files"""
+    return SessionFactory(tmp_path / "metrics")
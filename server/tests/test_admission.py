@@ -0,0 +1,107 @@
+"""
+Test load-driven admission control and load shedding
+"""
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+from game import admission as admission_module
+from game.admission import AdmissionController
+from game.scheduler import TickScheduler
+
+
+def overload(scheduler):
+    """Fill the scheduler's load window with ticks that take most of the interval"""
+    scheduler.tick_times.extend([0.9 / scheduler.tick_rate] * 100)
+
+
+@pytest.mark.asyncio
+async def test_admits_immediately_when_healthy():
+    """Test a healthy worker admits new games without queueing them"""
+    controller = AdmissionController({}, max_sessions=10, scheduler=TickScheduler())
+    notify = AsyncMock()
+
+    assert await controller.admit(notify)
+    notify.assert_not_awaited()
+    assert controller.get_stats()['admitted'] == 1
+
+
+@pytest.mark.asyncio
+async def test_overloaded_worker_queues_until_load_drops(monkeypatch):
+    """Test new games wait in order with position updates while the worker is over budget"""
+    monkeypatch.setattr(admission_module, "QUEUE_POLL", 0.01)
+    scheduler = TickScheduler()
+    controller = AdmissionController({}, max_sessions=10, scheduler=scheduler)
+    overload(scheduler)
+    assert controller.health()['pressure'] >= 1.0
+
+    positions = {"first": [], "second": []}
+
+    async def wait(name):
+        async def notify(position):
+            positions[name].append(position)
+        return await controller.admit(notify)
+
+    first = asyncio.create_task(wait("first"))
+    await asyncio.sleep(0.05)
+    second = asyncio.create_task(wait("second"))
+    await asyncio.sleep(0.05)
+    assert controller.get_stats()['waiting'] == 2
+
+    scheduler.tick_times.clear()
+    assert await first and await second
+    assert positions == {"first": [1], "second": [2]}
+    assert controller.get_stats()['waiting'] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_or_expired_queue_refuses(make_session, monkeypatch):
+    """Test games are refused when the queue is full or they wait too long"""
+    monkeypatch.setattr(admission_module, "QUEUE_POLL", 0.01)
+    monkeypatch.setattr(admission_module, "MAX_QUEUE", 1)
+    now = [0.0]
+    controller = AdmissionController({"a": make_session("a")}, max_sessions=1,
+                                     scheduler=TickScheduler(), clock=lambda: now[0])
+
+    waiting = asyncio.create_task(controller.admit())
+    await asyncio.sleep(0.02)
+    assert not await controller.admit()  # Queue full
+
+    now[0] = admission_module.MAX_QUEUE_WAIT
+    assert not await waiting
+    assert controller.get_stats()['rejected'] == 2
+
+
+@pytest.mark.asyncio
+async def test_shedding_throttles_bots_first_and_recovers(make_session):
+    """Test overload caps bot telemetry before human games and is undone once load stays low"""
+    now = [0.0]
+    scheduler = TickScheduler()
+    bot = make_session("bot")
+    bot.bot_name = "fastbot"
+    llm = make_session("llm", update_rate=2)
+    llm.bot_name = "llmbot"
+    player = make_session("player")
+    sessions = {"bot": bot, "llm": llm, "player": player}
+    for session in sessions.values():
+        divisor = int(60 / session.update_rate)
+        scheduler.sessions[session] = [divisor, 0, divisor]
+    controller = AdmissionController(sessions, max_sessions=10, scheduler=scheduler, clock=lambda: now[0])
+
+    overload(scheduler)
+    assert controller.evaluate() == 1
+    assert scheduler.sessions[bot][0] == 3  # 20 Hz
+    assert scheduler.sessions[llm][0] == 30  # Already slower than the cap
+    assert scheduler.sessions[player][0] == 1
+
+    assert controller.evaluate() == 2
+    assert scheduler.sessions[bot][0] == 6  # 10 Hz
+    assert scheduler.sessions[player][0] == 2  # 30 Hz
+    assert controller.get_stats()['throttled'] == 2
+
+    scheduler.tick_times.clear()
+    assert controller.evaluate() == 2  # Load must stay low for a while first
+    now[0] += admission_module.RECOVER_AFTER
+    assert controller.evaluate() == 1
+    now[0] += admission_module.RECOVER_AFTER
+    assert controller.evaluate() == 0
+    assert [scheduler.sessions[s][0] for s in (bot, llm, player)] == [1, 30, 1]
@@ -0,0 +1,57 @@
+"""
+Test compact binary input messages
+"""
+import pytest
+import json
+from unittest.mock import AsyncMock
+from game.binary_input import encode_input, decode_input, InvalidInput
+
+
+def test_input_round_trip():
+    """Test control states survive encode/decode, with and without a client tick"""
+    assert decode_input(encode_input(True)) == (True, None, None)
+    assert decode_input(encode_input(False, "left", 42)) == (False, "left", 42)
+    assert len(encode_input(True, "right")) == 1
+    assert len(encode_input(True, "right", 7)) == 5
+
+
+def test_malformed_input_is_rejected():
+    """Test wrong lengths and unknown bits raise InvalidInput (a ValueError)"""
+    with pytest.raises(InvalidInput):
+        decode_input(b"")
+    with pytest.raises(InvalidInput):
+        decode_input(b"\x01\x00")
+    with pytest.raises(InvalidInput):
+        decode_input(b"\x80")
+    assert issubclass(InvalidInput, ValueError)
+
+
+def test_binary_input_sets_full_control_state(make_session):
+    """Test a binary input replaces thrust and rotation, counting only changes"""
+    session = make_session()
+
+    session.handle_binary_input(encode_input(True, "left"))
+    session.handle_binary_input(encode_input(True, "left"))
+    assert session.current_thrust is True
+    assert session.current_rotate == "left"
+    assert session.input_count == 2
+
+    session.handle_binary_input(encode_input(False, None))
+    assert session.current_thrust is False
+    assert session.current_rotate is None
+
+
+def test_client_tick_is_echoed_in_telemetry(make_session):
+    """Test the last client tick comes back as input_tick"""
+    session = make_session()
+    session.start_time = session.clock()
+    assert 'input_tick' not in session.build_telemetry()
+
+    session.handle_binary_input(encode_input(True, None, 1234))
+    assert session.build_telemetry()['input_tick'] == 1234
+
+    session.add_player("p2", AsyncMock(), "Second", "#fff")
+    session.handle_binary_input(encode_input(False, None, 9), "p2")
+    players = json.loads(json.dumps(session.build_telemetry()))['players']
+    assert players['default']['input_tick'] == 1234
+    assert players['p2']['input_tick'] == 9
@@ -0,0 +1,121 @@
+"""
+Test packed binary telemetry frames
+"""
+import pytest
+from unittest.mock import AsyncMock
+from game.binary_telemetry import encode_telemetry, decode_telemetry, HEADER, LANDER, ZONE, ADVANCED, PLAYER, INPUT_TICK
+from game.binary_input import encode_input
+from game.broadcast import requested_protocol, PROTOCOL_LEGACY
+from game.session import PROTOCOL_SPLIT, PROTOCOL_BINARY
+
+
+def flying_session(make_session, telemetry_mode="standard"):
+    session = make_session(telemetry_mode=telemetry_mode)
+    session.record_replay = False
+    session.start_time = session.clock()
+    session.lander.vx = 1.5
+    session.lander.vy = 2.25
+    session.current_thrust = True
+    return session
+
+
+def test_standard_frame_round_trip(make_session):
+    """Test a standard telemetry message survives encode/decode"""
+    message = flying_session(make_session).build_telemetry(PROTOCOL_SPLIT)
+    payload = encode_telemetry(message)
+    decoded = decode_telemetry(payload)
+
+    assert len(payload) == HEADER.size + LANDER.size + ZONE.size
+    assert decoded['lander'] == pytest.approx(message['lander'])
+    assert decoded['speed'] == pytest.approx(message['speed'])
+    assert decoded['altitude'] == pytest.approx(message['altitude'])
+    assert decoded['thrusting'] is True
+    assert decoded['nearest_landing_zone']['x1'] == message['nearest_landing_zone']['x1']
+    assert decoded['static_version'] == message['static_version']
+
+
+def test_advanced_frame_round_trip(make_session):
+    """Test advanced fields are packed, with None encoded as NaN"""
+    session = flying_session(make_session, "advanced")
+    message = session.build_telemetry(PROTOCOL_SPLIT)
+    decoded = decode_telemetry(encode_telemetry(message))
+
+    assert decoded['angle_degrees'] == pytest.approx(message['angle_degrees'])
+    assert decoded['max_possible_score'] == message['max_possible_score']
+    assert decoded['time_to_ground'] == pytest.approx(message['time_to_ground'])
+    assert decoded['is_safe_speed'] == message['is_safe_speed']
+
+    session.lander.vy = -1.0  # Moving up - no predicted impact
+    decoded = decode_telemetry(encode_telemetry(session.build_telemetry(PROTOCOL_SPLIT)))
+    assert decoded['time_to_ground'] is None
+    assert decoded['impact_speed'] is None
+
+
+def test_multiplayer_frame_has_player_records(make_session):
+    """Test multiplayer frames carry one record per player in player_list order"""
+    session = flying_session(make_session)
+    session.add_player("p2", AsyncMock(), "Second", "#fff")
+    session.players["p2"]['lander'].crashed = True
+    payload = encode_telemetry(session.build_telemetry(PROTOCOL_SPLIT))
+    decoded = decode_telemetry(payload)
+
+    assert len(payload) == HEADER.size + LANDER.size + ZONE.size + 2 * PLAYER.size
+    assert [player['index'] for player in decoded['players']] == [0, 1]
+    assert decoded['players'][1]['lander']['crashed'] is True
+    assert decoded['players'][0]['thrusting'] is False
+
+
+@pytest.mark.asyncio
+async def test_binary_player_gets_bytes(make_session):
+    """Test binary clients get telemetry via send_bytes and other messages as JSON text"""
+    session = flying_session(make_session)
+    session.players['default']['protocol'] = PROTOCOL_BINARY
+
+    await session.send_telemetry()
+    await session.send_player_list()
+    await session.flush()
+
+    payload = session.websocket.send_bytes.call_args.args[0]
+    assert decode_telemetry(payload)['lander']['x'] == pytest.approx(session.lander.x)
+    assert '"player_list"' in session.websocket.send_text.call_args.args[0]
+
+
+def test_requested_protocol():
+    """Test start, create_room and join_room messages select the protocol the same way"""
+    assert requested_protocol({"type": "join_room", "protocol": "binary"}) == PROTOCOL_BINARY
+    assert requested_protocol({"type": "create_room", "protocol_version": 2}) == PROTOCOL_SPLIT
+    assert requested_protocol({"type": "start", "protocol_version": 99}) == PROTOCOL_LEGACY
+    assert requested_protocol({"type": "start"}) == PROTOCOL_LEGACY
+
+
+@pytest.mark.asyncio
+async def test_binary_room_player_gets_multiplayer_frames(make_session):
+    """Test a player joining a room with protocol binary gets FLAG_MULTIPLAYER frames"""
+    session = flying_session(make_session)
+    joiner = AsyncMock()
+    session.add_player("p2", joiner, "Second", "#fff", requested_protocol({"type": "join_room", "protocol": "binary"}))
+
+    await session.send_telemetry()
+    await session.flush()
+
+    decoded = decode_telemetry(joiner.send_bytes.call_args.args[0])
+    assert [player['index'] for player in decoded['players']] == [0, 1]
+    assert not session.websocket.send_bytes.called
+
+
+def test_input_tick_is_echoed_in_binary_frames(make_session):
+    """Test binary frames carry input_tick only once the player has sent one"""
+    session = flying_session(make_session)
+    assert 'input_tick' not in decode_telemetry(encode_telemetry(session.build_telemetry(PROTOCOL_SPLIT)))
+
+    session.handle_binary_input(encode_input(True, None, 1234))
+    payload = encode_telemetry(session.build_telemetry(PROTOCOL_SPLIT))
+    decoded = decode_telemetry(payload)
+    assert len(payload) == HEADER.size + LANDER.size + INPUT_TICK.size + ZONE.size
+    assert decoded['input_tick'] == 1234
+    assert decoded['nearest_landing_zone'] is not None
+
+    session.add_player("p2", AsyncMock(), "Second", "#fff")
+    session.handle_binary_input(encode_input(False, None, 9), "p2")
+    decoded = decode_telemetry(encode_telemetry(session.build_telemetry(PROTOCOL_SPLIT)))
+    assert [player['input_tick'] for player in decoded['players']] == [1234, 9]
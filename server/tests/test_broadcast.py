@@ -0,0 +1,80 @@
+"""
+Test serialize-once broadcasting
+"""
+import pytest
+import json
+from unittest.mock import AsyncMock, patch
+from game.broadcast import Broadcaster, splice_json
+from game.physics import LanderBatch
+from game.session import GameSession, PROTOCOL_LEGACY, PROTOCOL_SPLIT
+from game.spectator_hub import SpectatorHub
+
+
+def test_frame_encodes_once_per_format():
+    """Test a frame is serialized once per format no matter how many sends"""
+    broadcaster = Broadcaster()
+    frame = broadcaster.frame({"type": "telemetry", "x": 1}, {"full": lambda m: json.dumps({**m, "terrain": [1, 2]})})
+
+    payloads = [frame.payload() for _ in range(5)] + [frame.payload("full") for _ in range(5)]
+
+    assert payloads[0] is payloads[4]
+    assert json.loads(payloads[-1])["terrain"] == [1, 2]
+    stats = broadcaster.get_stats()
+    assert stats['encodes'] == 2
+    assert stats['sends'] == 10
+
+
+def test_formats_without_encoder_share_json_payload():
+    """Test formats with no encoder of their own reuse the one JSON payload"""
+    broadcaster = Broadcaster()
+    frame = broadcaster.frame({"type": "game_over"})
+
+    assert frame.payload(1) is frame.payload(2)
+    assert broadcaster.get_stats()['encodes'] == 1
+
+
+def test_splice_json_appends_encoded_members():
+    """Test pre-encoded members are spliced into the message's JSON"""
+    members = json.dumps({"terrain": {"points": [[0, 1]]}, "all_landing_zones": []})[1:-1]
+
+    assert json.loads(splice_json({"type": "telemetry", "x": 1}, members)) == {
+        "type": "telemetry", "x": 1, "terrain": {"points": [[0, 1]]}, "all_landing_zones": []
+    }
+    assert json.loads(splice_json({}, members))["all_landing_zones"] == []
+    assert splice_json({"x": 1}, "") == '{"x": 1}'
+
+
+def test_end_tick_tracks_encode_cost():
+    """Test per-tick encode time is rolled up at the end of each tick"""
+    broadcaster = Broadcaster()
+    broadcaster.record_encode(0.002)
+    broadcaster.record_encode(0.001)
+    broadcaster.end_tick()
+    broadcaster.end_tick()
+
+    stats = broadcaster.get_stats()
+    assert stats['last_tick_encode_ms'] == 0
+    assert stats['max_tick_encode_ms'] == 3
+    assert stats['avg_tick_encode_ms'] == 1.5
+
+
+@pytest.mark.asyncio
+async def test_telemetry_serialized_once_for_many_spectators():
+    """Test 100 spectators on one protocol cost one json.dumps per tick"""
+    broadcaster = Broadcaster()
+    hub = SpectatorHub(broadcaster=broadcaster)
+    session = GameSession("test", AsyncMock(), "simple", lander_batch=LanderBatch(),
+                          broadcaster=broadcaster, spectator_hub=hub)
+    spectators = [AsyncMock() for _ in range(100)]
+    for i, spectator in enumerate(spectators):
+        hub.subscribe(session.session_id, spectator, PROTOCOL_SPLIT if i % 2 else PROTOCOL_LEGACY)
+    session.publish_spectator_init()
+    await session.flush()
+
+    with patch('game.broadcast.json.dumps', wraps=json.dumps) as dumps:
+        await session.send_telemetry(send_to_players=False)
+        await session.flush()
+
+    assert dumps.call_count == 2
+    payloads = {spectator.send_text.call_args.args[0] for spectator in spectators}
+    assert len(payloads) == 2
@@ -0,0 +1,171 @@
+"""
+Test the session directory behind /games and /rooms
+"""
+import pytest
+import asyncio
+import sqlite3
+import time
+from unittest.mock import AsyncMock
+from game.directory import SessionDirectory, SQLiteSessionDirectory, CachedListing
+from game.physics import LanderBatch
+from game.session import GameSession
+
+
+def room(room_id, players=1, status="waiting"):
+    return {"id": room_id, "name": room_id, "player_count": players, "difficulty": "simple",
+            "status": status, "user_id": "anonymous", "spectators": 0, "start_time": None}
+
+
+def test_memory_directory_publish_and_remove():
+    """Test summaries are updated in place and removed by id"""
+    directory = SessionDirectory(shard=2)
+    directory.publish([room("a"), room("b")])
+    directory.publish([room("a", players=3)])
+    directory.remove("b")
+
+    assert directory.list() == [{**room("a", players=3), "shard": 2}]
+
+
+def test_sqlite_directory_is_shared_between_workers(tmp_path):
+    """Test every worker lists the rooms published by the others"""
+    path = str(tmp_path / "directory.db")
+    first = SQLiteSessionDirectory(path, shard=0)
+    second = SQLiteSessionDirectory(path, shard=1)
+
+    first.publish([room("a")])
+    second.publish([room("b", status="playing")])
+
+    assert sorted(r["id"] for r in first.list()) == ["a", "b"]
+    assert {r["id"]: r["shard"] for r in second.list()} == {"a": 0, "b": 1}
+
+
+def test_sqlite_directory_expires_and_resets_stale_rows(tmp_path):
+    """Test rows not republished within ttl are hidden and a restarted worker starts clean"""
+    path = str(tmp_path / "directory.db")
+    now = [1000.0]
+    directory = SQLiteSessionDirectory(path, shard=0, ttl=30, clock=lambda: now[0])
+    directory.publish([room("a")])
+
+    now[0] += 31
+    assert directory.list() == []
+
+    directory.publish([room("a")])
+    assert len(directory.list()) == 1
+    restarted = SQLiteSessionDirectory(path, shard=0, clock=lambda: now[0])
+    assert restarted.list() == []
+
+
+@pytest.mark.asyncio
+async def test_sqlite_writes_do_not_block_the_event_loop(tmp_path):
+    """Test publishing while another worker holds the write lock returns at once and is written later"""
+    path = str(tmp_path / "directory.db")
+    directory = SQLiteSessionDirectory(path, shard=0)
+    other_worker = sqlite3.connect(path, isolation_level=None)
+    other_worker.execute("BEGIN IMMEDIATE")
+
+    start = time.perf_counter()
+    directory.publish([room("a")])
+    directory.publish([room("a", players=2), room("b")])
+    directory.remove("b")
+    assert time.perf_counter() - start < 0.05
+    assert directory.get_stats()['pending_writes'] == 2  # Latest change per room
+
+    await asyncio.sleep(0.2)  # The loop keeps running while the write waits
+    assert directory.list() == []
+    other_worker.execute("COMMIT")
+    await directory.flush()
+
+    assert directory.list() == [{**room("a", players=2), "shard": 0}]
+    assert directory.get_stats()['writes'] == 1
+
+
+def test_session_summary_tracks_status():
+    """Test a session's summary reports waiting, playing and finished"""
+    session = GameSession("abc", AsyncMock(), "medium", lander_batch=LanderBatch(), room_name="Room")
+    assert session.summary()["status"] == "waiting"
+
+    session.waiting = False
+    session.running = True
+    session.start_time = session.clock()
+    summary = session.summary()
+    assert (summary["status"], summary["name"], summary["player_count"]) == ("playing", "Room", 1)
+
+    session.stop()
+    assert session.summary()["status"] == "finished"
+
+
+def test_version_only_changes_with_content(tmp_path):
+    """Test republishing identical summaries keeps the version (and so the ETag)"""
+    for directory in (SessionDirectory(), SQLiteSessionDirectory(str(tmp_path / "directory.db"))):
+        directory.publish([room("a")])
+        version = directory.version()
+
+        directory.publish([room("a")])
+        assert directory.version() == version
+
+        directory.publish([room("a", players=2)])
+        assert directory.version() > version
+        version = directory.version()
+        directory.remove("a")
+        directory.remove("a")
+        assert directory.version() == version + 1
+
+
+def test_sqlite_version_changes_when_rows_expire(tmp_path):
+    """Test a worker's rows expiring invalidates the listing even when nothing is published"""
+    path = str(tmp_path / "directory.db")
+    now = [1000.0]
+    stopped = SQLiteSessionDirectory(path, shard=0, ttl=30, clock=lambda: now[0])
+    active = SQLiteSessionDirectory(path, shard=1, ttl=30, clock=lambda: now[0])
+    listing = CachedListing(active, lambda rooms: sorted(r["id"] for r in rooms))
+    stopped.publish([room("a")])
+    active.publish([room("b")])
+    etag, body = listing.get()
+
+    now[0] += 20
+    active.publish([room("b")])
+    assert listing.get() == (etag, body)
+
+    now[0] += 11  # "a" expires; "b" was republished 11s ago
+    etag, body = listing.get()
+    assert body == '["b"]'
+    version = active.version()
+    active.publish([room("b")])  # Deletes the expired row without changing the list
+    assert active.version() == version
+    assert listing.get() == (etag, body)
+
+    stopped.publish([room("a")])
+    assert active.version() > version
+    assert listing.get()[1] == '["a", "b"]'
+
+
+def test_sqlite_version_is_shared_between_workers(tmp_path):
+    """Test a change published by one worker invalidates every worker's cache"""
+    path = str(tmp_path / "directory.db")
+    first = SQLiteSessionDirectory(path, shard=0)
+    second = SQLiteSessionDirectory(path, shard=1)
+    listing = CachedListing(first, lambda rooms: sorted(r["id"] for r in rooms))
+
+    first.publish([room("a")])
+    etag, body = listing.get()
+    second.publish([room("b")])
+    new_etag, new_body = listing.get()
+
+    assert first.epoch == second.epoch
+    assert new_etag != etag
+    assert new_body == '["a", "b"]'
+
+
+def test_cached_listing_rebuilds_once_per_version():
+    """Test unchanged polls reuse the serialized body and ETag"""
+    directory = SessionDirectory()
+    listing = CachedListing(directory, lambda rooms: {"rooms": rooms})
+    directory.publish([room("a")])
+
+    first = listing.get()
+    assert listing.get() == first
+    assert listing.builds == 1
+
+    directory.publish([room("b")])
+    assert listing.get()[0] != first[0]
+    assert listing.builds == 2
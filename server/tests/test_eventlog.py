@@ -0,0 +1,105 @@
+"""
+Test the non-blocking structured event log
+"""
+import pytest
+import asyncio
+import io
+import json
+from unittest.mock import AsyncMock
+from game.eventlog import EventLog, DEBUG, INFO, WARNING, parse_sample_rates
+from game.physics import LanderBatch
+from game.session import GameSession
+
+
+class CountingStream(io.StringIO):
+    """StringIO that counts write calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+@pytest.mark.asyncio
+async def test_events_are_written_in_the_background():
+    """Test emit only queues; the writer batches many events into one write off the event loop"""
+    stream = CountingStream()
+    log = EventLog(fmt="json", stream=stream, flush_interval=0.01)
+
+    for i in range(200):
+        log.info("tick", session="s1", n=i)
+    assert stream.writes == 0  # Nothing written from inside the loop
+
+    await asyncio.wait_for(log.write_task, timeout=1)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 200
+    assert json.loads(lines[-1])["n"] == 199
+    assert stream.writes == 1
+    assert log.get_stats()['written'] == 200
+
+
+@pytest.mark.asyncio
+async def test_level_sampling_and_backlog_limits():
+    """Test events below the level or sampled out are skipped and a full backlog drops the oldest"""
+    log = EventLog(level=INFO, sample_rates=parse_sample_rates("input=0, spectator=1"),
+                   stream=io.StringIO(), max_pending=3, ring_size=10)
+
+    log.debug("ignored")
+    log.info("input", player="p1")
+    for i in range(5):
+        log.warning("slow", n=i)
+
+    stats = log.get_stats()
+    assert stats['filtered'] == 1
+    assert stats['sampled_out'] == 1
+    assert stats['dropped'] == 2
+    assert [event["n"] for event in log.recent(level=WARNING)] == [0, 1, 2, 3, 4]
+    assert list(event["n"] for event in log.pending) == [2, 3, 4]
+    log.write_task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_session_input_events_carry_session_and_player():
+    """Test input changes are debug events tagged with session and player, repeats are not logged"""
+    log = EventLog(level=DEBUG, stream=io.StringIO())
+    session = GameSession("room-1", AsyncMock(), "simple", lander_batch=LanderBatch(), event_log=log)
+
+    for _ in range(3):
+        session.handle_input("thrust_on")
+    session.handle_input("thrust_off")
+
+    events = [event for event in log.recent() if event["event"] == "input"]
+    assert [event["action"] for event in events] == ["thrust_on", "thrust_off"]
+    assert events[0]["session"] == "room-1" and events[0]["player"] == "default"
+    assert events[0]["level"] == "debug"
+
+    log.configure(level="info")
+    session.handle_input("thrust_on")
+    assert log.get_stats()['filtered'] == 0  # Skipped before building the event
+    log.write_task.cancel()
+
+
+def test_text_format_and_no_event_loop():
+    """Test without a running loop events are written straight away in the text format"""
+    stream = io.StringIO()
+    log = EventLog(stream=stream)
+
+    log.warning("overloaded", pressure=1.2, shed_level=1, reason=None)
+    line = stream.getvalue()
+    assert "WARNING overloaded pressure=1.2 shed_level=1" in line
+    assert "reason" not in line
+
+
+def test_reserved_fields_do_not_overwrite_the_event():
+    """Test fields named time, level or event are prefixed instead of replacing the event's own keys"""
+    log = EventLog(stream=io.StringIO())
+
+    log.info("game_over", time=12.5, level=3, event="landed", score=900)
+    record = log.recent()[-1]
+    assert record["event"] == "game_over" and record["level"] == "info"
+    assert record["time"] > 1e9  # Wall clock, not the field
+    assert (record["field_time"], record["field_level"], record["field_event"]) == (12.5, 3, "landed")
+    assert record["score"] == 900
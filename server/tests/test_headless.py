@@ -0,0 +1,59 @@
+"""
+Test headless max-speed simulation
+"""
+import pytest
+from game.headless import HeadlessGame, SimClock, scripted
+
+
+def test_free_fall_ends_in_crash_or_landing():
+    """Test a game with no input runs to completion on simulated time"""
+    game = HeadlessGame(difficulty="simple")
+    
+    result = game.run(lambda telemetry: None)
+    
+    assert result['crashed'] or result['landed']
+    assert not result['timed_out']
+    # ~27s of free fall from y=100 at lunar gravity, simulated not waited
+    assert 10 < result['time'] < 60
+    assert result['frames'] == round(result['time'] * 60)
+
+def test_scripted_inputs_are_applied():
+    """Test a scripted input stream drives the lander"""
+    game = HeadlessGame(difficulty="simple")
+    
+    game.run(scripted(["thrust_on"] * 30 + ["thrust_off"]))
+    
+    assert game.session.input_count == 31
+    assert game.session.lander.fuel < game.session.lander.max_fuel
+
+def test_controller_receives_server_telemetry():
+    """Test controllers see the same telemetry message the server sends"""
+    seen = []
+    game = HeadlessGame(difficulty="medium", update_rate=10)
+    
+    def controller(telemetry):
+        seen.append(telemetry)
+        return ["rotate_stop"]
+    
+    game.run(controller)
+    
+    assert seen[0]['type'] == "telemetry"
+    assert 'nearest_landing_zone' in seen[0]
+    assert 'estimated_score' in seen[0]  # Advanced telemetry by default
+    # Consulted at update_rate, not every frame
+    assert len(seen) == (game.session.frame_count + 5) // 6
+
+def test_max_time_stops_episode():
+    """Test episodes that never finish are cut off at max_time"""
+    game = HeadlessGame(difficulty="simple", max_time=1.0)
+    
+    result = game.run(lambda telemetry: ["thrust_on"])
+    
+    assert result['timed_out']
+    assert result['score'] == 0
+
+def test_sim_clock_advances_by_dt():
+    """Test simulated clock only moves when advanced"""
+    clock = SimClock()
+    clock.advance(0.5)
+    assert clock() == 0.5
@@ -0,0 +1,85 @@
+"""
+Test bundled trajectory history for low-rate telemetry
+"""
+import pytest
+import json
+from unittest.mock import AsyncMock
+from game.history import TrajectoryHistory, HISTORY_FIELDS, MAX_HISTORY_SAMPLES
+from game.physics import LanderBatch
+from game.session import GameSession
+from game.spectator_hub import SpectatorHub
+from game.scheduler import TickScheduler
+
+
+def test_bundle_downsamples_to_newest_states():
+    """Test states are evenly downsampled and always end at the newest one"""
+    history = TrajectoryHistory(4)
+    for tick in range(12):
+        history.record(tick / 60, (tick, 2 * tick, 0.5, -0.5, 0.1, 900.0, False, False))
+
+    bundle = history.bundle()
+
+    assert list(bundle) == ['t'] + list(HISTORY_FIELDS)
+    assert bundle['x'] == [2, 5, 8, 11]
+    assert bundle['y'] == [4, 10, 16, 22]
+    assert bundle['t'][-1] == round(11 / 60, 3)
+    assert history.bundle()['x'] == []
+
+
+def test_short_history_is_sent_whole():
+    """Test fewer states than samples are all kept, and samples are capped"""
+    history = TrajectoryHistory(1000)
+    for tick in range(3):
+        history.record(tick, (tick, 0, 0, 0, 0, 0, False, False))
+
+    assert history.samples == MAX_HISTORY_SAMPLES
+    assert history.bundle()['x'] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_low_rate_player_gets_history_columns():
+    """Test each low-rate message carries the states simulated since the last one"""
+    clock = iter(range(1000)).__next__
+    session = GameSession("test", AsyncMock(), "simple", update_rate=5, lander_batch=LanderBatch(),
+                          clock=lambda: clock() / 60, spectator_hub=SpectatorHub())
+    session.record_replay = False
+    session.running = True
+    session.start_time = 0
+    session.enable_history(4)
+
+    for frame in range(13):
+        await session.tick(1 / 60, frame % 12 == 0)
+        await session.flush()
+
+    messages = [json.loads(call.args[0]) for call in session.websocket.send_text.call_args_list]
+    assert len(messages) == 2
+    assert len(messages[0]['history']['x']) == 1
+    history = messages[1]['history']
+    assert len(history['t']) == 4
+    assert history['t'] == sorted(history['t'])
+    assert history['x'][-1] == pytest.approx(messages[1]['lander']['x'], abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_throttled_session_keeps_whole_interval():
+    """Test history spans every tick since the last message after throttle() stretches the interval"""
+    clock = iter(range(1000)).__next__
+    scheduler = TickScheduler()
+    session = GameSession("test", AsyncMock(), "simple", update_rate=60, lander_batch=LanderBatch(),
+                          clock=lambda: clock() / 60, spectator_hub=SpectatorHub(), scheduler=scheduler)
+    session.record_replay = False
+    session.running = True
+    session.start_time = 0
+    session.enable_history(30)
+    scheduler.register(session, divisor=1)
+    scheduler.throttle(session, 10)  # Shed from 60 Hz to 10 Hz
+    scheduler.run_task.cancel()
+
+    for _ in range(13):
+        await scheduler._tick()
+        await session.flush()
+
+    messages = [json.loads(call.args[0]) for call in session.websocket.send_text.call_args_list]
+    assert len(messages) == 3  # Ticks 0, 6 and 12
+    for message in messages[1:]:
+        assert len(message['history']['t']) == 6
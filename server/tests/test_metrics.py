@@ -3,9 +3,11 @@ Test metrics collection system
 """
 import pytest
 import asyncio
+import json
 import time
 from metrics.game_metrics import GameMetrics
 from metrics.collector import MetricsCollector
+from metrics.analytics import AnalyticsEngine
 from metrics.live_stats import LiveStatsTracker
 
 
@@ -87,6 +89,89 @@ async def test_metrics_collector_async():
     assert collector.get_pending_count() == 0
 
 
+
+@pytest.mark.asyncio
+async def test_metrics_collector_single_writer(tmp_path):
+    """Test games saved concurrently go through one writer and none are lost"""
+    collector = MetricsCollector(storage_path=tmp_path, batch_size=5, flush_interval=0.05)
+    started_at = time.time()
+
+    await asyncio.gather(*(
+        collector.save_game_metrics_async(
+            GameMetrics(game_id=f"game-{i}", player_id="p", difficulty="simple", started_at=started_at).to_dict()
+        )
+        for i in range(23)
+    ))
+    writer = collector.write_task
+    await asyncio.wait_for(writer, timeout=2)
+
+    assert collector.write_task is writer  # No second writer was started
+    date_str = time.strftime('%Y-%m-%d', time.localtime(started_at))
+    with open(tmp_path / f"games_{date_str}.json") as f:
+        assert sorted(game['game_id'] for game in json.load(f)) == sorted(f"game-{i}" for i in range(23))
+
+    stats = collector.get_stats()
+    assert stats['queue_depth'] == 0
+    assert stats['max_queue_depth'] == 23
+    assert stats['written'] == 23
+    assert stats['write_errors'] == 0
+    assert stats['flushes'] >= 1
+    assert stats['max_flush_ms'] > 0
+
+@pytest.mark.asyncio
+async def test_sharded_writers_keep_every_game(tmp_path):
+    """Test shard workers sharing a directory write separate daily files that analytics merges"""
+    shards = [MetricsCollector(storage_path=tmp_path, batch_size=5, flush_interval=0.05, worker=f"shard{i}")
+              for i in range(2)]
+    started_at = time.time()
+
+    for round_ in range(3):  # Interleaved flushes would overwrite each other in a shared file
+        await asyncio.gather(*(
+            collector.save_game_metrics_async(
+                GameMetrics(game_id=f"{collector.worker}-{round_}-{i}", player_id="p",
+                            difficulty="simple", started_at=started_at).to_dict()
+            )
+            for collector in shards for i in range(5)
+        ))
+        await asyncio.gather(*(collector.write_task for collector in shards))
+
+    date_str = time.strftime('%Y-%m-%d', time.localtime(started_at))
+    assert sorted(path.name for path in tmp_path.glob("games_*.json")) == [
+        f"games_{date_str}.shard0.json", f"games_{date_str}.shard1.json"
+    ]
+    assert AnalyticsEngine(storage_path=tmp_path).get_aggregate_stats(hours=1)['total_games'] == 30
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried(tmp_path):
+    """Test a batch that fails to write is kept and written by the next flush"""
+    collector = MetricsCollector(storage_path=tmp_path, batch_size=5, flush_interval=0.05)
+    write_batch = collector._write_batch
+    calls = []
+
+    def flaky_write(by_date):
+        calls.append(sum(len(metrics_list) for metrics_list in by_date.values()))
+        if len(calls) == 1:
+            raise OSError("disk full")
+        write_batch(by_date)
+
+    collector._write_batch = flaky_write
+    started_at = time.time()
+    for i in range(5):
+        await collector.save_game_metrics_async(
+            GameMetrics(game_id=f"g{i}", player_id="p", difficulty="simple", started_at=started_at).to_dict()
+        )
+    await asyncio.wait_for(collector.write_task, timeout=2)
+
+    stats = collector.get_stats()
+    assert calls == [5, 5]
+    assert stats['write_errors'] == 1
+    assert stats['written'] == 5
+    assert stats['queue_depth'] == 0
+    games = json.loads(next(tmp_path.glob("games_*.json")).read_text())
+    assert [game['game_id'] for game in games] == [f"g{i}" for i in range(5)]
+
+
 def test_live_stats_tracker():
     """Test live stats tracking"""
     tracker = LiveStatsTracker()
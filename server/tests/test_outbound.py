@@ -0,0 +1,92 @@
+"""
+Test per-connection outbound queues and slow-consumer isolation
+"""
+import pytest
+import asyncio
+import time
+from unittest.mock import AsyncMock
+from game.broadcast import Broadcaster
+from game.outbound import OutboundQueue, SLOW_CONSUMER_CLOSE_CODE
+from game.physics import LanderBatch
+from game.session import GameSession
+from game.spectator_hub import SpectatorHub
+
+
+class StalledWebSocket:
+    """Websocket whose sends block until released"""
+
+    def __init__(self):
+        self.sent = []
+        self.release = asyncio.Event()
+        self.close_code = None
+
+    async def send_text(self, payload):
+        await self.release.wait()
+        self.sent.append(payload)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+@pytest.mark.asyncio
+async def test_telemetry_is_latest_only_and_events_are_kept():
+    """Test queued telemetry is replaced while other messages stay in order"""
+    websocket = StalledWebSocket()
+    queue = OutboundQueue(websocket)
+
+    queue.put("init")
+    for i in range(5):
+        queue.put(f"telemetry-{i}", latest_only=True)
+    queue.put("game_over")
+    queue.put("telemetry-late", latest_only=True)
+
+    websocket.release.set()
+    await queue.drain(timeout=1)
+
+    assert websocket.sent == ["init", "telemetry-4", "game_over", "telemetry-late"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_disconnects_slow_consumer():
+    """Test a client that cannot keep up with events is dropped and closed"""
+    websocket = StalledWebSocket()
+    broadcaster = Broadcaster()
+    dropped = []
+    queue = OutboundQueue(websocket, on_error=dropped.append, broadcaster=broadcaster, max_pending=3)
+
+    results = [queue.put(f"event-{i}") for i in range(5)]
+    await asyncio.sleep(0)
+
+    assert results == [True, True, True, False, False]
+    assert dropped == [queue]
+    assert websocket.close_code == SLOW_CONSUMER_CLOSE_CODE
+    assert broadcaster.slow_consumers == 1
+
+
+@pytest.mark.asyncio
+async def test_backed_up_consumer_is_dropped_after_threshold():
+    """Test a client backed up past max_backlog is dropped even with a short queue"""
+    queue = OutboundQueue(StalledWebSocket(), max_backlog=0.05)
+
+    assert queue.put("frame", latest_only=True)
+    assert queue.put("frame", latest_only=True)
+    time.sleep(0.06)
+
+    assert not queue.put("frame", latest_only=True)
+    assert queue.close_reason == "backed up for too long"
+
+
+@pytest.mark.asyncio
+async def test_slow_spectator_does_not_block_telemetry():
+    """Test send_telemetry returns immediately even if a spectator never reads"""
+    broadcaster = Broadcaster()
+    session = GameSession("test", AsyncMock(), "simple", lander_batch=LanderBatch(),
+                          broadcaster=broadcaster, spectator_hub=SpectatorHub(broadcaster=broadcaster))
+    slow = StalledWebSocket()
+    session.spectator_hub.subscribe(session.session_id, slow)
+
+    await asyncio.wait_for(session.send_telemetry(), timeout=0.1)
+    await session.flush(session.websocket)
+
+    assert session.websocket.send_text.called
+    assert slow.sent == []
@@ -1,6 +1,7 @@
 import pytest
 import math
-from game.physics import Lander, GRAVITY, THRUST_POWER, ROTATION_SPEED, FUEL_CONSUMPTION_RATE
+from game.terrain import Terrain
+from game.physics import Lander, LanderBatch, SNAPSHOT_FIELDS, GRAVITY, THRUST_POWER, ROTATION_SPEED, FUEL_CONSUMPTION_RATE
 
 def test_lander_initialization():
     """Test lander starts with correct values"""
@@ -150,3 +151,131 @@ def test_no_update_when_landed():
     lander.update(1/60, True, "left")
     
     assert lander.x == initial_x
+
+def test_batch_step_matches_individual_updates():
+    """Test one batched step gives the same result as per-lander updates"""
+    batch = LanderBatch(capacity=2)
+    batched = [Lander(x=100 * i, y=100, batch=batch) for i in range(5)]
+    single = [Lander(x=100 * i, y=100, batch=LanderBatch()) for i in range(5)]
+    controls = [(True, None), (False, "left"), (True, "right"), (False, None), (True, "left")]
+    dt = 1/60
+    
+    for lander, (thrust, rotate) in zip(batched, controls):
+        lander.set_controls(thrust, rotate)
+        lander.active = True
+    for _ in range(30):
+        batch.step(dt)
+        for lander, (thrust, rotate) in zip(single, controls):
+            lander.update(dt, thrust, rotate)
+    
+    for a, b in zip(batched, single):
+        assert a.to_dict() == b.to_dict()
+
+def test_batch_skips_finished_landers():
+    """Test batched step leaves finished and inactive rows untouched"""
+    batch = LanderBatch()
+    flying = Lander(batch=batch)
+    crashed = Lander(batch=batch)
+    crashed.crashed = True
+    idle = Lander(batch=batch)
+    flying.active = True
+    crashed.active = True
+    
+    batch.step(1/60)
+    
+    assert flying.vy > 0
+    assert crashed.vy == 0
+    assert idle.vy == 0
+
+def test_batch_collisions():
+    """Test vectorized collision lands safe landers and crashes the rest"""
+    batch = LanderBatch()
+    safe = Lander(y=500, batch=batch)
+    fast = Lander(y=500, batch=batch)
+    fast.vy = 10
+    off_zone = Lander(y=500, batch=batch)
+    high = Lander(y=100, batch=batch)
+    
+    batch.check_collisions([safe.row, fast.row, off_zone.row, high.row], [500, 500, 500, 500], [True, True, False, True])
+    
+    assert safe.landed and not safe.crashed
+    assert fast.crashed and not fast.landed
+    assert off_zone.crashed
+    assert not high.crashed and not high.landed
+
+def test_batch_reuses_released_rows():
+    """Test rows are returned to the batch when a lander is discarded"""
+    batch = LanderBatch(capacity=1)
+    lander = Lander(batch=batch)
+    row = lander.row
+    del lander
+    
+    assert len(batch) == 0
+    assert Lander(batch=batch).row == row
+
+def _peak_terrain():
+    """Flat ground at y=700 with a sharp peak up to y=400 at x=200"""
+    terrain = Terrain(difficulty="simple")
+    terrain.points = [(x, 400 if x == 200 else 700) for x in range(0, 1201, 100)]
+    terrain.landing_zones = [{"x1": 600, "x2": 800, "y": 700, "multiplier": 1.0}]
+    terrain._build_index()
+    return terrain
+
+def test_swept_collision_catches_tunneling():
+    """Test a lander crossing a peak within one tick still hits it"""
+    terrain = _peak_terrain()
+    batch = LanderBatch()
+    lander = Lander(x=100, y=500, batch=batch)
+    lander.vx = 200
+    lander.vy = -GRAVITY  # Cancel gravity so the path is level
+    
+    batch.step(1.0, [lander.row])
+    # Both ends of the tick are well above the ground
+    assert terrain.get_height_at(lander.x) > lander.y + 100
+    
+    toi = batch.resolve_terrain_contact([lander.row], terrain)
+    
+    assert lander.crashed
+    assert abs(toi[0] - 1/3) < 1e-9
+    assert abs(lander.x - (100 + 200/3)) < 1e-6
+    assert lander.y == terrain.get_height_at(lander.x)
+
+def test_swept_collision_lands_on_zone():
+    """Test a slow upright descent onto a landing zone lands"""
+    terrain = _peak_terrain()
+    batch = LanderBatch()
+    lander = Lander(x=700, y=699.99, batch=batch)
+    lander.vy = 1.0
+    
+    batch.step(1/60, [lander.row])
+    toi = batch.resolve_terrain_contact([lander.row], terrain)
+    
+    assert lander.landed
+    assert 0 <= toi[0] <= 1
+    assert lander.y == 700
+
+def test_swept_collision_ignores_clear_paths():
+    """Test landers above the terrain are untouched"""
+    terrain = _peak_terrain()
+    batch = LanderBatch()
+    lander = Lander(x=700, y=100, batch=batch)
+    
+    batch.step(1/60, [lander.row])
+    toi = batch.resolve_terrain_contact([lander.row], terrain)
+    
+    assert toi[0] == math.inf
+    assert not lander.crashed and not lander.landed
+
+def test_snapshot_matches_to_dict():
+    """Test snapshot tuple carries the same state as to_dict"""
+    lander = Lander(x=123, y=45)
+    lander.vx = 1.5
+    lander.crashed = True
+    
+    snapshot = lander.snapshot()
+    
+    assert dict(zip(SNAPSHOT_FIELDS, snapshot)) == lander.to_dict()
+    assert tuple(lander.to_dict()) == SNAPSHOT_FIELDS
+    assert type(snapshot[0]) is float
+    assert type(snapshot[6]) is bool
+    assert not hasattr(lander, '__dict__')
@@ -0,0 +1,78 @@
+"""
+Test the session registry's status indexes and reaper
+"""
+import pytest
+import asyncio
+from game.registry import SessionRegistry
+
+
+@pytest.mark.asyncio
+async def test_status_index_follows_transitions(make_session):
+    """Test sessions move between status sets as they change state"""
+    registry = SessionRegistry()
+    session = make_session("a")
+    registry["a"] = session
+    assert registry.ids("waiting") == {"a"}
+
+    session.running = True
+    session.start_time = session.clock()
+    session.start_game()
+    registry.update(session)
+    assert registry.ids("waiting") == set()
+    assert registry.ids("playing") == {"a"}
+
+    del registry["a"]
+    assert registry.get_stats()['playing'] == 0
+
+
+@pytest.mark.asyncio
+async def test_reap_removes_only_due_sessions(make_session):
+    """Test finished games are kept until their timeout and empty rooms go right away"""
+    now = [1000.0]
+    reaped = []
+    registry = SessionRegistry(timeout=600, on_reap=reaped.append, clock=lambda: now[0])
+
+    finished = make_session("finished")
+    finished.start_time = now[0]
+    finished.stop()
+    registry["finished"] = finished
+    empty = make_session("empty")
+    empty.players.clear()
+    registry["empty"] = empty
+    registry["busy"] = make_session("busy")
+
+    assert registry.reap() == 1
+    assert reaped == [empty]
+
+    now[0] += 601
+    assert registry.reap() == 1
+    assert list(registry) == ["busy"]
+    assert registry.get_stats()['reaped'] == 2
+
+
+@pytest.mark.asyncio
+async def test_rejoined_room_is_not_reaped(make_session):
+    """Test a stale deadline is skipped once the session is in use again"""
+    registry = SessionRegistry()
+    session = make_session("room")
+    players = dict(session.players)
+    session.players.clear()
+    registry["room"] = session
+
+    session.players.update(players)
+    assert registry.reap() == 0
+    assert "room" in registry
+
+
+@pytest.mark.asyncio
+async def test_reaper_runs_in_background(make_session):
+    """Test the reaper task removes due sessions without being asked"""
+    reaped = []
+    registry = SessionRegistry(on_reap=reaped.append)
+    session = make_session("empty")
+    session.players.clear()
+    registry["empty"] = session
+
+    await asyncio.sleep(0.01)
+    assert reaped == [session]
+    assert registry.reaper_task.done()
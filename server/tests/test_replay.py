@@ -85,3 +85,17 @@ def test_replay_finalize():
     assert recorder.metadata["fuel_remaining"] == 450
     assert recorder.metadata["inputs"] == 200
     assert recorder.metadata["frame_count"] == 2  # Only 2 frames recorded (30Hz)
+
+def test_replay_records_snapshots():
+    """Test snapshot tuples record the same frame as state dicts"""
+    from game.physics import Lander
+    lander = Lander(x=600.123, y=100.987)
+    from_dict = ReplayRecorder("test-session", "test-user", "simple")
+    from_snapshot = ReplayRecorder("test-session", "test-user", "simple")
+    
+    for _ in range(2):
+        from_dict.record_frame(lander.to_dict(), 700, 600, 2.0, False)
+        from_snapshot.record_snapshot(lander.snapshot(), 700, 600, 2.0, False)
+    
+    assert from_dict.frames[0]['lander'] == from_snapshot.frames[0]['lander']
+    assert from_snapshot.frames[0]['lander']['x'] == 600.1
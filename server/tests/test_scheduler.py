@@ -0,0 +1,148 @@
+"""
+Test the process-wide tick scheduler
+"""
+import pytest
+import asyncio
+import time
+from unittest.mock import AsyncMock
+from game.physics import LanderBatch
+from game.scheduler import TickScheduler
+from game.session import GameSession
+
+
+class RecordingSession:
+    """Minimal session that records how it was ticked"""
+
+    def __init__(self, ticks_to_run, block_first_tick=0):
+        self.lander_batch = LanderBatch()
+        self.published = []
+        self.ticks_to_run = ticks_to_run
+        self.block_first_tick = block_first_tick
+        self.done = asyncio.Event()
+        self.scheduler = None
+
+    def get_session_info(self):
+        return "[test]"
+
+    async def tick(self, dt, publish):
+        if self.block_first_tick and not self.published:
+            time.sleep(self.block_first_tick)
+        self.published.append(publish)
+        if len(self.published) >= self.ticks_to_run:
+            self.stop()
+
+    def stop(self):
+        self.scheduler.unregister(self)
+        self.done.set()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_applies_divisor():
+    """Test sessions publish every divisor-th tick"""
+    scheduler = TickScheduler(tick_rate=240)
+    fast = RecordingSession(6)
+    slow = RecordingSession(6)
+    fast.scheduler = slow.scheduler = scheduler
+
+    scheduler.register(fast)
+    scheduler.register(slow, divisor=3)
+    await asyncio.wait_for(asyncio.gather(fast.done.wait(), slow.done.wait()), timeout=2)
+
+    assert fast.published == [True] * 6
+    assert slow.published == [True, False, False, True, False, False]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_drops_backlog_when_far_behind():
+    """Test a long stall is skipped instead of replayed tick by tick"""
+    scheduler = TickScheduler(tick_rate=100, max_catchup_ticks=3)
+    session = RecordingSession(3, block_first_tick=0.2)
+    session.scheduler = scheduler
+
+    scheduler.register(session)
+    await asyncio.wait_for(session.done.wait(), timeout=2)
+
+    assert scheduler.ticks_dropped > 0
+    assert scheduler.get_stats()['late_ticks'] > 0
+    # The stall shows up in the loop lag window, which never goes negative
+    assert max(scheduler.loop_lags) >= 0.1
+    assert min(scheduler.loop_lags) >= 0
+
+
+@pytest.mark.asyncio
+async def test_game_session_runs_on_scheduler():
+    """Test a real session is stepped by the scheduler until game over"""
+    websocket = AsyncMock()
+    session = GameSession("test", websocket, "simple", lander_batch=LanderBatch(), scheduler=TickScheduler())
+    session.record_replay = False
+    session._metrics_collector = AsyncMock()
+    session.waiting = False
+
+    # Start just above the ground so the game ends in a few ticks
+    session.lander.y = session.terrain.get_height_at(session.lander.x) - 1
+
+    await asyncio.wait_for(session.start(), timeout=2)
+
+    assert not session.running
+    assert session.players['default']['status'] in ('crashed', 'landed')
+    assert session.scheduler.get_stats()['sessions'] == 0
+    assert '"game_over"' in websocket.send_text.call_args_list[-1].args[0]
+
+
+@pytest.mark.asyncio
+async def test_waiting_room_starts_without_polling():
+    """Test a lobby game loop sleeps until start_game and starts on the next tick"""
+    scheduler = TickScheduler()
+    session = GameSession("room", AsyncMock(), "simple", lander_batch=LanderBatch(), scheduler=scheduler)
+    session.record_replay = False
+    session._metrics_collector = AsyncMock()
+    game_task = asyncio.create_task(session.start())
+
+    await asyncio.sleep(0.05)
+    assert session.state == "waiting"
+    assert session not in scheduler.sessions
+
+    session.start_game()
+    await asyncio.sleep(0)
+    assert session.state == "playing"
+    assert session in scheduler.sessions
+
+    session.stop()
+    await asyncio.wait_for(game_task, timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_closing_waiting_room_ends_game_loop():
+    """Test stop() in the lobby finishes the session without it ever starting"""
+    session = GameSession("room", AsyncMock(), "simple", lander_batch=LanderBatch(), scheduler=TickScheduler())
+    session.record_replay = False
+    changes = []
+    session.on_change = lambda s: changes.append(s.state)
+    game_task = asyncio.create_task(session.start())
+    await asyncio.sleep(0)
+
+    session.stop()
+    await asyncio.wait_for(game_task, timeout=1)
+
+    assert session.state == "finished"
+    assert changes[-1] == "finished"
+    with pytest.raises(RuntimeError):
+        session._enter("playing")
+
+
+@pytest.mark.asyncio
+async def test_throttle_caps_publish_rate():
+    """Test throttle raises a session's divisor and restores its own rate"""
+    scheduler = TickScheduler()
+    session = RecordingSession(ticks_to_run=1)
+    session.scheduler = scheduler
+    scheduler.register(session, divisor=2)
+
+    scheduler.throttle(session, 10)
+    assert scheduler.sessions[session][0] == 6
+    scheduler.throttle(session, 60)
+    assert scheduler.sessions[session][0] == 2  # Never faster than registered
+    scheduler.throttle(session, None)
+    assert scheduler.sessions[session][0] == 2
+    await asyncio.wait_for(session.done.wait(), timeout=1)
+    assert len(scheduler.tick_times) == 1  # Load window samples every tick
@@ -0,0 +1,31 @@
+"""
+Test room-affinity sharding helpers
+"""
+import uuid
+from game.sharding import new_session_id, shard_of, nginx_config
+
+
+def test_session_id_encodes_shard():
+    """Test session ids stay valid UUIDs and carry their shard in the prefix"""
+    session_id = new_session_id(11)
+
+    assert session_id.startswith("0b")
+    assert str(uuid.UUID(session_id)) == session_id
+    assert shard_of(session_id, 16) == 11
+    assert shard_of(f"{session_id}_1700000000", 16) == 11  # Replay ids
+
+
+def test_shard_of_rejects_foreign_ids():
+    """Test ids outside the shard range or not hex-prefixed have no owner"""
+    assert shard_of(new_session_id(3), 2) is None
+    assert shard_of("zz-room", 4) is None
+    assert shard_of(None, 4) is None
+
+
+def test_nginx_config_routes_every_shard():
+    """Test the generated nginx map has a route per shard for rooms, spectators and replays"""
+    config = nginx_config(3, base_port=9000)
+
+    assert "server 127.0.0.1:9002;" in config
+    assert "~^01 127.0.0.1:9001;" in config
+    assert "~^/(spectate|replay)/02 127.0.0.1:9002;" in config
@@ -0,0 +1,148 @@
+"""
+Test session snapshots, restore and the snapshot store used to drain workers
+"""
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock
+from game.replay import ReplayRecorder
+from game.snapshot import SnapshotStore
+
+
+def two_player_game(make_session):
+    session = make_session("0a1b2c3d-0000-4000-8000-000000000001", "medium")
+    session.add_player("p2", AsyncMock(), "Second", "#0ff")
+    return session
+
+
+def play(session, ticks):
+    """Step a running session's landers and resolve each frame without the scheduler"""
+    for _ in range(ticks):
+        session.lander_batch.step(1 / 60)
+        session.resolve_frame()
+
+
+def start(session):
+    session.running = True
+    session.start_time = session.clock()
+    session.state = "playing"
+    for player in session.players.values():
+        player['lander'].active = True
+
+
+@pytest.mark.asyncio
+async def test_restored_session_continues_identically(make_session):
+    """Test a JSON round-tripped snapshot resumes with the same landers, inputs and terrain"""
+    original = two_player_game(make_session)
+    start(original)
+    original.handle_input("thrust_on")
+    original.handle_input("rotate_left", "p2")
+    play(original, 30)
+
+    snapshot = json.loads(json.dumps(original.snapshot()))
+    restored = make_session.restore(snapshot)
+
+    assert restored.state == "playing" and not restored.running
+    assert restored.terrain.points == original.terrain.points
+    assert restored.players["p2"]["rotate"] == "left"
+    assert restored.input_count == 2
+    assert restored.players["default"]["websocket"] is None
+
+    restored.resume()
+    assert restored in restored.scheduler.sessions  # Stepped from the next tick
+    play(original, 30)
+    play(restored, 30)
+    for player_id in ("default", "p2"):
+        assert restored.players[player_id]["lander"].save_state() == original.players[player_id]["lander"].save_state()
+    assert restored._metrics == original._metrics
+    restored.stop()
+
+
+@pytest.mark.asyncio
+async def test_restored_replay_and_clock_carry_over(make_session):
+    """Test the replay keeps recording and elapsed time excludes the time spent moving"""
+    now = [100.0]
+    original = two_player_game(make_session)
+    original.clock = lambda: now[0]
+    start(original)
+    original.replay = ReplayRecorder(original.session_id, "anonymous", "medium")
+    play(original, 10)
+    now[0] += 4.0
+    snapshot = original.snapshot()
+
+    later = [500.0]
+    restored = make_session.restore(snapshot, clock=lambda: later[0])
+    restored.resume()
+    assert restored.clock() - restored.start_time == pytest.approx(4.0)
+    play(restored, 10)
+    assert len(restored.replay.frames) == 10  # 20 frames at 30 Hz
+    restored.stop()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_requires_resume_token(make_session):
+    """Test only the holder of a player's resume token gets the lander back, and unconnected players are skipped"""
+    original = two_player_game(make_session)
+    start(original)
+    snapshot = original.snapshot()
+    restored = make_session.restore(snapshot)
+
+    websocket = AsyncMock()
+    assert not restored.reconnect_player("p2", "guess", websocket)
+    assert not restored.reconnect_player("nobody", snapshot["players"]["p2"]["resume_token"], websocket)
+    assert restored.reconnect_player("p2", snapshot["players"]["p2"]["resume_token"], websocket)
+
+    await restored.broadcast(restored.broadcaster.frame({"type": "player_list"}), spectators=False)
+    assert list(restored.outbound) == [websocket]
+    restored.stop()
+
+
+@pytest.mark.asyncio
+async def test_hand_over_leaves_no_writer_tasks(make_session):
+    """Test draining a game sends migrate to each player, then closes every player and spectator writer"""
+    session = two_player_game(make_session)
+    hub = session.spectator_hub
+    start(session)
+    spectators = [AsyncMock() for _ in range(3)]
+    for websocket in spectators:
+        hub.subscribe(session.session_id, websocket)
+    await session.send_telemetry()
+    await session.flush()
+    writers = [queue.task for queue in session.outbound.values()]
+    writers += [queue.task for queue in hub.channels[session.session_id].queues.values()]
+    assert len(writers) == 5 and not any(task.done() for task in writers)
+
+    snapshot = session.snapshot()
+    await session.hand_over(snapshot)
+    for player_id in ("default", "p2"):
+        sent = [json.loads(call.args[0]) for call in session.players[player_id]['websocket'].send_text.call_args_list]
+        assert sent[-1] == {"type": "migrate", "room_id": session.session_id, "player_id": player_id,
+                            "resume_token": snapshot["players"][player_id]["resume_token"]}
+
+    await asyncio.sleep(0)
+    assert all(task.done() for task in writers)
+    assert session.outbound == {} and session.session_id not in hub.channels
+    assert not [task for task in asyncio.all_tasks() if "OutboundQueue._run" in repr(task.get_coro())]
+    await session.send_to(session.players["p2"]['websocket'], {"type": "pong"})
+    assert session.outbound == {}  # Nothing can start a new writer
+
+
+def test_snapshot_store_hands_out_each_snapshot_once(make_session, tmp_path):
+    """Test a snapshot is claimed by one load, can be turned down and expires"""
+    now = [1000.0]
+    store = SnapshotStore(tmp_path, ttl=60, clock=lambda: now[0])
+    session = two_player_game(make_session)
+    start(session)
+    snapshot = session.snapshot()
+    session_id = snapshot["session_id"]
+    store.save(snapshot)
+
+    assert store.load(session_id, accept=lambda snapshot: False) is None  # Left in place
+    assert store.load(session_id)["session_id"] == session_id
+    assert store.load(session_id) is None  # Already claimed
+    assert store.load("../etc/passwd") is None
+
+    store.save(snapshot)
+    now[0] += 61
+    assert store.load(session_id) is None  # Expired
+    assert store.get_stats() == {'path': str(tmp_path), 'saved': 2, 'restored': 1, 'waiting': 0}
@@ -0,0 +1,115 @@
+"""
+Test the spectator fan-out hub
+"""
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock
+from game.broadcast import Broadcaster, PROTOCOL_SPLIT
+from game.spectator_hub import SpectatorHub, serve_spectator
+
+
+def make_hub(max_spectators=10):
+    return SpectatorHub(max_spectators, broadcaster=Broadcaster())
+
+
+def sent_types(websocket):
+    return [json.loads(call.args[0])['type'] for call in websocket.send_text.call_args_list]
+
+
+INIT = {"type": "init", "terrain": {"points": []}, "all_landing_zones": []}
+
+
+@pytest.mark.asyncio
+async def test_subscribe_respects_spectator_limit():
+    """Test a game refuses spectators past max_spectators"""
+    hub = make_hub(max_spectators=2)
+
+    results = [hub.subscribe("game", AsyncMock()) for _ in range(3)]
+
+    assert results == [True, True, False]
+    assert hub.count("game") == 2
+
+
+@pytest.mark.asyncio
+async def test_late_joiner_gets_cached_init():
+    """Test a spectator joining mid-game starts from the last init message"""
+    hub = make_hub()
+    hub.publish("game", "init", INIT)
+    await hub.flush("game")
+
+    spectator = AsyncMock()
+    hub.subscribe("game", spectator, PROTOCOL_SPLIT)
+    await hub.flush("game")
+
+    assert sent_types(spectator) == ["init"]
+
+
+@pytest.mark.asyncio
+async def test_publish_does_not_wait_for_fan_out():
+    """Test publish only queues; frames reach spectators on the channel task"""
+    hub = make_hub()
+    spectator = AsyncMock()
+    hub.subscribe("game", spectator)
+
+    hub.publish("game", "event", {"type": "game_over"})
+    spectator.send_text.assert_not_called()
+
+    await hub.flush("game")
+    assert sent_types(spectator) == ["game_over"]
+
+
+@pytest.mark.asyncio
+async def test_telemetry_follows_rate_tiers():
+    """Test telemetry goes to the tiers due on a tick; tick None goes to all"""
+    hub = make_hub()
+    slow = AsyncMock()
+    fast = AsyncMock()
+    hub.subscribe("game", slow, rate=5)
+    hub.subscribe("game", fast, rate=30)
+
+    assert hub.due_rates("game", 2) == {30}
+    hub.publish("game", "telemetry", {"type": "telemetry"}, tick=2)
+    await hub.flush("game")
+    assert slow.send_text.call_count == 0
+    assert fast.send_text.call_count == 1
+
+    hub.publish("game", "telemetry", {"type": "telemetry"})
+    await hub.flush("game")
+    assert slow.send_text.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_closed_channel_ends_spectator_connection():
+    """Test serve_spectator returns and unsubscribes once the game is closed"""
+    hub = make_hub()
+    spectator = AsyncMock()
+    spectator.receive_text.side_effect = RuntimeError("disconnected")
+    hub.publish("game", "init", INIT)
+
+    await serve_spectator(hub, spectator, "game", rate=12)
+    assert hub.count("game") == 0
+
+    hub.close_channel("game")
+    await hub.flush("game")
+    assert not hub.is_live("game")
+    assert "game" not in hub.channels
+
+
+@pytest.mark.asyncio
+async def test_spectator_connection_ends_when_channel_closes():
+    """Test a spectator waiting on receive is released as soon as the game's channel is closed"""
+    hub = make_hub()
+    spectator = AsyncMock()
+    spectator.receive_text.side_effect = asyncio.Event().wait  # Client never sends anything
+    hub.publish("game", "init", INIT)
+
+    connection = asyncio.create_task(serve_spectator(hub, spectator, "game"))
+    await asyncio.sleep(0.01)
+    assert hub.count("game") == 1 and not connection.done()
+
+    hub.close_channel("game")
+    await asyncio.wait_for(connection, timeout=0.5)
+    assert hub.count("game") == 0
+    assert sent_types(spectator) == ["init"]
+    spectator.close.assert_awaited_once()
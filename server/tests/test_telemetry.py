@@ -0,0 +1,132 @@
+"""
+Test telemetry message formats sent to players and spectators
+"""
+import pytest
+import json
+from unittest.mock import AsyncMock
+from game.session import PROTOCOL_LEGACY, PROTOCOL_SPLIT
+from game.terrain import Terrain
+
+
+def watched_session(make_session):
+    session = make_session()
+    session.record_replay = False
+    session.publish_spectator_init()
+    return session
+
+
+def as_sent(value):
+    return json.loads(json.dumps(value))
+
+
+def watch(session, websocket, protocol=PROTOCOL_LEGACY, rate=30):
+    return session.spectator_hub.subscribe(session.session_id, websocket, protocol, rate)
+
+
+def sent_messages(websocket):
+    return [json.loads(call.args[0]) for call in websocket.send_text.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_legacy_telemetry_includes_terrain(make_session):
+    """Test legacy clients still get terrain in every telemetry message"""
+    session = watched_session(make_session)
+    await session.send_telemetry()
+    await session.flush()
+
+    message = sent_messages(session.websocket)[-1]
+    assert message['terrain'] == as_sent(session.terrain.to_dict())
+    assert message['all_landing_zones'] == as_sent(session.terrain.landing_zones)
+    assert message['static_version'] == session.static_version
+    # The terrain's cached encoding is spliced in rather than re-serialized
+    assert session.terrain.to_json() in session.websocket.send_text.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_split_telemetry_omits_static_data(make_session):
+    """Test protocol 2 telemetry carries only dynamic state"""
+    session = watched_session(make_session)
+    session.players['default']['protocol'] = PROTOCOL_SPLIT
+    legacy_spectator = AsyncMock()
+    split_spectator = AsyncMock()
+    watch(session, legacy_spectator)
+    watch(session, split_spectator, PROTOCOL_SPLIT)
+
+    await session.send_telemetry()
+    await session.flush()
+
+    player_message = sent_messages(session.websocket)[-1]
+    assert 'terrain' not in player_message
+    assert 'all_landing_zones' not in player_message
+    assert player_message['lander'] == session.lander.to_dict()
+    assert sent_messages(split_spectator)[-1] == player_message
+    legacy_message = sent_messages(legacy_spectator)[-1]
+    assert legacy_message == {**player_message, **as_sent(session.static_fields())}
+    assert set(legacy_message) == set(session.build_telemetry(PROTOCOL_LEGACY))
+
+
+@pytest.mark.asyncio
+async def test_init_carries_static_data(make_session):
+    """Test init has everything a protocol 2 client needs to draw the terrain"""
+    session = watched_session(make_session)
+    await session.send_initial_state()
+    await session.flush()
+
+    message = sent_messages(session.websocket)[-1]
+    assert message['terrain'] == as_sent(session.terrain.to_dict())
+    assert message['all_landing_zones'] == as_sent(session.terrain.landing_zones)
+    assert message['static_version'] == session.static_version
+
+
+@pytest.mark.asyncio
+async def test_set_terrain_pushes_static_to_split_clients_only(make_session):
+    """Test terrain changes reach protocol 2 clients as a static message"""
+    session = watched_session(make_session)
+    split_spectator = AsyncMock()
+    watch(session, split_spectator, PROTOCOL_SPLIT)
+    terrain = Terrain(difficulty="medium", seed=7)
+
+    await session.set_terrain(terrain)
+    await session.flush()
+
+    static = sent_messages(split_spectator)[-1]
+    assert static['type'] == 'static'
+    assert static['static_version'] == 2
+    assert static['terrain'] == as_sent(terrain.to_dict())
+    session.websocket.send_text.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_spectator_is_removed(make_session):
+    """Test a spectator whose socket fails is unsubscribed from the hub"""
+    session = watched_session(make_session)
+    spectator = AsyncMock()
+    spectator.send_text.side_effect = RuntimeError("closed")
+    watch(session, spectator, PROTOCOL_SPLIT)
+
+    await session.send_telemetry()
+    await session.flush()
+
+    assert session.spectator_count == 0
+
+
+@pytest.mark.asyncio
+async def test_spectator_rate_tiers(make_session):
+    """Test each spectator tier gets frames at its own rate, sharing one encoded frame"""
+    session = watched_session(make_session)
+    session.running = True
+    thumbnail = AsyncMock()
+    dashboard = AsyncMock()
+    watch(session, thumbnail, rate=5)
+    watch(session, dashboard, rate=30)
+
+    for _ in range(60):
+        await session.tick(1 / 60, False)
+        await session.flush()  # Let writers send before the next frame replaces it
+
+    thumbnail_frames = [m for m in sent_messages(thumbnail) if m['type'] == 'telemetry']
+    dashboard_frames = [m for m in sent_messages(dashboard) if m['type'] == 'telemetry']
+    assert len(thumbnail_frames) == 5
+    assert len(dashboard_frames) == 30
+    assert thumbnail_frames[0] == dashboard_frames[0]
+    session.websocket.send_text.assert_not_called()
@@ -1,5 +1,6 @@
 import pytest
-from game.terrain import Terrain
+import json
+from game.terrain import Terrain, TerrainPool
 
 def test_terrain_has_required_fields():
     """Test terrain contains points and landing zones"""
@@ -98,3 +99,73 @@ def test_terrain_starts_and_ends_at_edges():
     
     assert min(x_coords) == 0
     assert max(x_coords) >= 1150  # Close to 1200
+
+def _scan_height(terrain, x):
+    """Reference linear-scan lookup"""
+    for (x1, y1), (x2, y2) in zip(terrain.points, terrain.points[1:]):
+        if x1 <= x <= x2:
+            t = (x - x1) / (x2 - x1)
+            return y1 + (y2 - y1) * t
+    return terrain.height
+
+def _scan_landing_zone(terrain, x):
+    """Reference linear-scan landing zone check"""
+    for zone in terrain.landing_zones:
+        if zone["x1"] <= x <= zone["x2"]:
+            return True
+    return False
+
+def test_indexed_lookup_matches_linear_scan():
+    """Test indexed height and landing zone lookups match a full scan"""
+    for difficulty in ["simple", "medium", "hard"]:
+        terrain = Terrain(difficulty=difficulty)
+        xs = [-10, -0.001, 1200.5] + [p[0] for p in terrain.points] + [i * 0.7 for i in range(1715)]
+        
+        for x in xs:
+            assert terrain.get_height_at(x) == _scan_height(terrain, x)
+            assert terrain.is_landing_zone(x)[0] == _scan_landing_zone(terrain, x)
+        
+        heights = terrain.get_heights_at(xs)
+        landing, multipliers = terrain.landing_zone_mask(xs)
+        assert heights.tolist() == [_scan_height(terrain, x) for x in xs]
+        assert landing.tolist() == [_scan_landing_zone(terrain, x) for x in xs]
+        assert multipliers.tolist() == [terrain.is_landing_zone(x)[1] for x in xs]
+
+def test_same_seed_same_terrain():
+    """Test terrain generation is deterministic for a seed"""
+    for difficulty in ["simple", "medium", "hard"]:
+        a = Terrain(difficulty=difficulty, seed=1234)
+        b = Terrain(difficulty=difficulty, seed=1234)
+        c = Terrain(difficulty=difficulty, seed=4321)
+        
+        assert a.to_dict() == b.to_dict()
+        assert a.points != c.points
+        assert a.to_dict()["seed"] == 1234
+
+def test_terrain_pool_memoizes_by_seed():
+    """Test the pool hands out one shared terrain per key, serialized only when asked"""
+    pool = TerrainPool(max_size=2)
+    
+    first = pool.get("simple", seed=7)
+    assert pool.get("simple", seed=7) is first
+    assert pool.get("medium", seed=7) is not first
+    assert first._json is None
+    assert json.loads(first.to_json()) == json.loads(json.dumps(first.to_dict()))
+    
+    # Least recently used entry is evicted
+    pool.get("hard", seed=7)
+    assert pool.get_stats() == {'size': 2, 'hits': 1, 'misses': 3, 'unseeded': 0}
+    assert pool.get("medium", seed=7) is not None
+    assert pool.get("simple", seed=7) is not first
+
+
+def test_terrain_pool_does_not_cache_unseeded_terrain():
+    """Test unseeded games get a fresh random terrain that never enters the cache"""
+    pool = TerrainPool(max_size=2)
+    pool.get("simple", seed=7)
+    
+    terrains = [pool.get("medium") for _ in range(5)]
+    assert len({terrain.seed for terrain in terrains}) == 5
+    assert all(terrain.difficulty == "medium" and terrain._json is None for terrain in terrains)
+    assert pool.get_stats() == {'size': 1, 'hits': 0, 'misses': 1, 'unseeded': 5}
+    assert pool.get("simple", seed=7) is not None and pool.hits == 1
@@ -0,0 +1,101 @@
+"""
+Test the vectorized multi-environment API
+"""
+import pytest
+import random
+import numpy as np
+from game.headless import HeadlessGame
+from game.vector_env import VectorLanderEnv, make_vector_env, OBS_SIZE
+
+
+def test_reset_shapes():
+    """Test reset returns one observation row per env"""
+    env = VectorLanderEnv(4)
+    obs = env.reset(seed=1)
+    
+    assert obs.shape == (4, OBS_SIZE)
+    assert np.all(obs[:, 0] == 600)
+    assert np.all(obs[:, 6] > 0)  # Starts above terrain
+
+def test_matches_server_physics():
+    """Test env episodes match a headless server game given the same inputs"""
+    env = VectorLanderEnv(1, difficulty="medium")
+    env.reset(seed=42)
+    game = HeadlessGame(difficulty="medium", terrain_seed=env.terrains[0].seed)
+    
+    for frame in range(20000):
+        thrust = 1 if frame % 90 < 40 else 0
+        rotate = 1 if frame % 200 < 10 else 0
+        obs, rewards, terminated, truncated, info = env.step([[thrust, rotate]])
+        done = game.step(["thrust_on" if thrust else "thrust_off", "rotate_right" if rotate else "rotate_stop"])
+        if terminated[0]:
+            break
+        lander = game.session.lander
+        assert obs[0, :6].tolist() == [lander.x, lander.y, lander.vx, lander.vy, lander.rotation, lander.fuel]
+    
+    assert done
+    result = game.result()
+    assert info['landed'][0] == result['landed']
+    assert info['crashed'][0] == result['crashed']
+    assert rewards[0] == result['score']
+
+def test_auto_reset_finished_episodes():
+    """Test finished envs restart while others keep flying"""
+    env = VectorLanderEnv(3)
+    env.reset(seed=3)
+    # Drop env 1 onto the ground
+    env.batch.y[env.rows[1]] = 10000
+    
+    obs, rewards, terminated, truncated, info = env.step(np.zeros((3, 2), dtype=int))
+    
+    assert terminated.tolist() == [False, True, False]
+    assert info['final_index'].tolist() == [1]
+    assert info['final_observation'][0, 6] == 0  # Snapped to the ground
+    assert obs[1, 1] == 100  # Reset to spawn height
+    assert env.steps.tolist() == [1, 0, 1]
+
+def test_seeding_is_per_env():
+    """Test reset(seed) repeats terrains without touching the global random module"""
+    random.seed(7)
+    expected = random.random()
+    random.seed(7)
+    
+    env = VectorLanderEnv(3)
+    env.reset(seed=5)
+    seeds = [terrain.seed for terrain in env.terrains]
+    other = VectorLanderEnv(3, seed=5)
+    other.reset()
+    
+    assert random.random() == expected
+    assert len(set(seeds)) == 3
+    assert [terrain.seed for terrain in other.terrains] == seeds
+    env.reset(seed=5)
+    assert [terrain.seed for terrain in env.terrains] == seeds
+
+def test_truncates_at_max_steps():
+    """Test episodes are cut off at max_steps"""
+    env = VectorLanderEnv(2, max_steps=5)
+    env.reset()
+    
+    for _ in range(5):
+        obs, rewards, terminated, truncated, info = env.step(np.zeros((2, 2), dtype=int))
+    
+    assert truncated.all()
+    assert not terminated.any()
+
+def test_process_backend():
+    """Test process-pool backend returns the same shapes as the inline env"""
+    env = make_vector_env(4, backend="process", num_workers=2)
+    try:
+        obs = env.reset(seed=0)
+        assert obs.shape == (4, OBS_SIZE)
+        obs, rewards, terminated, truncated, info = env.step(np.zeros((4, 2), dtype=int))
+        assert obs.shape == (4, OBS_SIZE)
+        assert rewards.shape == (4,)
+        
+        # Workers are seeded from the parent seed, each differently
+        first = env.reset(seed=0)
+        assert np.array_equal(env.reset(seed=0), first)
+        assert not np.array_equal(first[:2, 7], first[2:, 7])
+    finally:
+        env.close()